@@ -6,10 +6,22 @@ Author: ESSEC AI Course Project
 Date: November 1, 2025
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import threading
 import uvicorn
 from dotenv import load_dotenv
 
@@ -19,14 +31,68 @@ load_dotenv()
 # Import our services
 from services.cv_parser import cv_parser
 from services.semantic_matcher import semantic_matcher
+from services.skill_normalizer import skill_normalizer
 from services.llm_service import llm_service
 from services.job_fetcher import job_fetcher
+from services.stage_graph import StageGraph
+from services.analysis_queue import AnalysisQueue, QueueFull
+from services.result_cache import SingleFlightCache
+
+# Bounded pool for the CPU-bound stages of an analysis (text extraction,
+# embeddings, matching), so they never run on the event loop. Threads, not
+# processes: the model and the catalogue live in this process, and torch
+# and numpy release the GIL while they compute.
+cpu_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ANALYSIS_CPU_WORKERS', '2')),
+    thread_name_prefix='analysis-cpu'
+)
+
+async def run_cpu(func, *args, **kwargs):
+    """Run a CPU-bound call in the analysis pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, partial(func, *args, **kwargs))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the semantic matcher in the background so startup isn't blocked"""
+    threading.Thread(
+        target=semantic_matcher.warm_up,
+        name="semantic-matcher-warmup",
+        daemon=True
+    ).start()
+    
+    # Reload the job catalogue when its file changes (0 disables the watcher)
+    stop_watching = threading.Event()
+    watch_interval = float(os.getenv('CATALOGUE_WATCH_INTERVAL', '30'))
+    if watch_interval > 0:
+        threading.Thread(
+            target=semantic_matcher.watch_catalogue,
+            args=(stop_watching, watch_interval),
+            name="catalogue-watcher",
+            daemon=True
+        ).start()
+    
+    analysis_queue.start()
+    if int(os.getenv('WEB_CONCURRENCY', '1')) > 1:
+        # Queued analyses live in the process that accepted them
+        print(
+            "⚠️  Several server processes (WEB_CONCURRENCY > 1): /api/analyses polls "
+            "may reach another process and answer 404, run a single process in queue mode"
+        )
+    
+    yield
+    stop_watching.set()
+    await analysis_queue.stop()
+    await cv_parser.aclose()
+    await job_fetcher.aclose()
+    cpu_executor.shutdown(wait=False)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="JobMatchAI API",
     description="AI-powered CV analysis and job recommendation system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for React frontend
@@ -53,6 +119,12 @@ class CVAnalysis(BaseModel):
     languages: List[str] = []
     summary: str = ""
 
+class PartialSkill(BaseModel):
+    """Missing skill partly covered by a related skill of the CV"""
+    skill: str
+    related_skill: str
+    credit: float
+
 class JobRecommendation(BaseModel):
     """Job recommendation with match score"""
     job_id: str
@@ -61,6 +133,8 @@ class JobRecommendation(BaseModel):
     match_score: float
     required_skills: List[str]
     missing_skills: List[str]
+    # Missing skills with graded credit from the skill graph
+    partial_skills: List[PartialSkill] = []
     salary_range: Optional[str] = None
     education_level: Optional[str] = None
     # Optional fields to indicate fallback/alternative recommendations
@@ -101,6 +175,254 @@ class RecommendationResponse(BaseModel):
     ai_insights: str
     real_job_offers: List[RealJobOffer] = []  # New field for real offers
 
+class AnalysisStatus(BaseModel):
+    """State of a queued analysis (submit/poll mode)"""
+    analysis_id: str
+    status: str  # queued, running, done or failed
+    # Analyses ahead in the queue (while queued)
+    position: Optional[int] = None
+    result: Optional[RecommendationResponse] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+
+class BatchAnalysisItem(BaseModel):
+    """Analysis and job matches for one CV of a batch"""
+    filename: Optional[str] = None
+    cv_analysis: CVAnalysis
+    job_recommendations: List[JobRecommendation]
+
+class BatchAnalysisResponse(BaseModel):
+    """Results of a batch CV analysis, in upload order"""
+    total: int
+    results: List[BatchAnalysisItem]
+
+ACCEPTED_CONTENT_TYPES = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
+
+def build_cv_analysis(cv_data: dict) -> CVAnalysis:
+    """Build the CV analysis section from parsed CV data"""
+    return CVAnalysis(
+        name=cv_data.get('name') or "Nom non détecté",
+        email=cv_data.get('email'),
+        phone=cv_data.get('phone'),
+        skills=cv_data.get('skills', []),
+        experience_years=cv_data.get('experience_years'),
+        education=cv_data.get('education', []),
+        languages=cv_data.get('languages', []),
+        summary=cv_data.get('summary', "")
+    )
+
+# ============================================
+# Analysis Pipeline
+# ============================================
+# The stages of /api/analyze-cv as a dependency graph: trainings, AI
+# insights and search keywords only need the matches, and the offer fetch
+# only needs the keywords, so those stages overlap and the latency is
+# the critical path (parse → match → keywords → offers), not the sum.
+
+async def parse_cv_stage(contents: bytes, content_type: str) -> dict:
+    """Parse the CV (text extraction in the CPU pool, GPT call awaited)"""
+    return await cv_parser.parse_file_async(contents, content_type, executor=cpu_executor)
+
+async def match_stage(cv_data: dict, field_weights: Optional[str]) -> List[dict]:
+    """Job recommendations using semantic matching"""
+    try:
+        return await run_cpu(
+            semantic_matcher.match_cv_with_jobs, cv_data, top_k=5, field_weights=field_weights
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def validate_field_weights(field_weights: Optional[str]):
+    """Reject invalid field weights (400) before the CV is parsed (a paid GPT call)"""
+    if field_weights is None:
+        return
+    try:
+        semantic_matcher.check_field_weights(field_weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def missing_skills_stage(job_recommendations: List[dict]) -> List[str]:
+    """Missing skills of all recommended jobs"""
+    all_missing_skills = []
+    for job in job_recommendations:
+        all_missing_skills.extend(job.get('missing_skills', []))
+    # Remove duplicates (same skill under any spelling), keeping the best jobs' first
+    return skill_normalizer.unique(all_missing_skills)
+
+async def trainings_stage(cv_data: dict, missing_skills: List[str]) -> List[dict]:
+    """Training recommendations for the top 5 missing skills"""
+    return await run_cpu(semantic_matcher.recommend_trainings, cv_data, missing_skills[:5], top_k=3)
+
+async def insights_stage(cv_data: dict, job_recommendations: List[dict], missing_skills: List[str]) -> str:
+    """AI insights using OpenAI GPT (llm_service blocks on HTTP: I/O thread pool)"""
+    return await run_in_threadpool(
+        llm_service.generate_career_insights, cv_data, job_recommendations, missing_skills
+    )
+
+async def keywords_stage(cv_data: dict, job_recommendations: List[dict]) -> List[str]:
+    """Optimized job search keywords using GPT"""
+    return await run_in_threadpool(
+        llm_service.generate_job_search_keywords, cv_data, job_recommendations
+    )
+
+async def offers_stage(cv_data: dict, job_recommendations: List[dict], keywords: List[str]) -> List[dict]:
+    """Real job offers from France Travail API, for the ROME codes of the top jobs"""
+    top_rome_codes = [job.get('job_id', '') for job in job_recommendations[:3]]
+    return await job_fetcher.get_jobs_for_cv_async(
+        cv_data,
+        top_rome_codes,
+        job_recommendations,
+        gpt_keywords=keywords
+    )
+
+analysis_graph = (
+    StageGraph(inputs=('contents', 'content_type', 'field_weights'))
+    .add('cv_data', parse_cv_stage, 'contents', 'content_type')
+    .add('job_recommendations', match_stage, 'cv_data', 'field_weights')
+    .add('missing_skills', missing_skills_stage, 'job_recommendations')
+    .add('training_recommendations', trainings_stage, 'cv_data', 'missing_skills')
+    .add('ai_insights', insights_stage, 'cv_data', 'job_recommendations', 'missing_skills')
+    .add('optimized_keywords', keywords_stage, 'cv_data', 'job_recommendations')
+    .add('real_jobs', offers_stage, 'cv_data', 'job_recommendations', 'optimized_keywords')
+)
+
+# Response section built from each analysis stage: stage → (section, builder)
+RESPONSE_SECTIONS = {
+    'cv_data': ('cv_analysis', build_cv_analysis),
+    'job_recommendations': (
+        'job_recommendations', lambda jobs: [JobRecommendation(**job) for job in jobs]
+    ),
+    'training_recommendations': (
+        'training_recommendations',
+        lambda trainings: [TrainingRecommendation(**training) for training in trainings]
+    ),
+    'ai_insights': ('ai_insights', lambda insights: insights),
+    'real_jobs': ('real_job_offers', lambda jobs: [RealJobOffer(**job) for job in jobs]),
+}
+
+def build_recommendation_response(results: dict) -> RecommendationResponse:
+    """Build the analyze-cv response from the results of the analysis graph"""
+    return RecommendationResponse(**{
+        section: build(results[stage]) for stage, (section, build) in RESPONSE_SECTIONS.items()
+    })
+
+async def compute_analysis(
+    contents: bytes,
+    content_type: str,
+    field_weights: Optional[str],
+    on_stage: Optional[Callable[[str, Any], None]] = None
+) -> RecommendationResponse:
+    """
+    Run the analysis graph on an uploaded CV (any failure as an HTTPException)
+    
+    Args:
+        on_stage: Called with (stage, result) as each stage finishes
+    """
+    try:
+        results = {}
+        async for stage, result in analysis_graph.stream(
+            contents=contents,
+            content_type=content_type,
+            field_weights=field_weights
+        ):
+            results[stage] = result
+            if on_stage is not None:
+                on_stage(stage, result)
+        return build_recommendation_response(results)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error analyzing CV: {str(e)}"
+        )
+
+# Whole-response cache for re-analysed uploads (retries, double-clicks,
+# shared files); concurrent identical uploads share one computation
+analysis_cache = SingleFlightCache(
+    maxsize=int(os.getenv('ANALYSIS_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('ANALYSIS_CACHE_TTL', '3600'))
+)
+
+def analysis_cache_key(contents: bytes, content_type: str, field_weights: Optional[str]) -> tuple:
+    """Content hash of an upload plus everything else its analysis depends on"""
+    return (
+        hashlib.sha256(contents).hexdigest(),
+        content_type,
+        field_weights,
+        # A catalogue reload or update invalidates cached matches
+        semantic_matcher.catalogue_generation
+    )
+
+async def run_analysis(contents: bytes, content_type: str, field_weights: Optional[str]) -> RecommendationResponse:
+    """Analysis of an uploaded CV, cached by content hash and computed once for identical uploads"""
+    response, _ = await analysis_cache.get_or_compute(
+        analysis_cache_key(contents, content_type, field_weights),
+        lambda: compute_analysis(contents, content_type, field_weights)
+    )
+    return response
+
+# Submit/poll mode (/api/analyses): bounded workers, bounded backlog.
+# Jobs live in this process, so it requires a single server process.
+analysis_queue = AnalysisQueue(
+    run_analysis,
+    workers=int(os.getenv('ANALYSIS_QUEUE_WORKERS', '2')),
+    max_pending=int(os.getenv('ANALYSIS_QUEUE_MAX_PENDING', '20')),
+    result_ttl=float(os.getenv('ANALYSIS_RESULT_TTL', '3600')),
+    max_results=int(os.getenv('ANALYSIS_MAX_RESULTS', '1000'))
+)
+
+def ndjson_line(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+async def analysis_events(contents: bytes, content_type: str, field_weights: Optional[str]):
+    """
+    NDJSON events of a streamed analysis: one {"section", "data"} line per
+    response section as soon as its stage is done, then {"section": "done"}
+    (or {"section": "error", "status", "detail"} if a stage fails)
+    
+    A cached analysis, or one already running for the same upload, is sent
+    in one go when its result is ready.
+    """
+    ready = asyncio.Queue()
+    
+    def on_stage(stage, result):
+        if stage in RESPONSE_SECTIONS:
+            ready.put_nowait((stage, result))
+    
+    analysis = asyncio.ensure_future(analysis_cache.get_or_compute(
+        analysis_cache_key(contents, content_type, field_weights),
+        lambda: compute_analysis(contents, content_type, field_weights, on_stage)
+    ))
+    sent = set()
+    try:
+        # Sections computed by this request, as they come
+        while True:
+            next_stage = asyncio.ensure_future(ready.get())
+            await asyncio.wait({next_stage, analysis}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_stage.done():
+                next_stage.cancel()
+                break
+            stage, result = next_stage.result()
+            section, build = RESPONSE_SECTIONS[stage]
+            sent.add(section)
+            yield ndjson_line({'section': section, 'data': jsonable_encoder(build(result))})
+        
+        # Everything not sent yet (all of it for a cached or joined analysis)
+        response, _ = await analysis
+        for section, _ in RESPONSE_SECTIONS.values():
+            if section not in sent:
+                yield ndjson_line({'section': section, 'data': jsonable_encoder(getattr(response, section))})
+        yield ndjson_line({'section': 'done'})
+    except HTTPException as e:
+        yield ndjson_line({'section': 'error', 'status': e.status_code, 'detail': e.detail})
+    except Exception as e:
+        yield ndjson_line({'section': 'error', 'status': 500, 'detail': f"Error analyzing CV: {str(e)}"})
+    finally:
+        # Client gone: the shared computation keeps running and gets cached
+        analysis.cancel()
+
 # ============================================
 # API Endpoints
 # ============================================
@@ -119,10 +441,23 @@ async def health_check():
     """Detailed health check"""
     return {
         "status": "healthy",
-        "models_loaded": False,  # TODO: Check if models are loaded
+        "models_loaded": semantic_matcher.is_ready,
+        "analysis_queue": analysis_queue.stats(),
+        "analysis_cache": analysis_cache.stats(),
         "database_connected": True
     }
 
+@app.get("/api/ready")
+async def readiness_check():
+    """
+    Readiness probe for the load balancer
+    
+    Returns 200 once the model and job embeddings are loaded and warm,
+    503 (with the same status details) until then.
+    """
+    status = semantic_matcher.status()
+    return JSONResponse(status_code=200 if status['ready'] else 503, content=status)
+
 @app.post("/api/upload-cv")
 async def upload_cv(file: UploadFile = File(...)):
     """
@@ -130,7 +465,7 @@ async def upload_cv(file: UploadFile = File(...)):
     Returns file metadata and confirmation
     """
     # Validate file type
-    if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
+    if file.content_type not in ACCEPTED_CONTENT_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Invalid file type. Only PDF and DOCX files are accepted."
@@ -152,7 +487,12 @@ async def upload_cv(file: UploadFile = File(...)):
     }
 
 @app.post("/api/analyze-cv", response_model=RecommendationResponse)
-async def analyze_cv(file: UploadFile = File(...)):
+async def analyze_cv(
+    file: UploadFile = File(...),
+    field_weights: Optional[str] = Query(
+        None, description="Per-field match weights, e.g. title=0.3,skills=0.7 (needs MATCHER_FIELD_EMBEDDINGS=1)"
+    )
+):
     """
     Analyze CV and return comprehensive recommendations
     
@@ -163,14 +503,17 @@ async def analyze_cv(file: UploadFile = File(...)):
     4. Matches against job database
     5. Recommends relevant trainings
     6. Generates AI-powered insights
+    
+    The steps run as analysis_graph: independent stages run concurrently.
     """
     
     # Validate file type
-    if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
+    if file.content_type not in ACCEPTED_CONTENT_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Invalid file type. Only PDF and DOCX files are accepted."
         )
+    validate_field_weights(field_weights)
     
     # Read file content
     contents = await file.read()
@@ -180,82 +523,204 @@ async def analyze_cv(file: UploadFile = File(...)):
             detail="File size exceeds 10MB limit."
         )
     
-    try:
-        # Parse CV
-        cv_data = cv_parser.parse_file(contents, file.content_type)
-        
-        # Get job recommendations using semantic matching
-        job_recommendations = semantic_matcher.match_cv_with_jobs(cv_data, top_k=5)
-        
-        # Collect all missing skills
-        all_missing_skills = []
-        for job in job_recommendations:
-            all_missing_skills.extend(job.get('missing_skills', []))
-        # Remove duplicates
-        unique_missing_skills = list(set(all_missing_skills))
-        
-        # Get training recommendations
-        training_recommendations = semantic_matcher.recommend_trainings(
-            cv_data,
-            unique_missing_skills[:5],  # Top 5 missing skills
-            top_k=3
+    return await run_analysis(contents, file.content_type, field_weights)
+
+@app.post("/api/analyze-cv/stream")
+async def analyze_cv_stream(
+    file: UploadFile = File(...),
+    field_weights: Optional[str] = Query(
+        None, description="Per-field match weights, e.g. title=0.3,skills=0.7 (needs MATCHER_FIELD_EMBEDDINGS=1)"
+    )
+):
+    """
+    Streaming variant of /api/analyze-cv (NDJSON)
+    
+    Sends each section of the analyze-cv response as soon as it is ready,
+    one JSON object per line: cv_analysis and job_recommendations within
+    about a second, then training_recommendations, ai_insights and
+    real_job_offers as the LLM and France Travail calls return.
+    
+        {"section": "cv_analysis", "data": {...}}
+        {"section": "job_recommendations", "data": [...]}
+        ...
+        {"section": "done"}
+    
+    A failing stage ends the stream with
+    {"section": "error", "status": 400|500, "detail": "..."}.
+    """
+    
+    # Validate file type
+    if file.content_type not in ACCEPTED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only PDF and DOCX files are accepted."
         )
-        
-        # Generate AI insights using OpenAI GPT
-        ai_insights = llm_service.generate_career_insights(
-            cv_data,
-            job_recommendations,
-            unique_missing_skills
+    validate_field_weights(field_weights)
+    
+    # Read file content
+    contents = await file.read()
+    if len(contents) > 10 * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail="File size exceeds 10MB limit."
         )
-        
-        # Generate optimized job search keywords using GPT
-        optimized_keywords = llm_service.generate_job_search_keywords(
-            cv_data,
-            job_recommendations
+    
+    return StreamingResponse(
+        analysis_events(contents, file.content_type, field_weights),
+        media_type="application/x-ndjson",
+        # Don't let proxies buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/analyses", response_model=AnalysisStatus, status_code=202)
+async def submit_analysis(
+    response: Response,
+    file: UploadFile = File(...),
+    field_weights: Optional[str] = Query(
+        None, description="Per-field match weights, e.g. title=0.3,skills=0.7 (needs MATCHER_FIELD_EMBEDDINGS=1)"
+    )
+):
+    """
+    Queue a CV analysis and return its ID right away (submit/poll mode)
+    
+    Poll GET /api/analyses/{analysis_id} until the status is done (result
+    has the /api/analyze-cv response) or failed. Answers 503 with
+    Retry-After when the queue is full.
+    """
+    
+    # Validate file type
+    if file.content_type not in ACCEPTED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only PDF and DOCX files are accepted."
         )
-        
-        # Fetch real job offers from France Travail API
-        # Extract ROME codes from recommended jobs
-        top_rome_codes = [job.get('job_id', '') for job in job_recommendations[:3]]
-        real_jobs = job_fetcher.get_jobs_for_cv(
-            cv_data, 
-            top_rome_codes, 
-            job_recommendations,
-            gpt_keywords=optimized_keywords
+    validate_field_weights(field_weights)
+    
+    # Read file content
+    contents = await file.read()
+    if len(contents) > 10 * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail="File size exceeds 10MB limit."
         )
-        
-        # Build response
-        response = RecommendationResponse(
-            cv_analysis=CVAnalysis(
-                name=cv_data.get('name') or "Nom non détecté",
-                email=cv_data.get('email'),
-                phone=cv_data.get('phone'),
-                skills=cv_data.get('skills', []),
-                experience_years=cv_data.get('experience_years'),
-                education=cv_data.get('education', []),
-                languages=cv_data.get('languages', []),
-                summary=cv_data.get('summary', "")
-            ),
-            job_recommendations=[
-                JobRecommendation(**job) for job in job_recommendations
-            ],
-            training_recommendations=[
-                TrainingRecommendation(**training) for training in training_recommendations
-            ],
-            ai_insights=ai_insights,
-            real_job_offers=[
-                RealJobOffer(**job) for job in real_jobs
-            ]
+    
+    try:
+        job = analysis_queue.submit(
+            contents=contents,
+            content_type=file.content_type,
+            field_weights=field_weights
+        )
+    except QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many analyses in progress, please retry later.",
+            headers={"Retry-After": str(analysis_queue.retry_after())}
         )
+    
+    response.headers["Location"] = f"/api/analyses/{job.id}"
+    return AnalysisStatus(analysis_id=job.id, status=job.status, position=analysis_queue.position(job))
+
+@app.get("/api/analyses/{analysis_id}", response_model=AnalysisStatus)
+async def get_analysis(analysis_id: str):
+    """Status of a queued analysis, with its result once done"""
+    job = analysis_queue.get(analysis_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis")
+    
+    return AnalysisStatus(
+        analysis_id=job.id,
+        status=job.status,
+        position=analysis_queue.position(job),
+        result=job.result,
+        error=job.error,
+        error_status=job.error_status
+    )
+
+@app.post("/api/analyze-cv/batch", response_model=BatchAnalysisResponse)
+async def analyze_cv_batch(
+    files: List[UploadFile] = File(...),
+    field_weights: Optional[str] = Query(
+        None, description="Per-field match weights, e.g. title=0.3,skills=0.7 (needs MATCHER_FIELD_EMBEDDINGS=1)"
+    )
+):
+    """
+    Analyze many CVs at once and return job matches for each
+    
+    All CVs are parsed, then embedded and matched against the job database
+    in a single batch. Results are in upload order and identical to the
+    job recommendations of /api/analyze-cv for each CV.
+    """
+    
+    # Validate the request and read all files before doing any work
+    validate_field_weights(field_weights)
+    uploads = []
+    for file in files:
+        if file.content_type not in ACCEPTED_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type for {file.filename}. Only PDF and DOCX files are accepted."
+            )
+        contents = await file.read()
+        if len(contents) > 10 * 1024 * 1024:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File size exceeds 10MB limit: {file.filename}"
+            )
+        uploads.append((file, contents))
+    
+    try:
+        cv_list = await asyncio.gather(*(
+            cv_parser.parse_file_async(contents, file.content_type, executor=cpu_executor)
+            for file, contents in uploads
+        ))
+        
+        # One batched encoding pass and one similarity product for all CVs
+        try:
+            matches = await run_cpu(semantic_matcher.match_many, cv_list, top_k=5, field_weights=field_weights)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return response
+        results = [
+            BatchAnalysisItem(
+                filename=file.filename,
+                cv_analysis=build_cv_analysis(cv_data),
+                job_recommendations=[JobRecommendation(**job) for job in job_recommendations]
+            )
+            for (file, _), cv_data, job_recommendations in zip(uploads, cv_list, matches)
+        ]
         
+        return BatchAnalysisResponse(total=len(results), results=results)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Error analyzing CV: {str(e)}"
+            detail=f"Error analyzing CV batch: {str(e)}"
         )
 
+@app.post("/api/admin/reload-catalogue", status_code=202)
+async def reload_catalogue(x_admin_token: Optional[str] = Header(None)):
+    """
+    Rebuild the job catalogue (jobs, embeddings, indexes) from its file in the background
+    
+    Matching keeps using the current catalogue until the new one is swapped in;
+    progress is reported under catalogue.reload in /api/ready.
+    Requires the X-Admin-Token header to match ADMIN_TOKEN; the endpoint is
+    disabled (403) while ADMIN_TOKEN is not set.
+    """
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Catalogue reload is disabled (ADMIN_TOKEN is not set)")
+    if not secrets.compare_digest(x_admin_token or '', admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    started = semantic_matcher.reload_catalogue_in_background()
+    return {
+        "status": "started" if started else "already_running",
+        "generation": semantic_matcher.status()['catalogue']['generation']
+    }
+
 @app.get("/api/jobs")
 async def get_jobs():
     """Get all available jobs in database"""
@@ -0,0 +1,126 @@
+"""
+Benchmark de concurrence de /api/analyze-cv
+
+Envoie des analyses de CV en parallèle à un serveur lancé (uvicorn) et mesure,
+pour chaque niveau de concurrence:
+- le débit (analyses/s) et la latence p50 / p95 des analyses
+- la latence de /api/health pendant la charge: si une étape bloque la
+  boucle d'événements, les health checks attendent la fin de l'analyse
+
+À lancer avant et après une modification du pipeline, sur le même serveur
+et le même CV.
+
+Usage:
+    uvicorn main:app --port 8000
+    python scripts/benchmark_analyze_concurrency.py --cv mon_cv.pdf
+    python scripts/benchmark_analyze_concurrency.py --cv mon_cv.docx --concurrency 1 4 16 --requests 32
+
+Auteur: JobMatchAI Team
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+CONTENT_TYPES = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+
+async def probe_health(client: httpx.AsyncClient, url: str, interval: float, stop: asyncio.Event, latencies: list):
+    """Interroge /api/health toutes les `interval` secondes jusqu'à `stop`"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(f"{url}/api/health")
+        latencies.append(time.perf_counter() - start)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(url: str, cv: tuple, concurrency: int, requests: int, interval: float):
+    """Débit et latences pour un niveau de concurrence"""
+    filename, content, content_type = cv
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(timeout=600, limits=limits) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, health, errors = [], [], 0
+
+        async def analyze():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"{url}/api/analyze-cv", files={'file': (filename, content, content_type)}
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, url, interval, stop, health))
+        start = time.perf_counter()
+        await asyncio.gather(*(analyze() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    return {
+        'throughput': requests / elapsed,
+        'p50': np.percentile(latencies, 50),
+        'p95': np.percentile(latencies, 95),
+        'health_p95': np.percentile(health, 95) * 1000 if health else float('nan'),
+        'health_max': max(health) * 1000 if health else float('nan'),
+        'errors': errors
+    }
+
+
+async def main_async(args):
+    path = Path(args.cv)
+    content_type = CONTENT_TYPES.get(path.suffix.lower())
+    if content_type is None:
+        print("❌ Le CV doit être un fichier .pdf ou .docx")
+        sys.exit(1)
+    cv = (path.name, path.read_bytes(), content_type)
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        try:
+            await client.get(f"{args.url}/api/health")
+        except httpx.HTTPError as e:
+            print(f"❌ Serveur injoignable sur {args.url}: {e}")
+            sys.exit(1)
+
+    print("=" * 90)
+    print(f"⚡ CONCURRENCE /api/analyze-cv: {args.requests} analyses par niveau, {args.url}")
+    print("=" * 90)
+    print(f"{'Concurrence':>11} {'Débit':>10} {'p50':>9} {'p95':>9} {'health p95':>12} {'health max':>12} {'Erreurs':>8}")
+    print("-" * 90)
+    for concurrency in args.concurrency:
+        r = await run_level(args.url, cv, concurrency, args.requests, args.health_interval)
+        print(
+            f"{concurrency:>11} {r['throughput']:>8.2f}/s {r['p50']:>8.2f}s {r['p95']:>8.2f}s "
+            f"{r['health_p95']:>10.1f}ms {r['health_max']:>10.1f}ms {r['errors']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concurrence de /api/analyze-cv")
+    parser.add_argument('--cv', required=True, help="CV envoyé à chaque analyse (.pdf ou .docx)")
+    parser.add_argument('--url', default='http://localhost:8000', help="Adresse du serveur")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8],
+                        help="Analyses simultanées")
+    parser.add_argument('--requests', type=int, default=16, help="Analyses par niveau de concurrence")
+    parser.add_argument('--health-interval', type=float, default=0.05,
+                        help="Intervalle entre deux health checks (s)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
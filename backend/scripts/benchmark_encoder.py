@@ -0,0 +1,95 @@
+"""
+Parité et débit des backends d'inférence de l'encodeur (torch / onnx / onnx-int8)
+
+Pour chaque backend, encode les textes métiers du catalogue et quelques textes
+de CV, puis rapporte:
+- la dérive cosinus par rapport aux embeddings PyTorch (moyenne, min)
+- l'accord du top-5 des métiers pour les CV de test
+- le débit (textes / seconde)
+
+Usage:
+    python scripts/benchmark_encoder.py
+    python scripts/benchmark_encoder.py --backends torch onnx-int8 --limit 500 --batch-size 32
+
+Auteur: JobMatchAI Team
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.encoder import ENCODER_BACKENDS, load_encoder
+from services.semantic_matcher import MODEL_NAME, semantic_matcher
+from services.vector_index import normalise_rows
+
+SAMPLE_CVS = [
+    "Compétences: Python, SQL, Machine Learning, TensorFlow. 3 ans d'expérience. Formation: Master Data Science",
+    "Compétences: React, Node.js, TypeScript, Docker. 5 ans d'expérience. Développeur web full stack",
+    "Compétences: Photoshop, Figma, UX design. Formation: Licence arts appliqués",
+    "Compétences: Négociation, prospection, CRM. 8 ans d'expérience. Commercial B2B",
+    "Compétences: Comptabilité, SAP, fiscalité. Formation: DCG",
+]
+
+
+def encode_timed(model, texts, batch_size):
+    """Encode et mesure le débit"""
+    # Premier appel hors chrono (initialisation des sessions)
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return normalise_rows(embeddings), len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et débit des backends de l'encodeur")
+    parser.add_argument('--backends', nargs='+', default=list(ENCODER_BACKENDS), choices=ENCODER_BACKENDS)
+    parser.add_argument('--limit', type=int, default=300, help="Nombre de textes métiers à encoder")
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    job_texts = [semantic_matcher._create_job_text(job) for job in semantic_matcher.jobs_data[:args.limit]]
+    texts = job_texts + SAMPLE_CVS
+    if not job_texts:
+        print("❌ Aucun métier chargé")
+        return
+
+    print("=" * 70)
+    print(f"🚀 BENCHMARK ENCODEUR {MODEL_NAME} ({len(texts)} textes, batch {args.batch_size})")
+    print("=" * 70)
+
+    backends = ['torch'] + [b for b in args.backends if b != 'torch']
+    reference = None
+    reference_top = None
+
+    print(f"   {'backend':<10} {'textes/s':>10} {'cos moyen':>10} {'cos min':>10} {'top-5':>8}")
+    for backend in backends:
+        model = load_encoder(MODEL_NAME, backend)
+        embeddings, throughput = encode_timed(model, texts, args.batch_size)
+
+        jobs, cvs = embeddings[:len(job_texts)], embeddings[len(job_texts):]
+        top = np.argsort(-(cvs @ jobs.T), axis=1)[:, :5]
+
+        if reference is None:
+            reference, reference_top = embeddings, top
+            print(f"   {backend:<10} {throughput:>10.1f} {'réf.':>10} {'réf.':>10} {'réf.':>8}")
+            continue
+
+        cosines = np.sum(reference * embeddings, axis=1)
+        agreement = np.mean([
+            len(set(a) & set(b)) / 5 for a, b in zip(reference_top.tolist(), top.tolist())
+        ])
+        print(
+            f"   {backend:<10} {throughput:>10.1f} {cosines.mean():>10.4f} "
+            f"{cosines.min():>10.4f} {agreement:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Construction du cache d'embeddings du catalogue métiers (mode build)
+
+Encode les textes métiers (et, avec --fields, les textes par champ) absents
+du cache, par blocs, avec un pool de processus. Chaque bloc est écrit sur
+disque dès qu'il est encodé: une construction interrompue (Ctrl+C, arrêt de
+la machine) reprend au dernier bloc terminé en relançant la même commande.
+
+Le serveur réutilise ensuite le cache au démarrage sans rien ré-encoder.
+
+Usage:
+    python scripts/build_catalogue_embeddings.py
+    python scripts/build_catalogue_embeddings.py --processes 4 --chunk-size 512 --fields
+    python scripts/build_catalogue_embeddings.py --backend onnx-int8
+
+Auteur: JobMatchAI Team
+"""
+
+import argparse
+import os
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.catalogue_builder import EncoderPool, build_embeddings
+from services.encoder import ENCODER_BACKENDS, encoder_id, get_encoder_backend, load_encoder
+from services.semantic_matcher import MODEL_NAME, semantic_matcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction du cache d'embeddings du catalogue")
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help="Nombre de processus d'encodage (1 = dans le processus courant)")
+    parser.add_argument('--chunk-size', type=int, default=256, help="Textes par bloc (une sauvegarde par bloc)")
+    parser.add_argument('--backend', choices=ENCODER_BACKENDS, default=None,
+                        help="Backend de l'encodeur (défaut: MATCHER_ENCODER_BACKEND)")
+    parser.add_argument('--fields', action='store_true',
+                        help="Encoder aussi les champs séparés (défaut: MATCHER_FIELD_EMBEDDINGS)")
+    args = parser.parse_args()
+
+    backend = args.backend or get_encoder_backend()
+    if args.fields:
+        semantic_matcher.field_embeddings = True
+
+    jobs = semantic_matcher.jobs_data
+    if not jobs:
+        print("❌ Aucun métier chargé")
+        return
+
+    requests = semantic_matcher.embedding_requests(
+        jobs, semantic_matcher.jobs_file, semantic_matcher.catalogue_version,
+        encoder_id(MODEL_NAME, backend)
+    )
+
+    print("=" * 70)
+    print(f"🏗️  BUILD DU CATALOGUE: {len(jobs)} métiers, {len(requests)} matrice(s), backend {backend}")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    try:
+        with EncoderPool(partial(load_encoder, MODEL_NAME, backend), args.processes) as pool:
+            matrices = build_embeddings(requests, pool, chunk_size=args.chunk_size)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    for (cache, _), matrix in zip(requests, matrices):
+        print(f"💾 {cache.matrix_path.name}: {matrix.shape[0]} × {matrix.shape[1]}")
+    print(f"✅ Terminé en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
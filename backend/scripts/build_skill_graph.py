@@ -0,0 +1,183 @@
+"""
+Construction hors ligne du graphe de proximité entre compétences
+
+Relie les compétences du catalogue métiers (fiches ROME), des formations et
+du dictionnaire d'alias par deux signaux:
+- similarité des embeddings des noms de compétences (ex: PyTorch / TensorFlow)
+- co-occurrence dans les mêmes fiches métiers (coefficient d'Ochiai)
+
+Les deux sont combinés en un poids dans [0, 1] (OU probabiliste:
+1 - (1 - similarité) * (1 - c * co-occurrence)). La co-occurrence seule
+relie surtout des compétences complémentaires (JavaScript / MongoDB) et non
+interchangeables: son coefficient c (0.5 par défaut) la garde sous le poids
+minimal tant que les noms ne sont pas proches. Les arêtes trop faibles sont
+retirées du graphe (networkx) et seules les N compétences les plus proches de
+chaque compétence sont écrites dans data/skill_graph.json.
+
+Le serveur ne fait que lire ces listes (services/skill_graph.py): le crédit
+partiel d'une compétence manquante ne coûte aucun appel au modèle.
+
+Usage:
+    python scripts/build_skill_graph.py
+    python scripts/build_skill_graph.py --neighbours 8 --min-weight 0.6 --min-cooccurrence 2
+
+Auteur: JobMatchAI Team
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import networkx as nx
+except ImportError:
+    print("❌ networkx n'est pas installé: pip install networkx")
+    sys.exit(1)
+
+from services.encoder import ENCODER_BACKENDS, get_encoder_backend, load_encoder
+from services.semantic_matcher import MODEL_NAME, semantic_matcher
+from services.skill_graph import GRAPH_FILE
+from services.skill_normalizer import skill_normalizer
+from services.vector_index import normalise_rows
+
+
+def collect_skills(trainings_file: Path):
+    """Enregistre toutes les compétences connues; renvoie l'ensemble d'IDs de chaque métier"""
+    job_skill_ids = []
+    for job in semantic_matcher.jobs_data:
+        ids = set(job.required_skill_ids)
+        ids.update(skill_normalizer.register_many(job.optional_skills))
+        job_skill_ids.append(ids)
+
+    if trainings_file.exists():
+        with open(trainings_file, 'r', encoding='utf-8') as f:
+            for training in json.load(f):
+                skill_normalizer.register_many(training.get('skills_acquired', []))
+
+    return job_skill_ids
+
+
+def cooccurrence_weights(job_skill_ids, min_cooccurrence: int):
+    """Coefficient d'Ochiai n_ij / sqrt(n_i * n_j) des paires de compétences d'une même fiche"""
+    counts = Counter()
+    pairs = Counter()
+    for ids in job_skill_ids:
+        counts.update(ids)
+        pairs.update(combinations(sorted(ids), 2))
+    return {
+        (i, j): n / np.sqrt(counts[i] * counts[j])
+        for (i, j), n in pairs.items() if n >= min_cooccurrence
+    }
+
+
+def similarity_candidates(embeddings: np.ndarray, neighbours: int, min_similarity: float, block: int = 1024):
+    """Paires (i, j) parmi les plus proches voisins de chaque compétence par embedding"""
+    candidates = set()
+    n = embeddings.shape[0]
+    k = min(neighbours, n - 1)
+    if k <= 0:
+        return candidates
+    for start in range(0, n, block):
+        scores = embeddings[start:start + block] @ embeddings.T
+        rows = np.arange(scores.shape[0])
+        scores[rows, rows + start] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for row, columns in enumerate(top):
+            for column in columns:
+                if scores[row, column] >= min_similarity:
+                    i, j = start + row, int(column)
+                    candidates.add((min(i, j), max(i, j)))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction du graphe de proximité entre compétences")
+    parser.add_argument('--neighbours', type=int, default=8, help="Compétences proches gardées par compétence")
+    parser.add_argument('--min-weight', type=float, default=0.6, help="Poids minimal d'une arête")
+    parser.add_argument('--min-similarity', type=float, default=0.6,
+                        help="Similarité minimale des paires candidates par embedding")
+    parser.add_argument('--min-cooccurrence', type=int, default=2,
+                        help="Nombre minimal de fiches communes d'une paire candidate par co-occurrence")
+    parser.add_argument('--cooccurrence-weight', type=float, default=0.5,
+                        help="Coefficient de la co-occurrence dans le poids d'une arête")
+    parser.add_argument('--backend', choices=ENCODER_BACKENDS, default=None,
+                        help="Backend de l'encodeur (défaut: MATCHER_ENCODER_BACKEND)")
+    parser.add_argument('--output', type=Path, default=GRAPH_FILE, help="Fichier de sortie")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    job_skill_ids = collect_skills(semantic_matcher.training_catalogue.trainings_file)
+    names = list(skill_normalizer.names)
+    if len(names) < 2:
+        print("❌ Pas assez de compétences pour construire un graphe")
+        return
+
+    print("=" * 70)
+    print(f"🕸️  GRAPHE DES COMPÉTENCES: {len(names)} compétences, {len(job_skill_ids)} métiers")
+    print("=" * 70)
+
+    print("🔢 Encodage des noms de compétences...")
+    model = load_encoder(MODEL_NAME, args.backend or get_encoder_backend())
+    embeddings = normalise_rows(model.encode(names))
+
+    cooccurrence = cooccurrence_weights(job_skill_ids, args.min_cooccurrence)
+    candidates = similarity_candidates(embeddings, args.neighbours, args.min_similarity)
+    candidates.update(cooccurrence)
+    print(f"   {len(candidates)} paires candidates ({len(cooccurrence)} par co-occurrence)")
+
+    graph = nx.Graph()
+    graph.add_nodes_from(range(len(names)))
+    for i, j in candidates:
+        similarity = max(float(embeddings[i] @ embeddings[j]), 0.0)
+        together = cooccurrence.get((i, j), 0.0)
+        weight = 1.0 - (1.0 - min(similarity, 1.0)) * (1.0 - args.cooccurrence_weight * together)
+        if weight >= args.min_weight:
+            graph.add_edge(i, j, weight=weight, similarity=similarity, cooccurrence=together)
+
+    neighbours = {}
+    for node in graph.nodes:
+        related = sorted(graph[node].items(), key=lambda item: -item[1]['weight'])[:args.neighbours]
+        if related:
+            neighbours[names[node]] = [
+                [names[other], round(edge['weight'], 3)] for other, edge in related
+            ]
+
+    output = {
+        'metadata': {
+            'model': MODEL_NAME,
+            'created_at': datetime.now().isoformat(),
+            'skills': len(names),
+            'edges': graph.number_of_edges(),
+            'neighbours': args.neighbours,
+            'min_weight': args.min_weight,
+            'cooccurrence_weight': args.cooccurrence_weight
+        },
+        'neighbours': neighbours
+    }
+    tmp = args.output.with_name(args.output.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, args.output)
+
+    connected = [c for c in nx.connected_components(graph) if len(c) > 1]
+    print(f"📊 {graph.number_of_edges()} arêtes, {len(neighbours)} compétences reliées, "
+          f"{len(connected)} groupes de compétences proches")
+    for name in list(neighbours)[:5]:
+        print(f"   {name} → {', '.join(f'{n} ({w})' for n, w in neighbours[name][:3])}")
+    print(f"💾 {args.output} ({args.output.stat().st_size / 1024:.0f} Ko)")
+    print(f"✅ Terminé en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Analysis Queue Service
+Submit/poll mode for CV analyses, with a bounded in-process worker pool
+
+Under peak load, synchronous analyses pile up until the proxy times them
+out. In queue mode a request only stores the upload and returns an ID; a
+fixed number of workers (asyncio tasks on the server's event loop) run the
+analyses in submission order and clients poll for the result.
+
+- Backpressure: at most `max_pending` analyses wait in the queue; beyond
+  that submit() raises QueueFull and the API answers 503 + Retry-After
+  instead of accepting work it can't finish in time
+- Finished analyses are kept `result_ttl` seconds for polling, then dropped;
+  at most `max_results` are kept, the oldest going first beyond that
+- Everything lives in this process: no outside service, but queued and
+  finished analyses are lost on restart (clients resubmit on 404)
+
+The job store is per process, so the API must run as a single process
+(one uvicorn worker) in queue mode: with several workers a poll reaching
+another process than the submit answers 404. Scale with
+ANALYSIS_QUEUE_WORKERS / ANALYSIS_CPU_WORKERS instead.
+"""
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    """The queue already holds its maximum number of pending analyses"""
+
+
+class AnalysisJob:
+    """One submitted analysis and its outcome"""
+
+    __slots__ = (
+        'id', 'status', 'payload', 'result', 'error', 'error_status',
+        'submitted_at', 'started_at', 'finished_at'
+    )
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.payload = payload
+        self.result = None
+        self.error = None
+        self.error_status = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+
+class AnalysisQueue:
+    """FIFO queue of analyses processed by a bounded pool of async workers"""
+
+    def __init__(
+        self,
+        handler: Callable[..., Awaitable[Any]],
+        workers: int = 2,
+        max_pending: int = 20,
+        result_ttl: float = 3600,
+        max_results: int = 1000
+    ):
+        """
+        Args:
+            handler: Coroutine function run with each job's payload as keyword arguments
+            workers: Number of analyses processed at the same time
+            max_pending: Maximum number of analyses waiting to start
+            result_ttl: Seconds a finished analysis stays available
+            max_results: Maximum number of finished analyses kept
+        """
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.result_ttl = result_ttl
+        self.max_results = max(1, max_results)
+
+        # Submission order, so queue positions are cheap to compute
+        self._jobs: 'OrderedDict[str, AnalysisJob]' = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"analysis-worker-{i}")
+            for i in range(self.workers)
+        ]
+        print(f"📬 Analysis queue started: {self.workers} workers, up to {self.max_pending} pending")
+
+    async def stop(self):
+        """Stop the workers (analyses still queued or running are abandoned)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, **payload: Any) -> AnalysisJob:
+        """
+        Queue an analysis
+
+        Raises:
+            QueueFull: if max_pending analyses are already waiting
+            RuntimeError: if the workers aren't started
+        """
+        if self._queue is None:
+            raise RuntimeError("Analysis queue is not started")
+        self._expire()
+
+        job = AnalysisJob(payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"{self.max_pending} analyses already waiting")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Job by ID (None if unknown or expired)"""
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def position(self, job: AnalysisJob) -> Optional[int]:
+        """Number of analyses queued before a waiting job (None once started)"""
+        if job.status != 'queued':
+            return None
+        ahead = 0
+        for other in self._jobs.values():
+            if other is job:
+                break
+            if other.status == 'queued':
+                ahead += 1
+        return ahead
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and activity, for monitoring"""
+        counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {'workers': self.workers, 'max_pending': self.max_pending, **counts}
+
+    def retry_after(self) -> int:
+        """Rough number of seconds before a slot frees up, for Retry-After"""
+        durations = [
+            job.finished_at - job.started_at
+            for job in self._jobs.values() if job.finished_at and job.started_at
+        ]
+        average = sum(durations) / len(durations) if durations else 5.0
+        return max(1, round(average * (self._queue.qsize() if self._queue else 0) / self.workers))
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+            # The upload isn't needed once the analysis has it
+            payload, job.payload = job.payload, None
+            try:
+                job.result = await self.handler(**payload)
+                job.status = 'done'
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.status = 'failed'
+                job.error_status = getattr(e, 'status_code', 500)
+                job.error = getattr(e, 'detail', None) or str(e)
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+                # Results accumulate even when nobody submits or polls
+                self._expire()
+
+    def _expire(self):
+        """Drop finished jobs older than result_ttl, then the oldest beyond max_results"""
+        limit = time.time() - self.result_ttl
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at
+        )
+        kept = [job for job in finished if job.finished_at >= limit][-self.max_results:]
+        for job in set(finished).difference(kept):
+            del self._jobs[job.id]
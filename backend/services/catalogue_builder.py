@@ -0,0 +1,282 @@
+"""
+Catalogue Builder Service
+Chunked, multi-process and resumable encoding of large job catalogues
+
+Filling the embedding cache (see embedding_cache) with one
+`model.encode(texts)` call runs in a single process and shows no progress.
+The build mode (scripts/build_catalogue_embeddings.py) instead:
+- collects the texts missing from every requested cache (job texts and
+  per-field texts), deduplicated as in get_or_compute_many
+- streams them in fixed-size chunks through a pool of worker processes,
+  each with its own copy of the encoder
+- appends every encoded chunk, in order, to an on-disk checkpoint matrix
+  and records the progress, so an interrupted build resumes after the last
+  completed chunk
+- finally assembles each cache from its cached rows plus the checkpoint,
+  then deletes the checkpoint
+
+Checkpoint layout (next to the embedding cache it fills):
+- <cache>.build.npy   float32 L2-normalised rows, in encoding order
+- <cache>.build.json  model name and hashes of the texts to encode
+- <cache>.build.done  number of rows written so far
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from services.embedding_cache import CACHE_FORMAT_VERSION, EmbeddingCache, text_hash
+from services.vector_index import normalise_rows
+
+
+# Encoder of the current worker process (set by _init_worker)
+_worker_model = None
+
+
+def _init_worker(load: Callable[[], Any], threads: int):
+    """Pool initializer: split the CPU threads between workers and load the encoder"""
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = load()
+
+
+def _encode_chunk(texts: List[str]) -> np.ndarray:
+    return normalise_rows(_worker_model.encode(texts))
+
+
+class EncoderPool:
+    """
+    Encode chunks of texts in worker processes, results in submission order
+
+    Nothing is loaded until the first chunk: a build with nothing to encode
+    starts no worker. With one process the encoder runs in the current
+    process. Use as a context manager so the workers are shut down.
+    """
+
+    def __init__(self, load: Callable[[], Any], processes: int = 1, model=None):
+        """
+        Args:
+            load: Picklable callable returning an encoder (run once per worker)
+            processes: Number of worker processes (1 = encode in-process)
+            model: Already loaded encoder to use in-process instead of calling load
+        """
+        self.load = load
+        self.processes = max(1, processes)
+        self.model = model
+        self._pool = None
+
+    def __enter__(self) -> 'EncoderPool':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._pool is not None:
+            if exc_type is None:
+                self._pool.close()
+            else:
+                self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def imap(self, chunks: Iterable[List[str]]) -> Iterator[np.ndarray]:
+        """L2-normalised embeddings of each chunk, in order (workers start on first use)"""
+        if self.processes > 1:
+            if self._pool is None:
+                threads = max(1, (os.cpu_count() or 1) // self.processes)
+                # 'spawn' so workers never inherit a half-initialised torch runtime
+                self._pool = multiprocessing.get_context('spawn').Pool(
+                    self.processes, initializer=_init_worker, initargs=(self.load, threads)
+                )
+            return self._pool.imap(_encode_chunk, chunks)
+        if self.model is None:
+            self.model = self.load()
+        return (normalise_rows(self.model.encode(chunk)) for chunk in chunks)
+
+
+class EncodingCheckpoint:
+    """On-disk progress of one catalogue build: encoded rows plus their text hashes"""
+
+    def __init__(self, cache: EmbeddingCache):
+        base = cache.matrix_path.with_suffix('')
+        self.model_name = cache.model_name
+        self.matrix_path = base.with_name(base.name + '.build.npy')
+        self.meta_path = base.with_name(base.name + '.build.json')
+        self.done_path = base.with_name(base.name + '.build.done')
+        self.hashes: List[str] = []
+        self.done = 0
+        self._matrix = None
+
+    def _read(self) -> Optional[Tuple[List[str], int, np.ndarray]]:
+        """(hashes, rows done, matrix) of a previous build, or None"""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            done = int(self.done_path.read_text().strip() or 0)
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            if self.meta_path.exists():
+                print(f"⚠️  Ignoring unreadable build checkpoint: {e}")
+            return None
+
+        if (
+            meta.get('format') != CACHE_FORMAT_VERSION
+            or meta.get('model') != self.model_name
+            or matrix.ndim != 2
+            or matrix.shape[0] != len(meta.get('hashes', []))
+        ):
+            return None
+        return meta['hashes'], min(done, matrix.shape[0]), matrix
+
+    def open(self, hashes: List[str]) -> List[str]:
+        """
+        Start or resume the encoding of `hashes`
+
+        Rows finished by an interrupted build are kept (also when the set of
+        texts changed since, as long as they are still needed).
+
+        Returns:
+            Hashes still to encode, in the order their rows must be appended
+        """
+        previous = self._read()
+        if previous is not None and previous[0] == hashes:
+            # Same build: continue writing into the existing file
+            self.hashes, self.done = hashes, previous[1]
+            del previous
+            if self.done:
+                self._matrix = np.load(self.matrix_path, mmap_mode='r+')
+                print(f"♻️  Resuming build: {self.done}/{len(hashes)} texts already encoded")
+            return hashes[self.done:]
+
+        old_rows = {}
+        if previous is not None:
+            needed = set(hashes)
+            old_rows = {h: i for i, h in enumerate(previous[0][:previous[1]]) if h in needed}
+        reused = [h for h in hashes if h in old_rows]
+        todo = [h for h in hashes if h not in old_rows]
+        self.hashes, self.done = reused + todo, 0
+
+        # Keep the finished rows that are still needed, in a fresh file
+        # (copied out first: the old file is replaced)
+        kept = previous[2][[old_rows[h] for h in reused]] if reused else None
+        del previous
+        self.remove()
+        if reused:
+            self._create(kept.shape[1])
+            self._write(kept)
+            print(f"♻️  Resuming build: {len(reused)}/{len(hashes)} texts reused from the previous checkpoint")
+        return todo
+
+    def _create(self, dim: int):
+        """Create the checkpoint files for self.hashes with `dim` columns"""
+        tmp = self.matrix_path.with_name(self.matrix_path.name + '.tmp')
+        np.lib.format.open_memmap(
+            tmp, mode='w+', dtype=np.float32, shape=(len(self.hashes), dim)
+        ).flush()
+        os.replace(tmp, self.matrix_path)
+        self._write_atomic(self.done_path, '0')
+        self._write_atomic(self.meta_path, json.dumps({
+            'format': CACHE_FORMAT_VERSION,
+            'model': self.model_name,
+            'hashes': self.hashes
+        }))
+        self._matrix = np.load(self.matrix_path, mmap_mode='r+')
+
+    def append(self, vectors: np.ndarray):
+        """Write the next encoded rows and record the progress"""
+        if self._matrix is None:
+            self._create(vectors.shape[1])
+        self._write(vectors)
+
+    def _write(self, vectors: np.ndarray):
+        self._matrix[self.done:self.done + len(vectors)] = vectors
+        # Rows reach the disk before the progress that covers them
+        self._matrix.flush()
+        self.done += len(vectors)
+        self._write_atomic(self.done_path, str(self.done))
+
+    def vectors(self) -> Dict[str, np.ndarray]:
+        """Encoded rows keyed by text hash (views into the checkpoint matrix)"""
+        if self._matrix is None:
+            return {}
+        return dict(zip(self.hashes[:self.done], self._matrix[:self.done]))
+
+    def remove(self):
+        """Delete the checkpoint files"""
+        self._matrix = None
+        for path in (self.matrix_path, self.meta_path, self.done_path):
+            if path.exists():
+                path.unlink()
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str):
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(content, encoding='utf-8')
+        os.replace(tmp, path)
+
+
+def build_embeddings(
+    requests: Sequence[Tuple[EmbeddingCache, List[str]]],
+    pool: EncoderPool,
+    chunk_size: int = 256
+) -> List[np.ndarray]:
+    """
+    Fill several embedding caches with chunked, resumable encoding
+
+    Args:
+        requests: (cache, texts in catalogue order) pairs; the checkpoint
+            sits next to the first cache
+        pool: Open EncoderPool
+        chunk_size: Texts per chunk (one checkpoint write per chunk)
+
+    Returns:
+        One memory-mapped float32 matrix per request (as get_or_compute_many)
+    """
+    missing = {}
+    for cache, texts in requests:
+        for text in cache.missing_texts(texts):
+            missing.setdefault(text_hash(text), text)
+
+    checkpoint = EncodingCheckpoint(requests[0][0])
+    todo = checkpoint.open(list(missing.keys()))
+
+    if todo:
+        total = len(checkpoint.hashes)
+        print(
+            f"Encoding {len(todo)} texts in chunks of {chunk_size} "
+            f"with {pool.processes} process(es)..."
+        )
+        chunks = (
+            [missing[h] for h in todo[start:start + chunk_size]]
+            for start in range(0, len(todo), chunk_size)
+        )
+        start_time = time.perf_counter()
+        start_done = checkpoint.done
+        try:
+            for vectors in pool.imap(chunks):
+                checkpoint.append(vectors)
+                rate = (checkpoint.done - start_done) / max(time.perf_counter() - start_time, 1e-9)
+                print(
+                    f"   {checkpoint.done}/{total} texts "
+                    f"({rate:.0f}/s, ~{(total - checkpoint.done) / max(rate, 1e-9):.0f}s left)"
+                )
+        except KeyboardInterrupt:
+            print(f"⏸️  Build interrupted: {checkpoint.done}/{total} texts saved, run again to resume")
+            raise
+
+    new_vectors = checkpoint.vectors()
+    # Rows another process dropped from a cache meanwhile are encoded in one go
+    def encode(texts):
+        return np.concatenate(list(pool.imap([texts])))
+
+    matrices = [cache.build(texts, new_vectors, encode) for cache, texts in requests]
+    del new_vectors
+    checkpoint.remove()
+    return matrices
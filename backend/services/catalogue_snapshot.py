@@ -0,0 +1,86 @@
+"""
+Catalogue Snapshot
+Immutable view of the job catalogue used by one matching request
+
+SemanticMatcher publishes a new snapshot for every catalogue change
+(upsert, removal, compaction) by swapping a single attribute, so a request
+that grabbed a snapshot keeps a consistent set of jobs, index rows and skill
+matrices for its whole duration.
+
+Rows are append-only between compactions:
+- a changed job is appended as a new row and its old row is tombstoned
+- a removed job is only tombstoned
+- appended rows are added to the vector index in place and to the text
+  indexes with add(), which returns new index objects for the next snapshot
+- the vector index may already hold rows appended for a newer snapshot;
+  they are ignored because they fall past the end of `alive`
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.job_catalogue import JobRecord
+from services.lexical_index import BM25Index
+from services.skill_index import SkillIndex
+
+
+class CatalogueSnapshot:
+    """Jobs, vector index and text indexes of one catalogue generation"""
+
+    def __init__(
+        self,
+        jobs: List[JobRecord],
+        text_hashes: List[Optional[str]],
+        alive: np.ndarray,
+        positions: Dict[str, int],
+        skill_index: SkillIndex,
+        lexical_index: BM25Index,
+        index=None,
+        generation: int = 0,
+        fields=None
+    ):
+        """
+        Args:
+            jobs: Job records, one per index row (tombstoned rows included)
+            text_hashes: Hash of the embedded text of each row (None if not encoded yet)
+            alive: Boolean mask of live rows
+            positions: Job id → row of its live version
+            skill_index: Skill/title matrices over `jobs`
+            lexical_index: BM25 index over the titles, appellations and skills of `jobs`
+            index: VectorIndex over the job embeddings (None until the model is loaded)
+            generation: Incremented on every published change
+            fields: Optional FieldEmbeddings aligned with `jobs` (per-field scoring)
+        """
+        self.jobs = jobs
+        self.text_hashes = text_hashes
+        self.alive = alive
+        self.positions = positions
+        self.skill_index = skill_index
+        self.lexical_index = lexical_index
+        self.index = index
+        self.generation = generation
+        self.fields = fields
+        self.n_dead = int(len(alive) - np.count_nonzero(alive))
+
+    @property
+    def n_alive(self) -> int:
+        return len(self.alive) - self.n_dead
+
+    def live_jobs(self) -> List[JobRecord]:
+        """Live jobs in row order"""
+        if not self.n_dead:
+            return self.jobs
+        return [job for job, alive in zip(self.jobs, self.alive) if alive]
+
+    def filter_ids(self, scores: np.ndarray, ids: np.ndarray, k: int):
+        """
+        Drop padding, tombstoned rows and rows newer than this snapshot from
+        one ranked (scores, ids) row, keeping the first k
+
+        Returns:
+            (scores, ids) arrays, best first
+        """
+        valid = (ids >= 0) & (ids < len(self.alive))
+        valid[valid] = self.alive[ids[valid]]
+        return scores[valid][:k], ids[valid][:k]
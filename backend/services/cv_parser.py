@@ -11,6 +11,9 @@ Uses:
 - PyPDF2 for PDF extraction
 - python-docx for DOCX extraction
 - OpenAI GPT-5-nano for intelligent text structuring
+
+parse_file blocks; API endpoints use parse_file_async, which runs the text
+extraction in an executor and awaits the GPT call (AsyncOpenAI).
 """
 
 import re
@@ -18,7 +21,8 @@ import os
 import json
 from typing import Dict, List, Optional
 import io
-from openai import OpenAI
+import asyncio
+from openai import AsyncOpenAI, OpenAI
 
 try:
     import PyPDF2
@@ -41,10 +45,13 @@ class CVParser:
         
         if self.api_key:
             self.client = OpenAI(api_key=self.api_key)
+            # Client of parse_file_async, so the API call doesn't block the event loop
+            self.async_client = AsyncOpenAI(api_key=self.api_key)
             self.gpt_available = True
         else:
             print("⚠️  Warning: OPENAI_API_KEY not found. CV parsing will use basic regex.")
             self.client = None
+            self.async_client = None
             self.gpt_available = False
         
         # Fallback patterns (si GPT non disponible)
@@ -75,12 +82,7 @@ class CVParser:
             Dictionary with extracted CV information
         """
         # Step 1: Extract raw text based on file type
-        if 'pdf' in content_type.lower():
-            text = self._extract_text_from_pdf(file_content)
-        elif 'word' in content_type.lower() or 'docx' in content_type.lower():
-            text = self._extract_text_from_docx(file_content)
-        else:
-            raise ValueError(f"Unsupported file type: {content_type}")
+        text = self.extract_text(file_content, content_type)
         
         # Step 2: Use GPT to structure the text (if available)
         if self.gpt_available and text.strip():
@@ -96,6 +98,48 @@ class CVParser:
             # Fallback to regex parsing
             return self._parse_with_regex(text)
     
+    async def parse_file_async(self, file_content: bytes, content_type: str, executor=None) -> Dict:
+        """
+        Async version of parse_file for use from the event loop
+        
+        Text extraction (CPU) runs in `executor` (default: the loop's default
+        executor) and the GPT call is awaited on the async OpenAI client.
+        
+        Args:
+            file_content: Binary content of the file
+            content_type: MIME type of the file
+            executor: concurrent.futures executor for the text extraction
+            
+        Returns:
+            Dictionary with extracted CV information
+        """
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(executor, self.extract_text, file_content, content_type)
+        
+        if self.gpt_available and text.strip():
+            try:
+                response = await self.async_client.chat.completions.create(**self._gpt_request(text))
+                cv_data = self._read_gpt_response(response)
+                cv_data['raw_text'] = text  # Keep original text
+                return cv_data
+            except Exception as e:
+                print(f"⚠️  GPT parsing failed: {e}. Falling back to regex.")
+        return await loop.run_in_executor(executor, self._parse_with_regex, text)
+    
+    async def aclose(self):
+        """Close the async OpenAI client (call on application shutdown)"""
+        if self.async_client is not None:
+            await self.async_client.close()
+    
+    def extract_text(self, file_content: bytes, content_type: str) -> str:
+        """Raw text of a PDF or DOCX file"""
+        if 'pdf' in content_type.lower():
+            return self._extract_text_from_pdf(file_content)
+        elif 'word' in content_type.lower() or 'docx' in content_type.lower():
+            return self._extract_text_from_docx(file_content)
+        else:
+            raise ValueError(f"Unsupported file type: {content_type}")
+    
     def _extract_text_from_pdf(self, file_content: bytes) -> str:
         """Extract text from PDF file"""
         if PyPDF2 is None:
@@ -140,6 +184,11 @@ class CVParser:
         Returns:
             Structured CV data dictionary
         """
+        response = self.client.chat.completions.create(**self._gpt_request(text))
+        return self._read_gpt_response(response)
+    
+    def _gpt_request(self, text: str) -> Dict:
+        """Arguments of the chat completion call that structures a CV text"""
         prompt = f"""Tu es un expert en analyse de CV. Extrais les informations suivantes du CV ci-dessous et retourne-les au format JSON strict.
 
 Structure JSON attendue :
@@ -169,17 +218,19 @@ CV à analyser :
 
 Réponds UNIQUEMENT avec le JSON, sans texte avant ou après."""
 
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "Tu es un assistant qui extrait des données structurées de CV. Tu réponds UNIQUEMENT en JSON valide."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,  # Low temperature for consistent extraction
+            max_tokens=1000
+        )
+    
+    def _read_gpt_response(self, response) -> Dict:
+        """Structured CV data from a chat completion response"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Tu es un assistant qui extrait des données structurées de CV. Tu réponds UNIQUEMENT en JSON valide."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # Low temperature for consistent extraction
-                max_tokens=1000
-            )
-            
             # Parse JSON response
             json_str = response.choices[0].message.content.strip()
             
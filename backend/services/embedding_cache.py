@@ -0,0 +1,273 @@
+"""
+Embedding Cache Service
+Persist job embeddings on disk so workers don't re-encode the catalogue at startup
+
+Layout (next to the catalogue file):
+- <catalogue>.<model>.npy        float32 matrix of L2-normalised rows, one per job text
+- <catalogue>.<model>.meta.json  model name, catalogue version and per-row text hashes
+- <catalogue>.<field>.<model>.*  same, for a per-field matrix (see field_embeddings)
+
+Rows are keyed by a hash of the exact text that was encoded, so only new or
+changed texts are ever sent to the model. The matrix is loaded memory-mapped.
+
+Several processes (uvicorn workers, the build script) may fill the same
+cache: rewrites are serialised by a <catalogue>.<model>.lock file lock and
+written to unique temporary files, so a published matrix is always whole.
+"""
+
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from filelock import FileLock
+    FILELOCK_AVAILABLE = True
+except ImportError:
+    FILELOCK_AVAILABLE = False
+
+from services.vector_index import normalise_rows
+
+
+# Bump when the on-disk layout or the way rows are produced changes
+# (2: rows are stored L2-normalised)
+CACHE_FORMAT_VERSION = 2
+
+
+def text_hash(text: str) -> str:
+    """Stable hash of the exact text sent to the encoder"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk, memory-mapped cache of text embeddings for one catalogue and one model"""
+
+    def __init__(
+        self,
+        catalogue_file: Path,
+        model_name: str,
+        catalogue_version: str = '',
+        field: str = ''
+    ):
+        self.model_name = model_name
+        self.catalogue_version = catalogue_version
+
+        model_slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        stem = f"{catalogue_file.stem}.{field}" if field else catalogue_file.stem
+        base = f"{stem}.{model_slug}"
+        self.matrix_path = catalogue_file.parent / f"{base}.npy"
+        self.meta_path = catalogue_file.parent / f"{base}.meta.json"
+        self.lock_path = catalogue_file.parent / f"{base}.lock"
+
+    def _lock(self):
+        """Inter-process lock guarding rewrites of this cache"""
+        if not FILELOCK_AVAILABLE:
+            print("⚠️  filelock is not installed: concurrent cache rebuilds are not serialised")
+            return nullcontext()
+        return FileLock(str(self.lock_path))
+
+    def _temp_path(self, path: Path) -> Path:
+        """Unique temporary file next to `path` (same filesystem, so os.replace is atomic)"""
+        fd, name = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+        os.close(fd)
+        return Path(name)
+
+    def _read_meta(self) -> Optional[Dict]:
+        """Read the sidecar metadata, or None if missing/incompatible"""
+        if not self.meta_path.exists() or not self.matrix_path.exists():
+            return None
+
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable embedding cache metadata: {e}")
+            return None
+
+        if meta.get('format') != CACHE_FORMAT_VERSION or meta.get('model') != self.model_name:
+            print("ℹ️  Embedding cache was built with another model/format, rebuilding")
+            return None
+
+        return meta
+
+    def _load_matrix(self, meta: Dict) -> Optional[np.ndarray]:
+        """Memory-map the cached matrix, checking it agrees with its metadata"""
+        try:
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable embedding cache: {e}")
+            return None
+
+        if matrix.ndim != 2 or matrix.shape[0] != len(meta.get('hashes', [])):
+            print("⚠️  Embedding cache is inconsistent with its metadata, rebuilding")
+            return None
+
+        return matrix
+
+    def missing_texts(self, texts: List[str]) -> List[str]:
+        """Return the (deduplicated) texts that have no cached embedding yet"""
+        meta = self._read_meta()
+        cached = set(meta['hashes']) if meta else set()
+
+        missing = {}
+        for text in texts:
+            h = text_hash(text)
+            if h not in cached and h not in missing:
+                missing[h] = text
+        return list(missing.values())
+
+    def build(
+        self,
+        texts: List[str],
+        new_vectors: Dict[str, np.ndarray],
+        encode: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Assemble the matrix for `texts` from cached rows and freshly encoded ones
+
+        The cache is re-read under the lock: another process may have
+        rewritten it since missing_texts() was called. Rows it no longer
+        holds are encoded with `encode`.
+
+        Args:
+            texts: Texts in catalogue order (one row each)
+            new_vectors: L2-normalised embeddings of texts that were not cached, keyed by text_hash
+            encode: Function encoding a list of texts into a 2D array, for
+                rows neither cached nor in new_vectors
+
+        Returns:
+            Memory-mapped float32 matrix aligned with `texts`
+
+        Raises:
+            RuntimeError: Rows are missing and no encode function was given
+        """
+        hashes = [text_hash(t) for t in texts]
+
+        with self._lock():
+            meta = self._read_meta()
+            old = self._load_matrix(meta) if meta else None
+            old_rows = {h: i for i, h in enumerate(meta['hashes'])} if old is not None else {}
+
+            # Nothing changed: reuse the file as-is
+            if (
+                old is not None
+                and meta['hashes'] == hashes
+                and meta.get('catalogue_version') == self.catalogue_version
+            ):
+                return old
+
+            if old is not None and meta.get('catalogue_version') != self.catalogue_version:
+                print(
+                    f"ℹ️  Catalogue version changed "
+                    f"({meta.get('catalogue_version')} → {self.catalogue_version}), reusing unchanged rows"
+                )
+
+            stale = {
+                h: text for h, text in zip(hashes, texts)
+                if h not in new_vectors and h not in old_rows
+            }
+            if stale:
+                if encode is None:
+                    raise RuntimeError(
+                        f"{len(stale)} rows of {self.matrix_path.name} are neither cached nor encoded"
+                    )
+                print(f"Encoding {len(stale)} texts dropped from the cache by another process...")
+                new_vectors = {**new_vectors, **dict(zip(stale, normalise_rows(encode(list(stale.values())))))}
+
+            if old is not None:
+                dim = old.shape[1]
+            elif new_vectors:
+                dim = len(next(iter(new_vectors.values())))
+            else:
+                dim = 0
+
+            tmp_matrix = self._temp_path(self.matrix_path)
+            tmp_meta = self._temp_path(self.meta_path)
+            try:
+                matrix = np.lib.format.open_memmap(
+                    tmp_matrix, mode='w+', dtype=np.float32, shape=(len(texts), dim)
+                )
+                reused = 0
+                for i, h in enumerate(hashes):
+                    if h in new_vectors:
+                        matrix[i] = new_vectors[h]
+                    else:
+                        matrix[i] = old[old_rows[h]]
+                        reused += 1
+                matrix.flush()
+                del matrix
+                # Release the old mapping before replacing the file (required on Windows)
+                del old
+
+                with open(tmp_meta, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'format': CACHE_FORMAT_VERSION,
+                        'model': self.model_name,
+                        'catalogue_version': self.catalogue_version,
+                        'dim': dim,
+                        'hashes': hashes
+                    }, f)
+
+                os.replace(tmp_matrix, self.matrix_path)
+                os.replace(tmp_meta, self.meta_path)
+            finally:
+                for tmp in (tmp_matrix, tmp_meta):
+                    if tmp.exists():
+                        tmp.unlink()
+
+            print(f"💾 Embedding cache updated: {reused} rows reused, {len(texts) - reused} encoded")
+            return np.load(self.matrix_path, mmap_mode='r')
+
+    def get_or_compute(
+        self,
+        texts: List[str],
+        encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return embeddings for `texts`, encoding only rows missing from the cache
+
+        Args:
+            texts: Texts in catalogue order
+            encode: Function encoding a list of texts into a 2D array
+
+        Returns:
+            Memory-mapped float32 matrix aligned with `texts`
+        """
+        return get_or_compute_many([(self, texts)], encode)[0]
+
+
+def get_or_compute_many(
+    requests: Sequence[Tuple[EmbeddingCache, List[str]]],
+    encode: Callable[[List[str]], np.ndarray]
+) -> List[np.ndarray]:
+    """
+    Fill several caches with a single encoding pass
+
+    The texts missing from any of the caches are deduplicated and encoded
+    together, then each cache is rebuilt from its own rows.
+
+    Args:
+        requests: (cache, texts in catalogue order) pairs
+        encode: Function encoding a list of texts into a 2D array
+
+    Returns:
+        One memory-mapped float32 matrix per request
+    """
+    missing = {}
+    for cache, texts in requests:
+        for text in cache.missing_texts(texts):
+            missing.setdefault(text_hash(text), text)
+
+    new_vectors = {}
+    if missing:
+        print(f"Encoding {len(missing)} new or changed texts...")
+        vectors = normalise_rows(encode(list(missing.values())))
+        new_vectors = dict(zip(missing.keys(), vectors))
+
+    return [cache.build(texts, new_vectors, encode) for cache, texts in requests]
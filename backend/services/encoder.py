@@ -0,0 +1,113 @@
+"""
+Encoder Service
+Load the sentence-transformers encoder with a configurable inference backend
+
+Backends (MATCHER_ENCODER_BACKEND):
+- torch:     PyTorch model (default)
+- onnx:      ONNX export run with onnxruntime
+- onnx-int8: ONNX export with dynamic int8 quantisation, for CPU-only nodes
+
+The quantised model is exported once into backend/models/ and reused.
+Requires: pip install "sentence-transformers[onnx]" for the ONNX backends
+"""
+
+from pathlib import Path
+import os
+import re
+
+try:
+    from sentence_transformers import SentenceTransformer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+
+ENCODER_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+MODELS_DIR = Path(__file__).parent.parent / 'models'
+
+
+def get_encoder_backend() -> str:
+    """Configured encoder backend (MATCHER_ENCODER_BACKEND, default 'torch')"""
+    backend = os.getenv('MATCHER_ENCODER_BACKEND', 'torch').lower()
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(
+            f"Unknown encoder backend: {backend} (choose from {', '.join(ENCODER_BACKENDS)})"
+        )
+    return backend
+
+
+def encoder_id(model_name: str, backend: str) -> str:
+    """
+    Identifier of the embeddings a (model, backend) pair produces
+
+    Used as the embedding cache key: quantised embeddings differ slightly
+    from the PyTorch ones and must not be mixed with them.
+    """
+    if backend == 'torch':
+        return model_name
+    if backend == 'onnx-int8':
+        return f"{model_name}-onnx-qint8-{_quantization_config()}"
+    return f"{model_name}-{backend}"
+
+
+def _quantization_config() -> str:
+    """onnxruntime quantisation preset (arm64, avx2, avx512, avx512_vnni)"""
+    return os.getenv('MATCHER_ONNX_QUANTIZATION', 'avx2')
+
+
+def _export_quantized_model(model_name: str, config: str) -> Path:
+    """Export the model to ONNX with dynamic int8 quantisation (once)"""
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    export_dir = MODELS_DIR / re.sub(r'[^A-Za-z0-9_.-]+', '_', f"{model_name}-onnx")
+    quantized_file = export_dir / 'onnx' / f"model_qint8_{config}.onnx"
+
+    if not quantized_file.exists():
+        print(f"📦 Exporting {model_name} to ONNX with int8 quantisation ({config})...")
+        model = SentenceTransformer(model_name, backend='onnx')
+        model.save_pretrained(str(export_dir))
+        export_dynamic_quantized_onnx_model(
+            model,
+            quantization_config=config,
+            model_name_or_path=str(export_dir),
+            push_to_hub=False
+        )
+        print(f"✅ Quantised model saved to {quantized_file}")
+
+    return quantized_file
+
+
+def load_encoder(model_name: str, backend: str = None):
+    """
+    Load the sentence-transformers encoder for the given backend
+
+    Args:
+        model_name: Hugging Face model name
+        backend: 'torch', 'onnx' or 'onnx-int8' (default: MATCHER_ENCODER_BACKEND)
+
+    Returns:
+        SentenceTransformer instance
+    """
+    if not TRANSFORMERS_AVAILABLE:
+        raise ImportError(
+            "sentence-transformers is not installed. "
+            "Install it with: pip install sentence-transformers"
+        )
+
+    backend = backend or get_encoder_backend()
+
+    if backend == 'onnx':
+        return SentenceTransformer(model_name, backend='onnx')
+
+    if backend == 'onnx-int8':
+        config = _quantization_config()
+        quantized_file = _export_quantized_model(model_name, config)
+        export_dir = quantized_file.parent.parent
+        return SentenceTransformer(
+            str(export_dir),
+            backend='onnx',
+            model_kwargs={'file_name': f"onnx/{quantized_file.name}"}
+        )
+
+    return SentenceTransformer(model_name)
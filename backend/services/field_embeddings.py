@@ -0,0 +1,182 @@
+"""
+Field Embeddings Service
+Per-field job embeddings (title, description, skills, appellations) with
+weighted late fusion
+
+Instead of one vector for "title. description. Compétences: ...", each field
+gets its own L2-normalised matrix, and a per-request weight vector combines
+the similarities of a CV to every field of a job:
+
+    score(cv, job) = sum_f w_f * cos(cv, job_f)      (weights sum to 1)
+
+Changing the weights never requires re-encoding anything.
+
+The field matrices are kept as given (memory-mapped embedding caches are not
+copied into RAM); rows appended by upserts live in a small in-memory block.
+Field scoring is always a brute-force scan of every row: it does not go
+through MATCHER_INDEX_BACKEND / MATCHER_SHARDS, which only apply to the
+single-vector index. Budget one matrix product per weighted field and query.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from services.job_catalogue import JobRecord
+from services.vector_index import normalise_rows, top_k
+
+
+JOB_FIELDS = ('title', 'description', 'skills', 'appellations')
+
+DEFAULT_FIELD_WEIGHTS = 'title=0.25,description=0.25,skills=0.35,appellations=0.15'
+
+
+def job_field_texts(job: JobRecord) -> List[str]:
+    """
+    Text of each field of a job, in JOB_FIELDS order
+
+    Jobs without appellations use their title for that field.
+    """
+    return [
+        job.title,
+        job.description,
+        f"Compétences: {', '.join(job.required_skills)}",
+        ', '.join(job.appellations or (job.title,))
+    ]
+
+
+def parse_field_weights(weights: Union[str, Dict[str, float]]) -> np.ndarray:
+    """
+    Normalised weight vector (JOB_FIELDS order) from a dict or a
+    'field=weight,...' string; unlisted fields get 0
+
+    Raises:
+        ValueError: Unknown field, negative weight or all weights zero
+    """
+    if isinstance(weights, str):
+        pairs = {}
+        for item in weights.split(','):
+            if not item.strip():
+                continue
+            name, _, value = item.partition('=')
+            try:
+                pairs[name.strip().lower()] = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid field weight: {item.strip()!r} (expected field=weight)")
+        weights = pairs
+
+    unknown = [name for name in weights if name not in JOB_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)} (choose from {', '.join(JOB_FIELDS)})"
+        )
+
+    vector = np.array([float(weights.get(field, 0.0)) for field in JOB_FIELDS], dtype=np.float32)
+    if (vector < 0).any() or vector.sum() <= 0:
+        raise ValueError("Field weights must be non-negative and not all zero")
+    return vector / vector.sum()
+
+
+class FieldEmbeddings:
+    """Immutable per-field embedding matrices, aligned with catalogue rows"""
+
+    # Extra candidates rescored beyond k (see ExactIndex)
+    rescore_margin = 16
+
+    def __init__(self, matrices: Sequence[np.ndarray], extra: Optional[np.ndarray] = None):
+        """
+        Args:
+            matrices: One (n_jobs, dim) float32 matrix of L2-normalised rows
+                per field, in JOB_FIELDS order (memory-mapped is fine)
+            extra: (len(JOB_FIELDS), n_added, dim) rows appended after them
+        """
+        self.matrices = list(matrices)
+        dim = self.matrices[0].shape[1]
+        self.extra = extra if extra is not None else np.zeros((len(self.matrices), 0, dim), dtype=np.float32)
+        self.base_size = len(self.matrices[0])
+
+    @classmethod
+    def from_matrices(cls, matrices: Sequence[np.ndarray]) -> 'FieldEmbeddings':
+        """Field embeddings over one normalised (n_jobs, dim) matrix per field (not copied if float32)"""
+        return cls([m if m.dtype == np.float32 else np.asarray(m, dtype=np.float32) for m in matrices])
+
+    def __len__(self):
+        return self.base_size + self.extra.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held in RAM (memory-mapped matrices excluded)"""
+        return self.extra.nbytes + sum(
+            m.nbytes for m in self.matrices if not isinstance(m, np.memmap)
+        )
+
+    def add(self, matrices: Sequence[np.ndarray]) -> 'FieldEmbeddings':
+        """New field embeddings with rows appended (one normalised matrix per field)"""
+        new = np.stack([np.asarray(m, dtype=np.float32) for m in matrices])
+        # Only the appended block is copied, the base matrices are shared
+        return FieldEmbeddings(self.matrices, np.concatenate([self.extra, new], axis=1))
+
+    def get_rows(self, rows: np.ndarray) -> np.ndarray:
+        """(fields, len(rows), dim) vectors of the given rows"""
+        rows = np.asarray(rows, dtype=np.int64)
+        in_base = rows < self.base_size
+        out = np.empty((len(self.matrices), len(rows), self.extra.shape[2]), dtype=np.float32)
+        for f, matrix in enumerate(self.matrices):
+            out[f, in_base] = matrix[rows[in_base]]
+            out[f, ~in_base] = self.extra[f, rows[~in_base] - self.base_size]
+        return out
+
+    def take(self, rows: np.ndarray) -> 'FieldEmbeddings':
+        """New field embeddings restricted to the given rows (copied into RAM)"""
+        return FieldEmbeddings(list(self.get_rows(rows)))
+
+    def score_rows(self, query: np.ndarray, weights: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Weighted per-field similarity of one query to the given rows"""
+        query = normalise_rows(np.asarray(query)[None, :])[0]
+        return weights @ np.sum(self.get_rows(rows) * query, axis=2)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        weights: np.ndarray,
+        k: int,
+        alive: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best rows by weighted per-field cosine similarity
+
+        Args:
+            queries: (n_queries, dim) embeddings
+            weights: Normalised weight per field (see parse_field_weights)
+            k: Number of rows to return per query
+            alive: Optional boolean mask of rows that may be returned
+
+        Returns:
+            (scores, ids) arrays of shape (n_queries, k), best first
+        """
+        queries = normalise_rows(queries)
+        n_rows = len(self)
+
+        # One product per weighted field, over the base matrix and the added rows
+        scores = np.zeros((len(queries), n_rows), dtype=np.float32)
+        for f, weight in enumerate(weights):
+            if weight:
+                scores[:, :self.base_size] += weight * (queries @ self.matrices[f].T)
+                scores[:, self.base_size:] += weight * (queries @ self.extra[f].T)
+
+        if alive is not None:
+            scores[:, ~alive] = -np.inf
+            k = min(k, int(np.count_nonzero(alive)))
+        k = min(k, n_rows)
+        _, candidates = top_k(scores, min(k + self.rescore_margin, n_rows))
+
+        # Rescored with per-pair arithmetic so a query gets the same scores
+        # alone or in a batch (GEMV and GEMM round differently)
+        candidates = np.sort(candidates, axis=1)
+        exact = np.empty(candidates.shape, dtype=np.float32)
+        for q, query in enumerate(queries):
+            exact[q] = weights @ np.sum(self.get_rows(candidates[q]) * query, axis=2)
+        if alive is not None:
+            exact[~alive[candidates]] = -np.inf
+        best_scores, order = top_k(exact, k)
+        return best_scores, np.take_along_axis(candidates, order, axis=1)
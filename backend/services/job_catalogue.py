@@ -0,0 +1,141 @@
+"""
+Job Catalogue
+Compact in-memory representation of the jobs of the catalogue
+
+Catalogue files hold one JSON dict per job with a dozen keys, most of which
+matching never reads. With hundreds of thousands of jobs, the dicts, their
+key tables and the many copies of the same skill strings dominate memory and
+garbage-collector work. Jobs are kept instead as:
+- JobRecord objects with __slots__ (fixed fields, no per-instance dict)
+- skills and appellations as tuples of interned strings, so "Python" is
+  stored once however many jobs require it, plus the canonical IDs of the
+  required skills (see skill_normalizer)
+- descriptions packed into one UTF-8 buffer per load (or upsert batch),
+  decoded only when a result or an embedding text needs them
+
+The job id (job_id, else rome_code, else id) is resolved once, at load time.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+import sys
+
+import numpy as np
+
+
+def _intern(value):
+    """Interned copy of a string (other values unchanged)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _interned_tuple(values: Optional[Iterable[str]]) -> tuple:
+    return tuple(sys.intern(v) for v in values) if values else ()
+
+
+class DescriptionBlock:
+    """Descriptions of a batch of jobs stored as one UTF-8 buffer plus offsets"""
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self, texts: Sequence[str]):
+        encoded = [text.encode('utf-8') for text in texts]
+        self.data = b''.join(encoded)
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=self.offsets[1:])
+
+    def get(self, position: int) -> str:
+        """Decoded description at a position of the block"""
+        return self.data[self.offsets[position]:self.offsets[position + 1]].decode('utf-8')
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.nbytes
+
+
+class JobRecord:
+    """One job of the catalogue, with only the fields matching and results use"""
+
+    __slots__ = (
+        'job_id', 'title', 'required_skills', 'required_skill_ids', 'optional_skills',
+        'appellations', 'salary_range', 'education_level', '_descriptions', '_position'
+    )
+
+    def __init__(
+        self,
+        job_id: str,
+        title: str,
+        required_skills: tuple,
+        required_skill_ids: tuple,
+        optional_skills: tuple,
+        appellations: tuple,
+        salary_range: Optional[str],
+        education_level: Optional[str],
+        descriptions: DescriptionBlock,
+        position: int
+    ):
+        self.job_id = job_id
+        self.title = title
+        self.required_skills = required_skills
+        # Canonical skill ID of each required skill, aligned with required_skills
+        self.required_skill_ids = required_skill_ids
+        self.optional_skills = optional_skills
+        self.appellations = appellations
+        self.salary_range = salary_range
+        self.education_level = education_level
+        self._descriptions = descriptions
+        self._position = position
+
+    @property
+    def description(self) -> str:
+        """Job description, decoded on access"""
+        return self._descriptions.get(self._position)
+
+    def to_dict(self) -> Dict:
+        """Catalogue-format dict of the fields kept in the record"""
+        return {
+            'job_id': self.job_id,
+            'title': self.title,
+            'description': self.description,
+            'required_skills': list(self.required_skills),
+            'optional_skills': list(self.optional_skills),
+            'appellations': list(self.appellations),
+            'salary_range': self.salary_range,
+            'education_level': self.education_level
+        }
+
+    def __repr__(self):
+        return f"JobRecord({self.job_id!r}, {self.title!r})"
+
+
+def job_id_of(job: Dict) -> str:
+    """Identifier of a catalogue dict (ROME code for ROME fiches)"""
+    return job.get('job_id', job.get('rome_code', job.get('id', '')))
+
+
+def build_records(jobs: Sequence[Dict], normalizer) -> List[JobRecord]:
+    """
+    Compact records for catalogue dicts
+
+    Args:
+        jobs: Job dicts in the catalogue format
+        normalizer: SkillNormalizer the required skills are registered with
+
+    Returns:
+        One JobRecord per dict, in order, sharing one description buffer
+    """
+    descriptions = DescriptionBlock([job.get('description') or '' for job in jobs])
+    records = []
+    for position, job in enumerate(jobs):
+        required_skills = _interned_tuple(job.get('required_skills'))
+        records.append(JobRecord(
+            job_id=_intern(job_id_of(job)),
+            title=job.get('title') or '',
+            required_skills=required_skills,
+            required_skill_ids=normalizer.register_many(required_skills),
+            optional_skills=_interned_tuple(job.get('optional_skills')),
+            appellations=_interned_tuple(job.get('appellations')),
+            salary_range=_intern(job.get('salary_range')),
+            education_level=_intern(job.get('education_level')),
+            descriptions=descriptions,
+            position=position
+        ))
+    return records
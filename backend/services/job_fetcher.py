@@ -5,13 +5,18 @@ Fetch real job offers from France Travail (ex-Pôle Emploi)
 API Documentation: https://francetravail.io/data/api/offres-emploi
 Requires: FRANCE_TRAVAIL_CLIENT_ID and FRANCE_TRAVAIL_CLIENT_SECRET
 
+Searches exist in a blocking version (requests) and an async version
+(httpx, *_async methods) for the API endpoints, which must not block the
+event loop while France Travail answers.
+
 Author: ESSEC AI Course Project
 Date: November 1, 2025
 """
 
 import os
+import httpx
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import json
 
@@ -28,6 +33,8 @@ class JobFetcher:
         
         self.access_token = None
         self.token_expiry = None
+        # httpx client of the async methods, created on first use
+        self._async_client = None
         
         # Check if API credentials are configured
         if not self.client_id or not self.client_secret:
@@ -39,44 +46,181 @@ class JobFetcher:
             self.api_available = True
             print("✅ France Travail API credentials found")
     
+    def _cached_token(self) -> Optional[str]:
+        """Current access token if it is still valid"""
+        if self.access_token and self.token_expiry and datetime.now() < self.token_expiry:
+            return self.access_token
+        return None
+    
+    def _token_request(self) -> Dict:
+        """Arguments of the OAuth2 client-credentials request"""
+        return {
+            'headers': {
+                'Content-Type': 'application/x-www-form-urlencoded'
+            },
+            'data': {
+                'grant_type': 'client_credentials',
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'scope': 'api_offresdemploiv2 o2dsoffre'
+            }
+        }
+    
+    def _store_token(self, token_data: Dict) -> str:
+        """Cache a new access token until shortly before it expires"""
+        self.access_token = token_data['access_token']
+        
+        # Set expiry time (typically 1499 seconds)
+        expires_in = token_data.get('expires_in', 1499)
+        self.token_expiry = datetime.now() + timedelta(seconds=expires_in - 60)  # 60s safety margin
+        
+        print(f"✅ France Travail API token obtained (expires in {expires_in}s)")
+        return self.access_token
+    
     def _get_access_token(self) -> Optional[str]:
         """
         Get OAuth2 access token for France Travail API
         Token is cached and reused until expiry
         """
         # Return cached token if still valid
-        if self.access_token and self.token_expiry and datetime.now() < self.token_expiry:
-            return self.access_token
+        token = self._cached_token()
+        if token:
+            return token
         
         try:
             # Request new token
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-            data = {
-                'grant_type': 'client_credentials',
-                'client_id': self.client_id,
-                'client_secret': self.client_secret,
-                'scope': 'api_offresdemploiv2 o2dsoffre'
-            }
-            
-            response = requests.post(self.auth_url, headers=headers, data=data, timeout=10)
+            response = requests.post(self.auth_url, timeout=10, **self._token_request())
             response.raise_for_status()
-            
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            
-            # Set expiry time (typically 1499 seconds)
-            expires_in = token_data.get('expires_in', 1499)
-            self.token_expiry = datetime.now() + timedelta(seconds=expires_in - 60)  # 60s safety margin
-            
-            print(f"✅ France Travail API token obtained (expires in {expires_in}s)")
-            return self.access_token
+            return self._store_token(response.json())
             
         except requests.exceptions.RequestException as e:
             print(f"❌ Failed to get France Travail API token: {e}")
             return None
     
+    async def _get_access_token_async(self) -> Optional[str]:
+        """Async version of _get_access_token (same token cache)"""
+        token = self._cached_token()
+        if token:
+            return token
+        
+        try:
+            response = await self._get_async_client().post(
+                self.auth_url, timeout=10, **self._token_request()
+            )
+            response.raise_for_status()
+            return self._store_token(response.json())
+            
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError: body is not JSON (requests raises it as a RequestException)
+            print(f"❌ Failed to get France Travail API token: {e}")
+            return None
+    
+    def _get_async_client(self) -> "httpx.AsyncClient":
+        """Shared async HTTP client (connection pooling across requests)"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient()
+        return self._async_client
+    
+    async def aclose(self):
+        """Close the async HTTP client (call on application shutdown)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    def _search_params(
+        self,
+        rome_codes: Optional[List[str]],
+        keywords: Optional[List[str]],
+        location: Optional[str],
+        max_results: int,
+        experience: Optional[str]
+    ) -> Dict:
+        """Query parameters of an offer search"""
+        # Build search parameters
+        params = {
+            'range': f'0-{min(max_results - 1, 149)}',  # API max is 150
+            'sort': '1',  # Sort by date (most recent first)
+        }
+        
+        print(f"🔍 DEBUG - Input parameters:")
+        print(f"   rome_codes: {rome_codes}")
+        print(f"   keywords: {keywords}")
+        print(f"   location: {location}")
+        print(f"   experience: {experience}")
+        
+        # Add ROME codes filter (sanitize inputs: accept both 'M1805' and 'ROME_M1805')
+        if rome_codes:
+            cleaned = []
+            for code in rome_codes[:5]:
+                if not code:
+                    continue
+                c = str(code).upper().strip()
+                # Accept values like 'ROME_M1805' or 'M1805' -> normalize to 'M1805'
+                if c.startswith('ROME_'):
+                    c = c.split('ROME_', 1)[1]
+                # Remove any accidental prefixes like 'ROME-' or whitespace
+                c = c.replace('ROME-', '')
+                c = c.strip()
+                if c:
+                    cleaned.append(c)
+            print(f"🔍 DEBUG - Cleaned ROME codes: {cleaned}")
+            if cleaned:
+                params['codeROME'] = ','.join(cleaned)
+        
+        # Add keywords filter (use only the FIRST keyword for better results)
+        if keywords:
+            # Take only the first keyword and clean it
+            first_keyword = str(keywords[0]).strip()
+            # Remove characters that may confuse the API
+            first_keyword = first_keyword.replace(',', ' ').replace('/', ' ').replace('\\', ' ')
+            # Collapse multiple spaces
+            first_keyword = ' '.join(first_keyword.split())
+            
+            if first_keyword:
+                params['motsCles'] = first_keyword
+                print(f"🔍 DEBUG - Using keyword: '{first_keyword}'")
+        
+        # Add location filter
+        if location:
+            params['commune'] = location
+        
+        # Add experience filter
+        if experience:
+            params['experience'] = experience
+        
+        print(f"🔍 DEBUG - Final API params: {params}")
+        return params
+    
+    @staticmethod
+    def _fallback_params(params: Dict, max_results: int) -> Dict:
+        """Search parameters with every filter removed except the keywords"""
+        fallback_params = {
+            'range': f'0-{min(max_results - 1, 149)}',
+            'sort': '1',
+        }
+        if 'motsCles' in params:
+            fallback_params['motsCles'] = params['motsCles']
+        
+        print(f"🔍 DEBUG - Fallback params: {fallback_params}")
+        return fallback_params
+    
+    def _parse_results(self, data: Dict) -> List[Dict]:
+        """Job offers of a search response"""
+        print(f"🔍 DEBUG - Response data keys: {data.keys() if data else 'None'}")
+        if 'resultats' in data:
+            print(f"🔍 DEBUG - Number of results: {len(data['resultats'])}")
+        
+        # Extract job offers
+        jobs = []
+        if 'resultats' in data:
+            for offer in data['resultats']:
+                job = self._parse_job_offer(offer)
+                if job:
+                    jobs.append(job)
+        
+        print(f"✅ Found {len(jobs)} real job offers from France Travail")
+        return jobs
+    
     def search_jobs(
         self,
         rome_codes: Optional[List[str]] = None,
@@ -108,59 +252,7 @@ class JobFetcher:
             return self._get_mock_jobs()
         
         try:
-            # Build search parameters
-            params = {
-                'range': f'0-{min(max_results - 1, 149)}',  # API max is 150
-                'sort': '1',  # Sort by date (most recent first)
-            }
-            
-            print(f"🔍 DEBUG - Input parameters:")
-            print(f"   rome_codes: {rome_codes}")
-            print(f"   keywords: {keywords}")
-            print(f"   location: {location}")
-            print(f"   experience: {experience}")
-            
-            # Add ROME codes filter (sanitize inputs: accept both 'M1805' and 'ROME_M1805')
-            if rome_codes:
-                cleaned = []
-                for code in rome_codes[:5]:
-                    if not code:
-                        continue
-                    c = str(code).upper().strip()
-                    # Accept values like 'ROME_M1805' or 'M1805' -> normalize to 'M1805'
-                    if c.startswith('ROME_'):
-                        c = c.split('ROME_', 1)[1]
-                    # Remove any accidental prefixes like 'ROME-' or whitespace
-                    c = c.replace('ROME-', '')
-                    c = c.strip()
-                    if c:
-                        cleaned.append(c)
-                print(f"🔍 DEBUG - Cleaned ROME codes: {cleaned}")
-                if cleaned:
-                    params['codeROME'] = ','.join(cleaned)
-            
-            # Add keywords filter (use only the FIRST keyword for better results)
-            if keywords:
-                # Take only the first keyword and clean it
-                first_keyword = str(keywords[0]).strip()
-                # Remove characters that may confuse the API
-                first_keyword = first_keyword.replace(',', ' ').replace('/', ' ').replace('\\', ' ')
-                # Collapse multiple spaces
-                first_keyword = ' '.join(first_keyword.split())
-                
-                if first_keyword:
-                    params['motsCles'] = first_keyword
-                    print(f"🔍 DEBUG - Using keyword: '{first_keyword}'")
-            
-            # Add location filter
-            if location:
-                params['commune'] = location
-            
-            # Add experience filter
-            if experience:
-                params['experience'] = experience
-            
-            print(f"🔍 DEBUG - Final API params: {params}")
+            params = self._search_params(rome_codes, keywords, location, max_results, experience)
             
             # Make API request
             headers = {
@@ -189,18 +281,10 @@ class JobFetcher:
                 
                 # Fallback 1: Try with just keywords (no ROME codes, no experience filter)
                 if keywords:
-                    fallback_params = {
-                        'range': f'0-{min(max_results - 1, 149)}',
-                        'sort': '1',
-                    }
-                    if 'motsCles' in params:
-                        fallback_params['motsCles'] = params['motsCles']
-                    
-                    print(f"🔍 DEBUG - Fallback params: {fallback_params}")
                     fallback_response = requests.get(
                         self.search_url,
                         headers=headers,
-                        params=fallback_params,
+                        params=self._fallback_params(params, max_results),
                         timeout=15
                     )
                     
@@ -214,22 +298,7 @@ class JobFetcher:
                     return []
             
             # Parse JSON response
-            data = response.json()
-            
-            print(f"🔍 DEBUG - Response data keys: {data.keys() if data else 'None'}")
-            if 'resultats' in data:
-                print(f"🔍 DEBUG - Number of results: {len(data['resultats'])}")
-            
-            # Extract job offers
-            jobs = []
-            if 'resultats' in data:
-                for offer in data['resultats']:
-                    job = self._parse_job_offer(offer)
-                    if job:
-                        jobs.append(job)
-            
-            print(f"✅ Found {len(jobs)} real job offers from France Travail")
-            return jobs
+            return self._parse_results(response.json())
             
         except requests.exceptions.RequestException as e:
             # Print response body when available for debugging
@@ -243,6 +312,67 @@ class JobFetcher:
             print(f"⚠️  France Travail API error: {e}")
             return self._get_mock_jobs()
     
+    async def search_jobs_async(
+        self,
+        rome_codes: Optional[List[str]] = None,
+        keywords: Optional[List[str]] = None,
+        location: Optional[str] = None,
+        max_results: int = 20,
+        experience: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Async version of search_jobs (httpx), for use from the event loop
+        
+        Same arguments and results as search_jobs.
+        """
+        if not self.api_available:
+            return self._get_mock_jobs()
+        
+        token = await self._get_access_token_async()
+        if not token:
+            print("⚠️  Cannot fetch jobs: API token unavailable")
+            return self._get_mock_jobs()
+        
+        response = None
+        try:
+            params = self._search_params(rome_codes, keywords, location, max_results, experience)
+            headers = {
+                'Authorization': f'Bearer {token}',
+                'Accept': 'application/json'
+            }
+            
+            client = self._get_async_client()
+            response = await client.get(self.search_url, headers=headers, params=params, timeout=15)
+            print(f"🔍 DEBUG - Response status code: {response.status_code}")
+            response.raise_for_status()
+            
+            # Handle 204 No Content (no jobs found)
+            if response.status_code == 204:
+                print("ℹ️  No job offers found for the given criteria (HTTP 204)")
+                if not keywords:
+                    return []
+                fallback_response = await client.get(
+                    self.search_url,
+                    headers=headers,
+                    params=self._fallback_params(params, max_results),
+                    timeout=15
+                )
+                if fallback_response.status_code != 200:
+                    print(f"⚠️  Fallback also returned {fallback_response.status_code}")
+                    return []
+                print(f"✅ Fallback search succeeded!")
+                response = fallback_response
+            
+            return self._parse_results(response.json())
+            
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError: empty or non-JSON body, handled like search_jobs does
+            if response is not None:
+                print(f"⚠️  France Travail API response status: {response.status_code}")
+                print(f"⚠️  France Travail API response body: {response.text}")
+            print(f"⚠️  France Travail API error: {e}")
+            return self._get_mock_jobs()
+    
     def _parse_job_offer(self, offer: Dict) -> Optional[Dict]:
         """Parse a job offer from France Travail API response"""
         try:
@@ -339,24 +469,20 @@ class JobFetcher:
             }
         ]
     
-    def get_jobs_for_cv(
-        self, 
-        cv_data: Dict, 
-        top_rome_codes: List[str], 
+    def _search_attempts(
+        self,
+        cv_data: Dict,
+        top_rome_codes: List[str],
         recommended_jobs: List[Dict] = None,
         gpt_keywords: List[str] = None
-    ) -> List[Dict]:
+    ) -> List[Tuple[str, List[Dict]]]:
         """
-        Fetch relevant job offers based on CV analysis and recommended ROME codes
+        Searches to try for a CV, by decreasing specificity
         
-        Args:
-            cv_data: Parsed CV data with skills, experience, etc.
-            top_rome_codes: List of recommended ROME codes from semantic matching
-            recommended_jobs: List of recommended jobs from semantic matching (with titles)
-            gpt_keywords: Optimized keywords generated by GPT for job search
-            
         Returns:
-            List of relevant job offers
+            (label, search_jobs keyword arguments) per attempt; an attempt
+            only runs if the previous ones found nothing, and its searches
+            stop at the first one that finds offers
         """
         # Priority 1: Use GPT-generated keywords if available
         job_titles = []
@@ -396,56 +522,40 @@ class JobFetcher:
         
         # Strategy: Try multiple searches with decreasing specificity
         # NOTE: Per request, try keywords-only FIRST (no ROME filtering)
-        all_jobs = []
-
+        attempts = []
+        
         # Try 1: Job title only (no ROME, no experience) - keywords-only test
         if job_titles:
-            print(f"🔍 Try 1: Job title only (keywords-only, no ROME)")
-            jobs = self.search_jobs(
-                rome_codes=None,
-                keywords=[job_titles[0]],
-                max_results=20,
-                experience=None
-            )
-            all_jobs.extend(jobs)
-
+            attempts.append(("🔍 Try 1: Job title only (keywords-only, no ROME)", [
+                dict(rome_codes=None, keywords=[job_titles[0]], max_results=20, experience=None)
+            ]))
+        
         # Try 2: If no results, try with ROME codes + first job title
-        if not all_jobs and top_rome_codes and job_titles:
-            print(f"🔍 Try 2: ROME codes + first job title")
-            jobs = self.search_jobs(
-                rome_codes=top_rome_codes[:3],
-                keywords=[job_titles[0]],  # Only first title
-                max_results=20,
-                experience=experience_level
-            )
-            all_jobs.extend(jobs)
-
+        if top_rome_codes and job_titles:
+            attempts.append(("🔍 Try 2: ROME codes + first job title", [
+                dict(rome_codes=top_rome_codes[:3], keywords=[job_titles[0]],  # Only first title
+                     max_results=20, experience=experience_level)
+            ]))
+        
         # Try 3: If still no results, try with ROME codes only (no keywords)
-        if not all_jobs and top_rome_codes:
-            print(f"🔍 Try 3: ROME codes only (no keywords)")
-            jobs = self.search_jobs(
-                rome_codes=top_rome_codes[:3],
-                keywords=None,
-                max_results=20,
-                experience=experience_level
-            )
-            all_jobs.extend(jobs)
-
+        if top_rome_codes:
+            attempts.append(("🔍 Try 3: ROME codes only (no keywords)", [
+                dict(rome_codes=top_rome_codes[:3], keywords=None, max_results=20, experience=experience_level)
+            ]))
+        
         # Try 4: Last resort - broader keyword search with multiple titles
-        if not all_jobs and len(job_titles) > 1:
-            print(f"🔍 Try 4: Multiple job titles (no filters)")
-            for title in job_titles[:2]:  # Try first 2 titles separately
-                jobs = self.search_jobs(
-                    rome_codes=None,
-                    keywords=[title],
-                    max_results=10,
-                    experience=None
-                )
-                all_jobs.extend(jobs)
-                if all_jobs:
-                    break
+        if len(job_titles) > 1:
+            attempts.append(("🔍 Try 4: Multiple job titles (no filters)", [
+                # Try first 2 titles separately
+                dict(rome_codes=None, keywords=[title], max_results=10, experience=None)
+                for title in job_titles[:2]
+            ]))
         
-        # Remove duplicates based on job ID
+        return attempts
+    
+    @staticmethod
+    def _unique_jobs(all_jobs: List[Dict]) -> List[Dict]:
+        """Offers with duplicates (same job ID) removed"""
         seen_ids = set()
         unique_jobs = []
         for job in all_jobs:
@@ -456,6 +566,57 @@ class JobFetcher:
         
         print(f"✅ Total unique jobs found: {len(unique_jobs)}")
         return unique_jobs
+    
+    def get_jobs_for_cv(
+        self, 
+        cv_data: Dict, 
+        top_rome_codes: List[str], 
+        recommended_jobs: List[Dict] = None,
+        gpt_keywords: List[str] = None
+    ) -> List[Dict]:
+        """
+        Fetch relevant job offers based on CV analysis and recommended ROME codes
+        
+        Args:
+            cv_data: Parsed CV data with skills, experience, etc.
+            top_rome_codes: List of recommended ROME codes from semantic matching
+            recommended_jobs: List of recommended jobs from semantic matching (with titles)
+            gpt_keywords: Optimized keywords generated by GPT for job search
+            
+        Returns:
+            List of relevant job offers
+        """
+        all_jobs = []
+        for label, searches in self._search_attempts(cv_data, top_rome_codes, recommended_jobs, gpt_keywords):
+            if all_jobs:
+                break
+            print(label)
+            for search in searches:
+                all_jobs.extend(self.search_jobs(**search))
+                if all_jobs:
+                    break
+        
+        return self._unique_jobs(all_jobs)
+    
+    async def get_jobs_for_cv_async(
+        self, 
+        cv_data: Dict, 
+        top_rome_codes: List[str], 
+        recommended_jobs: List[Dict] = None,
+        gpt_keywords: List[str] = None
+    ) -> List[Dict]:
+        """Async version of get_jobs_for_cv (same searches, awaited over httpx)"""
+        all_jobs = []
+        for label, searches in self._search_attempts(cv_data, top_rome_codes, recommended_jobs, gpt_keywords):
+            if all_jobs:
+                break
+            print(label)
+            for search in searches:
+                all_jobs.extend(await self.search_jobs_async(**search))
+                if all_jobs:
+                    break
+        
+        return self._unique_jobs(all_jobs)
 
 
 # Singleton instance
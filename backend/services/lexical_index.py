@@ -0,0 +1,266 @@
+"""
+Lexical Index Service
+BM25 inverted index over job titles, appellations and skills
+
+Complements the dense index: exact tool names ("Kubernetes", "SAP") that a
+sentence embedding blurs are matched token for token. BM25 term weights are
+precomputed at build time and posting lists are stored impact-ordered
+(highest weight first), so a query reads at most `max_postings` entries per
+term: a handful of bounded array additions followed by a top-k selection.
+Truncation only drops the weakest matches of very common terms.
+
+Jobs upserted at runtime are indexed as new posting segments (add()) with
+the collection statistics of that moment, instead of rebuilding the index;
+small segments are merged as they accumulate and a full rebuild (reload or
+compaction) brings every weight back to the current statistics.
+
+Rankings from both indexes are combined with reciprocal rank fusion (RRF).
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import copy
+import re
+import threading
+import unicodedata
+
+import numpy as np
+from scipy import sparse
+
+from services.job_catalogue import JobRecord
+from services.vector_index import top_k
+
+
+# Frequent French/English words that carry no matching signal
+STOPWORDS = frozenset(
+    "a au aux avec d de des du en et l la le les ou par pour sur un une "
+    "and for in of on or the to with".split()
+)
+
+# Words keep inner dots and trailing +/# so "node.js", "c++" and "c#" stay whole
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:\.[0-9a-z]+)*[+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-folded word tokens without stopwords"""
+    folded = unicodedata.normalize('NFKD', text.lower())
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return [t for t in TOKEN_PATTERN.findall(folded) if t not in STOPWORDS]
+
+
+def job_lexical_tokens(job: JobRecord) -> List[str]:
+    """Tokens of the job fields searched lexically: title, appellations and skills"""
+    return tokenize(' '.join((job.title, *job.appellations, *job.required_skills, *job.optional_skills)))
+
+
+class BM25Index:
+    """Okapi BM25 over tokenised documents, stored as precomputed posting lists"""
+
+    def __init__(
+        self,
+        documents: Sequence[List[str]],
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_postings: int = 2048
+    ):
+        """
+        Args:
+            documents: Token list of each document (document id = position)
+            k1: Term frequency saturation
+            b: Document length normalisation
+            max_postings: Entries read per query term and segment (0 = whole posting list)
+        """
+        self.k1 = k1
+        self.b = b
+        self.size = 0
+        self.max_postings = max_postings
+        self._buffers = threading.local()
+        self.vocabulary: Dict[str, int] = {}
+        # Collection statistics: document frequency per term, total token count
+        self._df = np.zeros(0, dtype=np.int64)
+        self._total_length = 0
+        # (document count, indptr, docs, weights) posting lists of each segment, oldest first
+        self._segments = []
+        self._append(documents)
+
+    def add(self, documents: Sequence[List[str]]) -> 'BM25Index':
+        """
+        Index with the documents appended as ids size, size + 1, ...
+
+        The new documents are weighted with the statistics (document
+        frequencies, average length) including them; earlier documents keep
+        their weights until the index is rebuilt. self is left unchanged, so
+        searches running on it are not affected.
+        """
+        index = copy.copy(self)
+        index.vocabulary = dict(self.vocabulary)
+        index._segments = list(self._segments)
+        index._buffers = threading.local()
+        index._append(documents)
+        return index
+
+    def _append(self, documents: Sequence[List[str]]):
+        """Add a posting segment for the documents, then merge segments of similar size"""
+        if not len(documents):
+            return
+        for tokens in documents:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        # document × term frequencies
+        n_docs = len(documents)
+        indptr = np.zeros(n_docs + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(tokens) for tokens in documents])
+        indices = np.fromiter(
+            (self.vocabulary[t] for tokens in documents for t in tokens),
+            dtype=np.int64, count=int(indptr[-1])
+        )
+        tf = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), indices, indptr),
+            shape=(n_docs, len(self.vocabulary))
+        )
+        tf.sum_duplicates()
+
+        offset = self.size
+        self.size += n_docs
+        self._total_length += int(indptr[-1])
+        self._df = (
+            np.concatenate([self._df, np.zeros(len(self.vocabulary) - len(self._df), dtype=np.int64)])
+            + np.bincount(tf.indices, minlength=len(self.vocabulary))
+        )
+        lengths = np.diff(indptr).astype(np.float64)
+        avg_length = self._total_length / self.size
+        idf = np.log1p((self.size - self._df + 0.5) / (self._df + 0.5))
+
+        # BM25 weight of every (document, term) pair, computed once
+        doc_of_entry = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+        norm = self.k1 * (1 - self.b + self.b * lengths[doc_of_entry] / max(avg_length, 1e-9))
+        tf.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm)
+
+        # Term-major layout: the posting list of term t is slice t of indptr,
+        # ordered by decreasing weight
+        postings = tf.tocsc()
+        term_of_entry = np.repeat(np.arange(postings.shape[1]), np.diff(postings.indptr))
+        order = np.lexsort((-postings.data, term_of_entry))
+        self._segments.append((
+            n_docs,
+            postings.indptr.astype(np.int64),
+            postings.indices[order].astype(np.int64) + offset,
+            postings.data[order].astype(np.float32)
+        ))
+
+        # Merge the newest segments while they are within 2x of each other
+        while len(self._segments) > 1 and self._segments[-2][0] <= 2 * self._segments[-1][0]:
+            newer = self._segments.pop()
+            self._segments.append(self._merge(self._segments.pop(), newer))
+
+    @staticmethod
+    def _merge(older: Tuple, newer: Tuple) -> Tuple:
+        """One segment with the postings of both, still impact-ordered per term"""
+        n_terms = len(newer[1]) - 1
+        terms = np.concatenate([
+            np.repeat(np.arange(len(older[1]) - 1), np.diff(older[1])),
+            np.repeat(np.arange(n_terms), np.diff(newer[1]))
+        ])
+        docs = np.concatenate([older[2], newer[2]])
+        weights = np.concatenate([older[3], newer[3]])
+        # Stable: equal weights keep ascending document order, as in a single build
+        order = np.lexsort((-weights, terms))
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(terms, minlength=n_terms))
+        return older[0] + newer[0], indptr, docs[order], weights[order]
+
+    def __len__(self):
+        return self.size
+
+    def search(
+        self,
+        query_tokens: Iterable[str],
+        k: int,
+        alive: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best-scoring documents for a bag of query tokens
+
+        Args:
+            query_tokens: Tokens (see tokenize); repeats are ignored
+            k: Number of documents to return
+            alive: Optional boolean mask of documents that may be returned
+
+        Returns:
+            (scores, ids) 1D arrays, best first, only documents sharing a term
+        """
+        term_ids = {self.vocabulary[t] for t in query_tokens if t in self.vocabulary}
+        if not term_ids or k <= 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        scores = self._score_buffer()
+        touched = []
+        for _, indptr, segment_docs, weights in self._segments:
+            for term in term_ids:
+                # A segment only knows the terms that existed when it was built
+                if term >= len(indptr) - 1:
+                    continue
+                start, end = indptr[term], indptr[term + 1]
+                if self.max_postings:
+                    end = min(end, start + self.max_postings)
+                docs = segment_docs[start:end]
+                # A document appears once per posting list, so += is safe
+                scores[docs] += weights[start:end]
+                touched.append(docs)
+        if not touched:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        # Distinct candidates (sort + adjacent compare beats np.unique's hashing here)
+        candidates = np.sort(np.concatenate(touched))
+        candidates = candidates[np.concatenate(([True], candidates[1:] != candidates[:-1]))]
+        candidate_scores = scores[candidates]
+        # Leave the buffer zeroed for the next query, touching only what was used
+        scores[candidates] = 0.0
+
+        if alive is not None:
+            keep = alive[candidates]
+            candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        best_scores, best = top_k(candidate_scores[None, :], min(k, len(candidates)))
+        return best_scores[0], candidates[best[0]]
+
+    def _score_buffer(self) -> np.ndarray:
+        """Per-thread zeroed accumulator, reused so queries don't allocate catalogue-sized arrays"""
+        scores = getattr(self._buffers, 'scores', None)
+        if scores is None:
+            scores = self._buffers.scores = np.zeros(self.size, dtype=np.float32)
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return sum(indptr.nbytes + docs.nbytes + weights.nbytes for _, indptr, docs, weights in self._segments)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[np.ndarray],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Combine ranked id lists with RRF: score(d) = sum_i w_i / (k + rank_i(d))
+
+    Args:
+        rankings: Id arrays, best first (ranks start at 1)
+        k: RRF smoothing constant
+        weights: Optional weight per ranking (default 1 each)
+
+    Returns:
+        (ids, fused scores), best first; ties keep first-seen order
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc in enumerate(ranking.tolist(), start=1):
+            fused[doc] = fused.get(doc, 0.0) + weight / (k + rank)
+
+    ids = np.fromiter(fused.keys(), dtype=np.int64, count=len(fused))
+    scores = np.fromiter(fused.values(), dtype=np.float64, count=len(fused))
+    order = np.argsort(-scores, kind='stable')
+    return ids[order], scores[order]
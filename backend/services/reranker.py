@@ -0,0 +1,201 @@
+"""
+Re-ranker Service
+Optional cross-encoder second stage for job matching
+
+The bi-encoder scores a CV and a job independently, so close candidates are
+hard to tell apart. A cross-encoder reads each (CV, job) pair jointly and
+re-orders the top candidates more reliably, at a higher cost per pair:
+- all pairs of a request (or batch of CVs) go through one forward pass
+- pair scores are cached by (CV text hash, job id), checked against the job text
+- a latency budget skips re-ranking when the estimated cost is too high,
+  e.g. under load, and the bi-encoder order is kept; while skipping, one
+  call every `probe_interval` seconds still runs to refresh the estimate,
+  so a single slow call can't switch re-ranking off for good
+
+Model: cross-encoder/mmarco-mMiniLMv2-L12-H384-v1 (multilingual, MS MARCO)
+Requires: pip install sentence-transformers
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    from sentence_transformers import CrossEncoder
+    CROSS_ENCODER_AVAILABLE = True
+except ImportError:
+    CROSS_ENCODER_AVAILABLE = False
+
+from services.lru_cache import LRUCache
+
+
+RERANKER_MODEL_NAME = os.getenv('RERANKER_MODEL', 'cross-encoder/mmarco-mMiniLMv2-L12-H384-v1')
+
+
+class CrossEncoderReranker:
+    """Batched, cached and budgeted cross-encoder scoring of (CV, job) pairs"""
+
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL_NAME,
+        top_n: int = 20,
+        budget_ms: float = 300.0,
+        cache_size: int = 20000,
+        probe_interval: float = 30.0
+    ):
+        """
+        Args:
+            model_name: Hugging Face cross-encoder model
+            top_n: Number of leading candidates re-ranked per CV
+            budget_ms: Maximum estimated re-ranking time per call (0 = no budget)
+            cache_size: Maximum number of cached pair scores
+            probe_interval: Seconds after which a call over budget is let
+                through to re-measure the cost per pair
+        """
+        self.model_name = model_name
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+        self.probe_interval = probe_interval
+        self.model = None
+        self.pair_cache = LRUCache(maxsize=cache_size)
+
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        # Moving average of the forward-pass cost per pair, in ms
+        self.pair_ms = None
+        self._measured_at = 0.0
+        self.reranked = 0
+        self.skipped = 0
+        self.probes = 0
+
+    def _ensure_model(self):
+        """Load the cross-encoder on first use"""
+        if self.model is not None:
+            return
+        if not CROSS_ENCODER_AVAILABLE:
+            raise ImportError(
+                "sentence-transformers is not installed. "
+                "Install it with: pip install sentence-transformers"
+            )
+        with self._load_lock:
+            if self.model is None:
+                print(f"Loading cross-encoder {self.model_name}...")
+                self.model = CrossEncoder(self.model_name)
+                print("Cross-encoder loaded successfully!")
+
+    def warm_up(self):
+        """Load the model and run one throwaway pair (not counted in the latency estimate)"""
+        self._ensure_model()
+        self.model.predict([("Compétences: Python", "Développeur. Compétences: Python")])
+
+    def _over_budget(self, n_pairs: int) -> Optional[bool]:
+        """
+        Whether scoring n_pairs now would likely exceed the latency budget
+        (caller holds _stats_lock)
+        
+        Returns:
+            True to skip, False to score, None to score as a probe: the
+            estimate is over budget but stale and nothing else is running
+        """
+        if not self.budget_ms or self.pair_ms is None or n_pairs == 0:
+            return False
+        # Concurrent re-rankings share the CPU: count them as queued work
+        if (self._in_flight + 1) * n_pairs * self.pair_ms <= self.budget_ms:
+            return False
+        if self._in_flight == 0 and time.monotonic() - self._measured_at >= self.probe_interval:
+            # One probe per interval: later calls see a fresh timestamp
+            self._measured_at = time.monotonic()
+            return None
+        return True
+
+    def score_many(
+        self,
+        requests: Sequence[Tuple[str, str, List[Tuple[str, str, str]]]]
+    ) -> Optional[List[np.ndarray]]:
+        """
+        Cross-encoder scores for the candidate jobs of several CVs
+
+        Args:
+            requests: One (cv_key, cv_text, candidates) per CV, where
+                candidates are (job_id, job_text_hash, job_text) tuples
+
+        Returns:
+            One score array per request (aligned with its candidates), or
+            None if re-ranking was skipped to stay within the latency budget
+        """
+        self._ensure_model()
+
+        results = []
+        pending: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+        for cv_key, cv_text, candidates in requests:
+            scores = np.empty(len(candidates), dtype=np.float32)
+            for i, (job_id, job_hash, job_text) in enumerate(candidates):
+                cached = self.pair_cache.get((cv_key, job_id))
+                if cached is not None and cached[0] == job_hash:
+                    scores[i] = cached[1]
+                else:
+                    scores[i] = np.nan
+                    pending[(cv_key, job_id)] = (job_hash, cv_text, job_text)
+            results.append(scores)
+
+        if pending:
+            with self._stats_lock:
+                over_budget = self._over_budget(len(pending))
+                if over_budget:
+                    self.skipped += 1
+                    return None
+                if over_budget is None:
+                    self.probes += 1
+                self._in_flight += 1
+
+            try:
+                # All missing pairs of all CVs in one forward pass
+                start = time.perf_counter()
+                pair_scores = self.model.predict(
+                    [(cv_text, job_text) for _, cv_text, job_text in pending.values()]
+                )
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= 1
+
+            with self._stats_lock:
+                per_pair = elapsed_ms / len(pending)
+                if self.pair_ms is None or over_budget is None:
+                    # First measure, or a probe replacing a stale estimate
+                    self.pair_ms = per_pair
+                else:
+                    self.pair_ms = 0.8 * self.pair_ms + 0.2 * per_pair
+                self._measured_at = time.monotonic()
+
+            computed = {}
+            for key, (job_hash, _, _), score in zip(pending, pending.values(), pair_scores):
+                computed[key] = float(score)
+                self.pair_cache.put(key, (job_hash, float(score)))
+
+            for (cv_key, _, candidates), scores in zip(requests, results):
+                for i, (job_id, _, _) in enumerate(candidates):
+                    if np.isnan(scores[i]):
+                        scores[i] = computed[(cv_key, job_id)]
+
+        with self._stats_lock:
+            self.reranked += 1
+        return results
+
+    def stats(self) -> Dict:
+        """Model state, budget counters and pair cache statistics"""
+        return {
+            'model': self.model_name,
+            'loaded': self.model is not None,
+            'top_n': self.top_n,
+            'budget_ms': self.budget_ms,
+            'pair_ms': round(self.pair_ms, 3) if self.pair_ms is not None else None,
+            'reranked': self.reranked,
+            'skipped': self.skipped,
+            'probes': self.probes,
+            'pair_cache': self.pair_cache.stats()
+        }
@@ -0,0 +1,81 @@
+"""
+Result Cache Service
+Cache of async computation results with single-flight
+
+Wraps an LRUCache (size bound + TTL) for results computed by coroutines:
+- a cached result is returned without computing anything
+- concurrent calls for the same key share one computation: the first
+  caller starts it, later callers await the same result ("joined")
+- the computation runs as its own task, so it finishes (and its result is
+  cached) even if the caller that started it goes away, and a cancelled
+  caller doesn't cancel it for the others
+- failures are not cached: every waiting caller gets the exception and the
+  next call computes again
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+
+from services.lru_cache import LRUCache
+
+
+_MISSING = object()
+
+
+class SingleFlightCache:
+    """LRU/TTL cache of coroutine results where identical concurrent calls compute once"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600):
+        """
+        Args:
+            maxsize: Maximum number of cached results (0 disables caching,
+                concurrent identical calls are still collapsed)
+            ttl: Result lifetime in seconds (0 = no expiry)
+        """
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        # Key → task of the computation in progress
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.joined = 0
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        """
+        Cached result for a key, computing it at most once at a time
+
+        Args:
+            key: Cache key (e.g. a content hash)
+            compute: Coroutine function producing the result on a miss
+
+        Returns:
+            (result, source) where source is 'hit', 'joined' or 'miss'
+        """
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, 'hit'
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.joined += 1
+            return await asyncio.shield(task), 'joined'
+
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), 'miss'
+
+    def put(self, key: Hashable, value: Any):
+        """Store a result computed elsewhere"""
+        self.cache.put(key, value)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.cache.put(key, task.result())
+
+    def stats(self) -> Dict:
+        """Cache counters plus in-progress and joined computations"""
+        return {**self.cache.stats(), 'inflight': len(self._inflight), 'joined': self.joined}
@@ -5,18 +5,41 @@ Uses sentence-transformers to match CVs with jobs
 Model: paraphrase-multilingual-mpnet-base-v2
 """
 
-from typing import List, Dict, Tuple
+from typing import FrozenSet, Iterable, List, Dict, Optional, Tuple, Union
 import json
 import os
+import threading
+import time
 from pathlib import Path
 
-try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+# numpy is a hard dependency of the index and snapshot modules below;
+# sentence-transformers stays optional (checked by initialize_model)
+import numpy as np
+
+from services.catalogue_snapshot import CatalogueSnapshot
+from services.embedding_cache import EmbeddingCache, get_or_compute_many, text_hash
+from services.encoder import TRANSFORMERS_AVAILABLE, encoder_id, get_encoder_backend, load_encoder
+from services.field_embeddings import (
+    DEFAULT_FIELD_WEIGHTS, JOB_FIELDS, FieldEmbeddings, job_field_texts, parse_field_weights
+)
+from services.job_catalogue import JobRecord, build_records
+from services.lexical_index import BM25Index, job_lexical_tokens, reciprocal_rank_fusion, tokenize
+from services.vector_index import create_index, normalise_rows
+from services.lru_cache import LRUCache
+from services.reranker import CrossEncoderReranker
+from services.skill_graph import skill_graph
+from services.skill_index import SkillIndex
+from services.skill_normalizer import skill_normalizer
+from services.training_catalogue import TrainingCatalogue
+
+
+# Multilingual model for French support
+MODEL_NAME = 'paraphrase-multilingual-mpnet-base-v2'
+
+# Ranking steps that can follow the dense search (MATCHER_PIPELINE):
+# - lexical: BM25 over titles/appellations/skills, fused with reciprocal rank fusion
+# - rerank:  cross-encoder re-ranking of the leading candidates
+PIPELINE_STEPS = ('lexical', 'rerank')
 
 
 class SemanticMatcher:
@@ -24,34 +47,176 @@ class SemanticMatcher:
     
     def __init__(self):
         self.model = None
-        self.jobs_data = []
-        self.jobs_embeddings = None
+        self.encoder_backend = None
+        self.jobs_file = None
+        self.catalogue_version = ''
+        
+        # Jobs, index and skill matrices, replaced as a whole on every
+        # catalogue change (see upsert_jobs / remove_jobs)
+        self._snapshot = self._new_snapshot([], [])
+        self._update_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._catalogue_signature = None
+        self.reload_status = {'running': False, 'last_reload': None, 'last_error': None}
+        # Compact once tombstones exceed this share of the rows (and this count)
+        self.compact_ratio = float(os.getenv('MATCHER_COMPACT_RATIO', '0.2'))
+        self.compact_min_dead = int(os.getenv('MATCHER_COMPACT_MIN_DEAD', '64'))
+        
+        # Ranking steps applied in order after the dense search
+        self.pipeline = self._parse_pipeline(os.getenv('MATCHER_PIPELINE', 'lexical'))
+        self.rrf_k = int(os.getenv('MATCHER_RRF_K', '60'))
+        # Optional per-field embeddings (title, description, skills, appellations)
+        # scored by weighted late fusion; weights can be overridden per request
+        self.field_embeddings = os.getenv('MATCHER_FIELD_EMBEDDINGS', '0') == '1'
+        self.field_weights = parse_field_weights(
+            os.getenv('MATCHER_FIELD_WEIGHTS', DEFAULT_FIELD_WEIGHTS)
+        )
+        self.reranker = CrossEncoderReranker(
+            top_n=int(os.getenv('MATCHER_RERANK_TOP_N', '20')),
+            budget_ms=float(os.getenv('MATCHER_RERANK_BUDGET_MS', '300')),
+            probe_interval=float(os.getenv('MATCHER_RERANK_PROBE_S', '30'))
+        )
+        
+        # Model/embeddings loading state (see status())
+        self.is_ready = False
+        self.load_error = None
+        self.load_timings = {}
+        self._init_lock = threading.Lock()
+        
+        # CV text hash -> (embedding, catalogue generation, ranked scores, ranked job rows)
+        self.cv_cache = LRUCache(
+            maxsize=int(os.getenv('CV_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('CV_CACHE_TTL', '3600'))
+        )
+        # Rankings are cached this deep so other top_k values are served too
+        self.rank_depth = int(os.getenv('CV_CACHE_RANK_DEPTH', '50'))
+        
+        # Training catalogue (loaded on first use, reloaded when the file changes)
+        self.training_catalogue = TrainingCatalogue(
+            Path(__file__).parent.parent / 'data' / 'formations.json'
+        )
         
         # Load jobs database
+        start = time.perf_counter()
         self._load_jobs_database()
+        self.load_timings['catalogue_s'] = round(time.perf_counter() - start, 3)
+    
+    @staticmethod
+    def _parse_pipeline(spec: str) -> List[str]:
+        """Ranking steps from a comma-separated list (e.g. 'lexical,rerank')"""
+        steps = [step.strip().lower() for step in spec.split(',') if step.strip()]
+        unknown = [step for step in steps if step not in PIPELINE_STEPS]
+        if unknown:
+            raise ValueError(
+                f"Unknown pipeline step(s): {', '.join(unknown)} "
+                f"(choose from {', '.join(PIPELINE_STEPS)})"
+            )
+        return steps
+    
+    @property
+    def jobs_data(self) -> List[JobRecord]:
+        """Live jobs of the current catalogue (compact records, see job_catalogue)"""
+        return self._snapshot.live_jobs()
+    
+    @property
+    def index(self):
+        """Vector index of the current catalogue (None until the model is loaded)"""
+        return self._snapshot.index
+    
+    @property
+    def skill_index(self) -> SkillIndex:
+        return self._snapshot.skill_index
+    
+    @property
+    def catalogue_generation(self) -> int:
+        """Generation of the current catalogue (bumped by every reload or update)"""
+        return self._snapshot.generation
         
     def _load_jobs_database(self):
         """Load jobs from JSON file - Try complete ROME DB first, fallback to basic"""
-        data_dir = Path(__file__).parent.parent / 'data'
+        self._catalogue_signature = self._catalogue_files_signature()
+        jobs, self.jobs_file, self.catalogue_version = self._read_jobs_database()
         
+        # Embeddings and index are added by _compute_jobs_embeddings
+        self._snapshot = self._new_snapshot(jobs, [None] * len(jobs), generation=0)
+    
+    @staticmethod
+    def _catalogue_files() -> List[Path]:
+        """Candidate catalogue files, by priority"""
+        data_dir = Path(__file__).parent.parent / 'data'
         # Priority 1: Complete ROME database (1584 métiers)
-        rome_complete_file = data_dir / 'jobs_rome_complete.json'
-        jobs_file = data_dir / 'jobs.json'
+        return [data_dir / 'jobs_rome_complete.json', data_dir / 'jobs.json']
+    
+    def _catalogue_files_signature(self) -> Tuple:
+        """(path, mtime, size) of every candidate catalogue file, to detect changes"""
+        signature = []
+        for path in self._catalogue_files():
+            try:
+                stat = path.stat()
+                signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((path.name, None, None))
+        return tuple(signature)
+    
+    def _read_jobs_database(self) -> Tuple[List[JobRecord], Path, str]:
+        """
+        Read the highest-priority catalogue file
+        
+        Returns:
+            (job records, catalogue file or None, catalogue version)
+        """
+        rome_complete_file, jobs_file = self._catalogue_files()
         
         if rome_complete_file.exists():
             print(f"📚 Loading complete ROME database...")
             with open(rome_complete_file, 'r', encoding='utf-8') as f:
                 rome_data = json.load(f)
-                self.jobs_data = rome_data.get('jobs', [])
-            print(f"✅ Loaded {len(self.jobs_data)} métiers from ROME v4.60")
+                jobs = rome_data.get('jobs', [])
+            version = self._catalogue_version(rome_complete_file, rome_data.get('metadata', {}))
+            print(f"✅ Loaded {len(jobs)} métiers from ROME v4.60")
+            return build_records(jobs, skill_normalizer), rome_complete_file, version
         elif jobs_file.exists():
             print(f"📚 Loading basic jobs database...")
             with open(jobs_file, 'r', encoding='utf-8') as f:
-                self.jobs_data = json.load(f)
-            print(f"✅ Loaded {len(self.jobs_data)} jobs")
+                jobs = json.load(f)
+            print(f"✅ Loaded {len(jobs)} jobs")
+            return build_records(jobs, skill_normalizer), jobs_file, self._catalogue_version(jobs_file, {})
         else:
-            print(f"❌ Warning: No jobs database found at {data_dir}")
-            self.jobs_data = []
+            print(f"❌ Warning: No jobs database found at {jobs_file.parent}")
+            return [], None, ''
+    
+    def _new_snapshot(
+        self,
+        jobs: List[JobRecord],
+        text_hashes: List,
+        index=None,
+        alive: "np.ndarray" = None,
+        generation: int = 0,
+        fields: Optional[FieldEmbeddings] = None
+    ) -> CatalogueSnapshot:
+        """Snapshot over `jobs` (all alive unless a mask is given), with fresh text indexes"""
+        if alive is None:
+            alive = np.ones(len(jobs), dtype=bool)
+        positions = {
+            job.job_id: row for row, job in enumerate(jobs) if alive[row]
+        }
+        return CatalogueSnapshot(
+            jobs, text_hashes, alive, positions, *self._text_indexes(jobs),
+            index=index, generation=generation, fields=fields
+        )
+    
+    @staticmethod
+    def _text_indexes(jobs: List[JobRecord]) -> Tuple[SkillIndex, BM25Index]:
+        """Skill/title incidence matrices (skill-overlap fallback) and BM25 index (hybrid search)"""
+        return SkillIndex(jobs), BM25Index([job_lexical_tokens(job) for job in jobs])
+    
+    @staticmethod
+    def _catalogue_version(path: Path, metadata: Dict) -> str:
+        """Version string of a catalogue file (metadata version, else file mtime)"""
+        version = metadata.get('version')
+        if version:
+            return f"{version}:{metadata.get('date_extraction', '')}"
+        return f"mtime:{int(path.stat().st_mtime)}"
     
     def initialize_model(self):
         """Initialize the sentence transformer model"""
@@ -61,36 +226,506 @@ class SemanticMatcher:
                 "Install it with: pip install sentence-transformers"
             )
         
-        if self.model is None:
-            print("Loading sentence-transformers model...")
-            # Use multilingual model for French support
-            self.model = SentenceTransformer('paraphrase-multilingual-mpnet-base-v2')
-            print("Model loaded successfully!")
+        # Several threads may race here (warm-up thread and first requests)
+        with self._init_lock:
+            if self.is_ready:
+                return
             
-            # Pre-compute job embeddings
-            self._compute_jobs_embeddings()
+            try:
+                if self.model is None:
+                    # Inference backend chosen with MATCHER_ENCODER_BACKEND
+                    self.encoder_backend = get_encoder_backend()
+                    print(f"Loading sentence-transformers model ({self.encoder_backend})...")
+                    start = time.perf_counter()
+                    self.model = load_encoder(MODEL_NAME, self.encoder_backend)
+                    self.load_timings['model_s'] = round(time.perf_counter() - start, 3)
+                    print("Model loaded successfully!")
+                
+                # Pre-compute job embeddings
+                start = time.perf_counter()
+                self._compute_jobs_embeddings()
+                self.load_timings['embeddings_s'] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                self.load_error = str(e)
+                raise
+            
+            self.load_error = None
+            self.is_ready = True
+    
+    def warm_up(self):
+        """
+        Load the model and job embeddings, then run one throwaway encoding
+        
+        Meant to run in a background thread at startup so the first user
+        request doesn't pay for model loading. Errors are recorded in
+        load_error rather than raised.
+        """
+        try:
+            self.initialize_model()
+            start = time.perf_counter()
+            self.model.encode(["Compétences: Python, gestion de projet"])
+            if 'rerank' in self.pipeline:
+                self.reranker.warm_up()
+            self.load_timings['warmup_s'] = round(time.perf_counter() - start, 3)
+            print("🔥 Semantic matcher warmed up")
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"❌ Semantic matcher warm-up failed: {e}")
+    
+    def status(self) -> Dict:
+        """Readiness report: model, embeddings and catalogue state plus load timings"""
+        snapshot = self._snapshot
+        return {
+            'ready': self.is_ready,
+            'model': {
+                'name': MODEL_NAME,
+                'backend': self.encoder_backend,
+                'loaded': self.model is not None
+            },
+            'embeddings': {
+                'computed': snapshot.index is not None,
+                'count': 0 if snapshot.index is None else len(snapshot.index),
+                'index': snapshot.index.name if snapshot.index is not None else None
+            },
+            'catalogue': {
+                'file': self.jobs_file.name if self.jobs_file else None,
+                'version': self.catalogue_version,
+                'generation': snapshot.generation,
+                'jobs': snapshot.n_alive,
+                'tombstones': snapshot.n_dead,
+                'reload': dict(self.reload_status)
+            },
+            'pipeline': list(self.pipeline),
+            'reranker': self.reranker.stats() if 'rerank' in self.pipeline else None,
+            'cv_cache': self.cache_stats(),
+            'load_timings': dict(self.load_timings),
+            'error': self.load_error
+        }
     
     def _compute_jobs_embeddings(self):
-        """Pre-compute embeddings for all jobs"""
-        if not self.jobs_data:
+        """Pre-compute embeddings for all jobs (reusing the on-disk cache)"""
+        with self._update_lock:
+            snapshot = self._snapshot
+            jobs = snapshot.live_jobs()
+            if not jobs:
+                return
+            
+            self._snapshot = self._build_snapshot(
+                jobs, self.jobs_file, self.catalogue_version, snapshot.generation + 1
+            )
+            
+            # Cached rankings refer to the previous matrix
+            self.cv_cache.clear()
+    
+    def _build_snapshot(
+        self,
+        jobs: List[JobRecord],
+        jobs_file: Path,
+        catalogue_version: str,
+        generation: int
+    ) -> CatalogueSnapshot:
+        """Embeddings, search index and skill matrices for a job list (model must be loaded)"""
+        print("Computing job embeddings...")
+        requests = self.embedding_requests(
+            jobs, jobs_file, catalogue_version, encoder_id(MODEL_NAME, self.encoder_backend)
+        )
+        job_texts = requests[0][1]
+        
+        # Rows are L2-normalised once when cached, so cosine similarity is a
+        # plain dot product and the memory-mapped matrix is used without a copy.
+        # Job texts and field texts go through the model in one pass.
+        matrices = get_or_compute_many(requests, self.model.encode)
+        embeddings = matrices[0]
+        fields = FieldEmbeddings.from_matrices(matrices[1:]) if self.field_embeddings else None
+        print(f"Computed embeddings for {len(job_texts)} jobs")
+        
+        # Build the search index (backend chosen with MATCHER_INDEX_BACKEND)
+        index = create_index()
+        index.build(embeddings, normalised=True)
+        print(f"Built '{index.name}' index over {len(index)} jobs")
+        
+        return self._new_snapshot(
+            jobs, [text_hash(t) for t in job_texts], index, generation=generation, fields=fields
+        )
+    
+    def embedding_requests(
+        self,
+        jobs: List[JobRecord],
+        jobs_file: Path,
+        catalogue_version: str,
+        model_id: str
+    ) -> List[Tuple[EmbeddingCache, List[str]]]:
+        """
+        Embedding caches a job list needs, with the texts of their rows
+        
+        Args:
+            jobs: Job records in catalogue order
+            jobs_file: Catalogue file (caches are stored next to it)
+            catalogue_version: Catalogue version recorded in the caches
+            model_id: Encoder identifier (see encoder_id)
+            
+        Returns:
+            (cache, texts) pairs: job texts first, then one per field when
+            per-field embeddings are enabled
+        """
+        requests = [(
+            EmbeddingCache(jobs_file, model_id, catalogue_version),
+            [self._create_job_text(job) for job in jobs]
+        )]
+        if self.field_embeddings:
+            field_texts = [job_field_texts(job) for job in jobs]
+            for f, field in enumerate(JOB_FIELDS):
+                requests.append((
+                    EmbeddingCache(jobs_file, model_id, catalogue_version, field=field),
+                    [texts[f] for texts in field_texts]
+                ))
+        return requests
+    
+    def reload_catalogue(self) -> bool:
+        """
+        Re-read the catalogue files and swap in a freshly built snapshot
+        
+        The new job list, embeddings (only new or changed texts are encoded),
+        index and skill matrices are built while matching keeps serving the
+        current snapshot, then published with a single assignment. Jobs added
+        with upsert_jobs since the last load are dropped.
+        
+        Returns:
+            False if a reload was already running (nothing done), else True
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        
+        self.reload_status['running'] = True
+        self._reload_holding_lock()
+        return True
+    
+    def _reload_holding_lock(self):
+        """reload_catalogue() body; caller holds _reload_lock, released here"""
+        try:
+            start = time.perf_counter()
+            
+            if not self.is_ready:
+                self.initialize_model()
+            
+            signature = self._catalogue_files_signature()
+            jobs, jobs_file, catalogue_version = self._read_jobs_database()
+            
+            # Built outside _update_lock: the current snapshot keeps serving meanwhile
+            if jobs:
+                snapshot = self._build_snapshot(jobs, jobs_file, catalogue_version, 0)
+            else:
+                snapshot = self._new_snapshot([], [], generation=0)
+            
+            with self._update_lock:
+                snapshot.generation = self._snapshot.generation + 1
+                self.jobs_file = jobs_file
+                self.catalogue_version = catalogue_version
+                self._catalogue_signature = signature
+                self._snapshot = snapshot
+            
+            self.load_timings['reload_s'] = round(time.perf_counter() - start, 3)
+            self.reload_status.update({'last_reload': time.time(), 'last_error': None})
+            print(f"🔄 Catalogue reloaded: {snapshot.n_alive} jobs (generation {snapshot.generation})")
+        except Exception as e:
+            self.reload_status['last_error'] = str(e)
+            raise
+        finally:
+            self.reload_status['running'] = False
+            self._reload_lock.release()
+    
+    def reload_catalogue_in_background(self) -> bool:
+        """
+        Start reload_catalogue in a daemon thread
+        
+        The reload lock is taken before the thread starts, so True always
+        means this call's reload runs.
+        
+        Returns:
+            False if a reload is already running
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        self.reload_status['running'] = True
+        
+        def run():
+            try:
+                self._reload_holding_lock()
+            except Exception as e:
+                print(f"❌ Catalogue reload failed: {e}")
+        
+        try:
+            threading.Thread(target=run, name="catalogue-reload", daemon=True).start()
+        except Exception:
+            self.reload_status['running'] = False
+            self._reload_lock.release()
+            raise
+        return True
+    
+    def watch_catalogue(self, stop_event: threading.Event, interval: float = 30.0):
+        """
+        Poll the catalogue files and reload when they change
+        
+        Meant to run in a daemon thread until stop_event is set. A file that
+        fails to load (e.g. caught half-written) is retried on its next change.
+        
+        Args:
+            stop_event: Set to stop watching
+            interval: Seconds between checks
+        """
+        failed_signature = None
+        while not stop_event.wait(interval):
+            signature = self._catalogue_files_signature()
+            if signature in (self._catalogue_signature, failed_signature):
+                continue
+            
+            print("🔄 Catalogue file changed, reloading...")
+            try:
+                self.reload_catalogue()
+            except Exception as e:
+                failed_signature = signature
+                print(f"❌ Catalogue reload failed: {e}")
+    
+    def upsert_jobs(self, jobs: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Add or update jobs without rebuilding the catalogue
+        
+        Jobs are identified by job_id (or rome_code / id). A new job, or one
+        whose embedded text (title, description, skills), per-field text or
+        lexically searched fields (e.g. appellations) changed, is appended to
+        the vector and text indexes and the previous row of a changed job is
+        tombstoned; only the texts that are new or changed are encoded, in
+        one batch, the others reuse the stored vectors. Nothing is rebuilt
+        over the whole catalogue. A job whose indexed fields are unchanged
+        only has its record replaced. In-flight matches keep using the
+        snapshot they started with. Changes are kept in memory; the
+        catalogue file is not rewritten.
+        
+        Args:
+            jobs: Job dicts in the catalogue format
+            
+        Returns:
+            Counts of 'added', 'updated' and 'encoded' jobs
+        """
+        # Later duplicates of the same job win
+        incoming = {}
+        for job in build_records(list(jobs), skill_normalizer):
+            incoming[job.job_id] = job
+        
+        if not self.is_ready:
+            self.initialize_model()
+        
+        with self._update_lock:
+            snapshot = self._snapshot
+            rows = list(snapshot.jobs)
+            text_hashes = list(snapshot.text_hashes)
+            alive = snapshot.alive.copy()
+            counts = {'added': 0, 'updated': 0, 'encoded': 0}
+            
+            index = snapshot.index
+            fields = snapshot.fields
+            with_fields = self.field_embeddings and (fields is not None or not len(snapshot.alive))
+            
+            # (previous row or None, job, job text, field texts) of the rows to append
+            to_append = []
+            for job_id, job in incoming.items():
+                text = self._create_job_text(job)
+                field_texts = job_field_texts(job) if with_fields else []
+                row = snapshot.positions.get(job_id)
+                counts['added' if row is None else 'updated'] += 1
+                if (
+                    row is not None
+                    and text_hashes[row] == text_hash(text)
+                    and field_texts == (job_field_texts(rows[row]) if with_fields else [])
+                    and job_lexical_tokens(job) == job_lexical_tokens(rows[row])
+                ):
+                    # Nothing indexed changed: swap the record in place of the old one
+                    rows[row] = job
+                else:
+                    to_append.append((row, job, text, field_texts))
+            
+            positions = dict(snapshot.positions)
+            skill_index, lexical_index = snapshot.skill_index, snapshot.lexical_index
+            if to_append:
+                vectors, field_vectors = self._upsert_vectors(to_append, snapshot, with_fields, counts)
+                if with_fields:
+                    matrices = [field_vectors[:, f] for f in range(len(JOB_FIELDS))]
+                    fields = FieldEmbeddings.from_matrices(matrices) if fields is None else fields.add(matrices)
+                
+                for row, job, text, _ in to_append:
+                    if row is not None:
+                        alive[row] = False
+                    positions[job.job_id] = len(rows)
+                    rows.append(job)
+                    text_hashes.append(text_hash(text))
+                alive = np.concatenate([alive, np.ones(len(to_append), dtype=bool)])
+                
+                # Only the appended rows are indexed
+                appended = [job for _, job, _, _ in to_append]
+                skill_index = skill_index.add(appended)
+                lexical_index = lexical_index.add([job_lexical_tokens(job) for job in appended])
+                
+                if index is None:
+                    index = create_index()
+                    index.build(vectors, normalised=True)
+                else:
+                    # Rows past the current snapshot's mask stay invisible to
+                    # in-flight searches until the new snapshot is published
+                    index.add(vectors, normalised=True)
+            
+            self._publish(
+                rows, text_hashes, index, fields, alive, positions, (skill_index, lexical_index), snapshot
+            )
+        
+        print(
+            f"✅ Upserted jobs: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['encoded']} encoded"
+        )
+        return counts
+    
+    def _upsert_vectors(self, to_append, snapshot: CatalogueSnapshot, with_fields: bool, counts: Dict):
+        """
+        Job vectors (n, dim) and field vectors (n, fields, dim) of the rows
+        upsert_jobs appends: texts unchanged since the previous row of the
+        job are copied from it, all others are encoded in one pass
+        """
+        to_encode = {}
+        for row, job, text, field_texts in to_append:
+            previous = self._create_job_text(snapshot.jobs[row]) if row is not None else None
+            previous_fields = job_field_texts(snapshot.jobs[row]) if row is not None and with_fields else []
+            needed = [text] if text != previous else []
+            needed += [t for f, t in enumerate(field_texts) if row is None or t != previous_fields[f]]
+            for t in needed:
+                to_encode.setdefault(t, len(to_encode))
+            counts['encoded'] += bool(needed)
+        
+        encoded = None
+        if to_encode:
+            print(f"Encoding {len(to_encode)} new or changed texts...")
+            encoded = normalise_rows(self.model.encode(list(to_encode)))
+        
+        previous_rows = np.array([row if row is not None else 0 for row, _, _, _ in to_append])
+        vectors = None
+        if snapshot.index is not None and any(row is not None for row, _, _, _ in to_append):
+            vectors = snapshot.index.get_vectors(previous_rows)
+        field_vectors = None
+        if with_fields and snapshot.fields is not None:
+            field_vectors = snapshot.fields.get_rows(previous_rows).transpose(1, 0, 2).copy()
+        
+        dim = encoded.shape[1] if encoded is not None else vectors.shape[1]
+        if vectors is None:
+            vectors = np.zeros((len(to_append), dim), dtype=np.float32)
+        if with_fields and field_vectors is None:
+            field_vectors = np.zeros((len(to_append), len(JOB_FIELDS), dim), dtype=np.float32)
+        
+        for i, (_, _, text, field_texts) in enumerate(to_append):
+            if text in to_encode:
+                vectors[i] = encoded[to_encode[text]]
+            for f, t in enumerate(field_texts):
+                if t in to_encode:
+                    field_vectors[i, f] = encoded[to_encode[t]]
+        return vectors, field_vectors
+    
+    def remove_jobs(self, job_ids: Iterable[str]) -> int:
+        """
+        Remove jobs from the catalogue (tombstoned until the next compaction)
+        
+        Args:
+            job_ids: Identifiers of the jobs to remove
+            
+        Returns:
+            Number of jobs removed (unknown ids are ignored)
+        """
+        with self._update_lock:
+            snapshot = self._snapshot
+            removed = [j for j in set(job_ids) if j in snapshot.positions]
+            rows = [snapshot.positions[j] for j in removed]
+            if not rows:
+                return 0
+            
+            alive = snapshot.alive.copy()
+            alive[rows] = False
+            positions = dict(snapshot.positions)
+            for job_id in removed:
+                del positions[job_id]
+            self._publish(
+                snapshot.jobs, snapshot.text_hashes, snapshot.index, snapshot.fields, alive, positions,
+                (snapshot.skill_index, snapshot.lexical_index), snapshot
+            )
+        
+        print(f"🗑️  Removed {len(rows)} jobs")
+        return len(rows)
+    
+    def compact(self):
+        """Drop tombstoned rows and rebuild the index from the live embeddings"""
+        with self._update_lock:
+            self._compact()
+    
+    def _compact(self):
+        """compact() body; caller holds _update_lock"""
+        snapshot = self._snapshot
+        if not snapshot.n_dead:
             return
         
-        print("Computing job embeddings...")
-        job_texts = []
+        live = np.flatnonzero(snapshot.alive)
+        index = None
+        fields = None
+        if snapshot.index is not None:
+            # Reuses the snapshot's own vectors: no model call, and the
+            # on-disk embedding caches (keyed by the catalogue file, which
+            # still lists removed jobs) are left untouched
+            index = create_index()
+            index.build(snapshot.index.get_vectors(live), normalised=True)
+            if snapshot.fields is not None:
+                fields = FieldEmbeddings.from_matrices(list(snapshot.fields.get_rows(live)))
         
-        for job in self.jobs_data:
-            # Combine title, description, and skills for richer embedding
-            text = f"{job['title']}. {job['description']}. "
-            text += f"Compétences: {', '.join(job['required_skills'])}"
-            job_texts.append(text)
+        self._snapshot = self._new_snapshot(
+            [snapshot.jobs[row] for row in live],
+            [snapshot.text_hashes[row] for row in live],
+            index,
+            generation=snapshot.generation + 1,
+            fields=fields
+        )
+        print(f"🧹 Compacted catalogue: {snapshot.n_dead} tombstones dropped, {len(live)} jobs")
+    
+    def _publish(
+        self, rows, text_hashes, index, fields, alive, positions, text_indexes, previous: CatalogueSnapshot
+    ):
+        """Publish the next catalogue generation, compacting if tombstones pile up"""
+        self._snapshot = CatalogueSnapshot(
+            rows, text_hashes, alive, positions, *text_indexes,
+            index=index, generation=previous.generation + 1, fields=fields
+        )
         
-        self.jobs_embeddings = self.model.encode(job_texts)
-        print(f"Computed embeddings for {len(job_texts)} jobs")
+        snapshot = self._snapshot
+        if snapshot.n_dead >= max(self.compact_min_dead, self.compact_ratio * len(snapshot.alive)):
+            self._compact()
+    
+    def _create_job_text(self, job: JobRecord) -> str:
+        """Create the text representation of a job for embedding"""
+        # Combine title, description, and skills for richer embedding
+        text = f"{job.title}. {job.description}. "
+        text += f"Compétences: {', '.join(job.required_skills)}"
+        return text
+    
+    def check_field_weights(self, field_weights: Union[str, Dict[str, float]]) -> "np.ndarray":
+        """
+        Parse per-request field weights without matching anything
+        
+        Lets callers reject bad weights before paying for CV parsing.
+        
+        Raises:
+            ValueError: Invalid field weights, or field embeddings disabled
+        """
+        if not self.field_embeddings:
+            raise ValueError("Field weights need per-field embeddings (MATCHER_FIELD_EMBEDDINGS=1)")
+        return parse_field_weights(field_weights)
     
     def match_cv_with_jobs(
         self,
         cv_data: Dict,
-        top_k: int = 5
+        top_k: int = 5,
+        field_weights: Optional[Union[str, Dict[str, float]]] = None
     ) -> List[Dict]:
         """
         Match a CV with jobs using semantic similarity
@@ -98,54 +733,255 @@ class SemanticMatcher:
         Args:
             cv_data: Parsed CV data with skills, experience, etc.
             top_k: Number of top matches to return
+            field_weights: Per-field weights overriding MATCHER_FIELD_WEIGHTS
+                (requires MATCHER_FIELD_EMBEDDINGS=1)
             
         Returns:
             List of job recommendations with match scores
         """
-        # Initialize model if not done
-        if self.model is None:
-            self.initialize_model()
+        return self.match_many([cv_data], top_k, field_weights)[0]
+    
+    def match_many(
+        self,
+        cv_list: List[Dict],
+        top_k: int = 5,
+        field_weights: Optional[Union[str, Dict[str, float]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Match several CVs with jobs in one batch
+        
+        All CVs are encoded in a single forward pass and scored against the
+        job matrix with one matrix-matrix product. Each result list is the
+        same as calling match_cv_with_jobs on that CV.
         
-        if not self.jobs_data:
+        Args:
+            cv_list: Parsed CV data, one dict per CV
+            top_k: Number of top matches to return per CV
+            field_weights: Per-field weights, as a dict or 'title=0.5,skills=0.5'
+                (requires MATCHER_FIELD_EMBEDDINGS=1)
+            
+        Returns:
+            One list of job recommendations per CV, in input order
+            
+        Raises:
+            ValueError: Invalid field weights, or field embeddings disabled
+        """
+        weights = parse_field_weights(field_weights) if field_weights is not None else None
+        
+        if not cv_list:
             return []
         
-        # Create CV text representation
-        cv_text = self._create_cv_text(cv_data)
+        # Initialize model if not done (normally already done by warm_up)
+        if not self.is_ready:
+            self.initialize_model()
         
-        # Compute CV embedding
-        cv_embedding = self.model.encode([cv_text])
+        # One catalogue snapshot for the whole batch, even if it is updated meanwhile
+        snapshot = self._snapshot
+        if not snapshot.n_alive:
+            return [[] for _ in cv_list]
         
-        # Calculate similarities
-        similarities = cosine_similarity(cv_embedding, self.jobs_embeddings)[0]
+        if snapshot.fields is None:
+            if weights is not None:
+                raise ValueError("Field weights need per-field embeddings (MATCHER_FIELD_EMBEDDINGS=1)")
+        elif weights is None:
+            weights = self.field_weights
         
-        # Get top matches (by semantic similarity)
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-
-        recommendations = []
-        for idx in top_indices:
-            job = self.jobs_data[idx].copy()
-            match_score = float(similarities[idx])
-
-            # Calculate missing skills
-            cv_skills_lower = [s.lower() for s in cv_data.get('skills', [])]
-            required_skills = job.get('required_skills', [])
-            missing_skills = [
-                skill for skill in required_skills
-                if skill.lower() not in cv_skills_lower
-            ]
-
-            recommendations.append({
-                'job_id': job.get('job_id', job.get('rome_code', job.get('id', ''))),
-                'title': job.get('title', 'Intitulé non disponible'),
-                'description': job.get('description', ''),
-                'match_score': match_score,
-                'required_skills': required_skills,
-                'missing_skills': missing_skills,
-                'salary_range': job.get('salary_range'),
-                'education_level': job.get('education_level'),
-                'is_alternative': False,
-                'alternative_reason': None
-            })
+        # Create CV text representations and rank jobs for all of them at once
+        cv_texts = [self._create_cv_text(cv_data) for cv_data in cv_list]
+        ranked = self._rank_cv_texts(cv_texts, top_k, snapshot, weights)
+        embeddings = [embedding for embedding, _, _ in ranked]
+        rankings = [(scores, indices) for _, scores, indices in ranked]
+        
+        # Optional re-ranking steps, each over all CVs of the batch
+        for step in self.pipeline:
+            rankings = getattr(self, f'_step_{step}')(
+                cv_list, cv_texts, embeddings, rankings, snapshot, weights
+            )
+        
+        return [
+            self._build_recommendations(cv_data, scores[:top_k], indices[:top_k], top_k, snapshot)
+            for cv_data, (scores, indices) in zip(cv_list, rankings)
+        ]
+    
+    def _rank_cv_texts(
+        self,
+        cv_texts: List[str],
+        top_k: int,
+        snapshot: CatalogueSnapshot,
+        field_weights: Optional["np.ndarray"] = None
+    ) -> List[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]]:
+        """
+        CV embedding and nearest live jobs (embedding, scores, rows) for each
+        CV text, best first, at least top_k deep
+        
+        Embeddings and rankings are cached by CV text hash: a repeated CV
+        skips the model, and a repeated CV with a top_k within the cached
+        ranking depth also skips the similarity scan. Rankings from another
+        catalogue generation are searched again (the embedding is reused).
+        Cache misses are encoded in one batch and searched with one matrix product.
+        
+        With field_weights, jobs are scored by weighted per-field similarity
+        (one stacked product); only the embeddings are cached then, since
+        the ranking depends on the weights.
+        """
+        depth = max(top_k, self.rank_depth)
+        keys = [text_hash(text) for text in cv_texts]
+        
+        rankings = [None] * len(cv_texts)
+        embeddings = [None] * len(cv_texts)
+        to_encode = []
+        to_search = []
+        
+        for i, key in enumerate(keys):
+            cached = self.cv_cache.get(key)
+            if cached is None:
+                to_encode.append(i)
+                to_search.append(i)
+                continue
+            
+            embeddings[i], generation, scores, indices = cached
+            if field_weights is None and generation == snapshot.generation and (
+                len(indices) >= top_k or len(indices) == snapshot.n_alive
+            ):
+                rankings[i] = (embeddings[i], scores, indices)
+            else:
+                # Cached ranking is stale or too shallow for this top_k
+                to_search.append(i)
+        
+        if to_encode:
+            encoded = self.model.encode([cv_texts[i] for i in to_encode])
+            for i, embedding in zip(to_encode, encoded):
+                embeddings[i] = embedding
+        
+        if to_search and field_weights is not None:
+            all_scores, all_indices = snapshot.fields.search(
+                np.stack([embeddings[i] for i in to_search]), field_weights, depth,
+                alive=snapshot.alive if snapshot.n_dead else None
+            )
+            for row, i in enumerate(to_search):
+                if i in to_encode:
+                    # Embedding only: generation -1 never matches a snapshot
+                    self.cv_cache.put(keys[i], (embeddings[i], -1, all_scores[row][:0], all_indices[row][:0]))
+                rankings[i] = (embeddings[i], all_scores[row], all_indices[row])
+        elif to_search:
+            # Get top matches (by semantic similarity) for every CV at once,
+            # over-fetching so tombstoned and not-yet-published rows can be dropped
+            unpublished = max(0, len(snapshot.index) - len(snapshot.alive))
+            all_scores, all_indices = snapshot.index.search(
+                np.stack([embeddings[i] for i in to_search]), depth + snapshot.n_dead + unpublished
+            )
+            for row, i in enumerate(to_search):
+                scores, indices = snapshot.filter_ids(all_scores[row], all_indices[row], depth)
+                self.cv_cache.put(keys[i], (embeddings[i], snapshot.generation, scores, indices))
+                rankings[i] = (embeddings[i], scores, indices)
+        
+        return rankings
+    
+    def _step_lexical(self, cv_list, cv_texts, embeddings, rankings, snapshot, field_weights):
+        """Pipeline step 'lexical': fuse each dense ranking with BM25 (see _fuse_lexical)"""
+        return [
+            self._fuse_lexical(cv_data, embedding, scores, indices, snapshot, field_weights)
+            for cv_data, embedding, (scores, indices) in zip(cv_list, embeddings, rankings)
+        ]
+    
+    def _step_rerank(self, cv_list, cv_texts, embeddings, rankings, snapshot, field_weights):
+        """
+        Pipeline step 'rerank': re-order the leading candidates of every CV
+        with the cross-encoder
+        
+        The pairs of all CVs are scored in one forward pass. The rankings are
+        returned unchanged when the latency budget says to skip or the model
+        can't be loaded. match_score stays the cosine similarity.
+        """
+        top_n = self.reranker.top_n
+        requests = []
+        for cv_text, (_, indices) in zip(cv_texts, rankings):
+            candidates = []
+            for row in indices[:top_n].tolist():
+                job = snapshot.jobs[row]
+                job_text = self._create_job_text(job)
+                candidates.append((job.job_id, snapshot.text_hashes[row] or text_hash(job_text), job_text))
+            requests.append((text_hash(cv_text), cv_text, candidates))
+        
+        try:
+            pair_scores = self.reranker.score_many(requests)
+        except Exception as e:
+            print(f"⚠️  Cross-encoder re-ranking skipped: {e}")
+            return rankings
+        if pair_scores is None:
+            return rankings
+        
+        reranked = []
+        for (scores, indices), cross_scores in zip(rankings, pair_scores):
+            order = np.argsort(-cross_scores, kind='stable')
+            head = len(order)
+            reranked.append((
+                np.concatenate([scores[:head][order], scores[head:]]),
+                np.concatenate([indices[:head][order], indices[head:]])
+            ))
+        return reranked
+    
+    def _fuse_lexical(
+        self,
+        cv_data: Dict,
+        embedding: "np.ndarray",
+        dense_scores: "np.ndarray",
+        dense_indices: "np.ndarray",
+        snapshot: CatalogueSnapshot,
+        field_weights: Optional["np.ndarray"] = None
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Re-rank with reciprocal rank fusion of the dense ranking and a BM25
+        ranking of the CV skills over job titles, appellations and skills
+        
+        The returned scores stay dense similarities (jobs only found
+        lexically are scored against their stored embeddings), so thresholds
+        on match_score keep their meaning; only the order comes from RRF.
+        
+        Returns:
+            (scores, rows) of the fused ranking, as deep as the dense one
+        """
+        query = tokenize(' '.join(cv_data.get('skills', [])))
+        _, lexical_indices = snapshot.lexical_index.search(
+            query, len(dense_indices), alive=snapshot.alive if snapshot.n_dead else None
+        )
+        if not len(lexical_indices):
+            return dense_scores, dense_indices
+        
+        fused, _ = reciprocal_rank_fusion([dense_indices, lexical_indices], k=self.rrf_k)
+        fused = fused[:len(dense_indices)]
+        
+        similarities = dict(zip(dense_indices.tolist(), dense_scores.tolist()))
+        lexical_only = [row for row in fused.tolist() if row not in similarities]
+        if lexical_only:
+            if field_weights is not None:
+                exact = snapshot.fields.score_rows(embedding, field_weights, np.array(lexical_only))
+            else:
+                query_vector = normalise_rows(np.asarray(embedding)[None, :])[0]
+                exact = snapshot.index.get_vectors(np.array(lexical_only)) @ query_vector
+            similarities.update(zip(lexical_only, exact.tolist()))
+        
+        return np.array([similarities[row] for row in fused.tolist()], dtype=np.float32), fused
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the CV embedding/ranking cache"""
+        return self.cv_cache.stats()
+    
+    def _build_recommendations(
+        self,
+        cv_data: Dict,
+        top_scores: "np.ndarray",
+        top_indices: "np.ndarray",
+        top_k: int,
+        snapshot: CatalogueSnapshot
+    ) -> List[Dict]:
+        """Turn the nearest jobs of one CV into recommendations (with low-score fallback)"""
+        # Canonical skill IDs: missing skills are a set difference, whatever the spelling
+        cv_skill_ids = skill_normalizer.ids(cv_data.get('skills', []))
+        recommendations = [
+            self._recommendation(snapshot.jobs[idx], float(score), cv_skill_ids)
+            for idx, score in zip(top_indices, top_scores)
+        ]
 
         # If we have no strong matches, broaden the scope and propose alternatives
         max_score = max([r['match_score'] for r in recommendations]) if recommendations else 0.0
@@ -153,52 +989,16 @@ class SemanticMatcher:
         # Thresholds can be tuned; if top score is low or no recommendations, return alternatives
         if not recommendations or max_score < 0.25:
             # Build alternatives based on skills overlap and title keyword matches
-            cv_skills_lower = [s.lower() for s in cv_data.get('skills', [])]
-
-            alt_scores = []
-            for job in self.jobs_data:
-                req_skills = job.get('required_skills', [])
-                if not req_skills:
-                    continue
-
-                # Count overlapping skills
-                overlap = sum(1 for s in req_skills if any(s.lower() in cs or cs in s.lower() for cs in cv_skills_lower))
-                # Normalize by number of required skills
-                norm_overlap = overlap / max(1, len(req_skills))
-
-                # Lightweight title match (tokens in common)
-                title = job.get('title', '')
-                title_tokens = {t.lower() for t in title.split()}
-                cv_tokens = set()
-                for s in cv_data.get('skills', []):
-                    cv_tokens.update([t.lower() for t in s.split()])
-                title_match = len(title_tokens & cv_tokens) / max(1, len(title_tokens)) if title_tokens else 0
-
-                # Final alternative score: prefer skill overlap but include title match
-                alt_score = 0.75 * norm_overlap + 0.25 * title_match
-
-                if alt_score > 0:
-                    alt_scores.append((alt_score, job))
-
-            # Sort alternatives by score and return top_k
-            alt_scores.sort(key=lambda x: x[0], reverse=True)
-
-            alternatives = []
-            for score, job in alt_scores[:top_k]:
-                req_skills = job.get('required_skills', [])
-                missing = [skill for skill in req_skills if skill.lower() not in cv_skills_lower]
-                alternatives.append({
-                    'job_id': job.get('job_id', job.get('rome_code', job.get('id', ''))),
-                    'title': job.get('title', 'Intitulé non disponible'),
-                    'description': job.get('description', ''),
-                    'match_score': float(score),
-                    'required_skills': req_skills,
-                    'missing_skills': missing,
-                    'salary_range': job.get('salary_range'),
-                    'education_level': job.get('education_level'),
-                    'is_alternative': True,
-                    'alternative_reason': 'Compétences proches ou intitulé similaire'
-                })
+            # (sparse matrix-vector products over the precomputed skill index)
+            alternatives = [
+                self._recommendation(
+                    snapshot.jobs[idx], float(score), cv_skill_ids,
+                    alternative_reason='Compétences proches ou intitulé similaire'
+                )
+                for score, idx in snapshot.skill_index.alternatives(
+                    cv_data.get('skills', []), top_k, alive=snapshot.alive if snapshot.n_dead else None
+                )[:top_k]
+            ]
 
             # If we had some semantic recommendations (but weak), append alternatives after them
             if recommendations:
@@ -209,6 +1009,43 @@ class SemanticMatcher:
 
         return recommendations
     
+    @staticmethod
+    def _recommendation(
+        job: JobRecord,
+        match_score: float,
+        cv_skill_ids: FrozenSet[int],
+        alternative_reason: Optional[str] = None
+    ) -> Dict:
+        """Recommendation dict for one job, read straight from its catalogue record"""
+        # Calculate missing skills, with partial credit from related CV skills
+        missing_skills = []
+        partial_skills = []
+        for skill, skill_id in zip(job.required_skills, job.required_skill_ids):
+            if skill_id in cv_skill_ids:
+                continue
+            missing_skills.append(skill)
+            credit = skill_graph.credit(skill_id, cv_skill_ids)
+            if credit is not None:
+                partial_skills.append({
+                    'skill': skill,
+                    'related_skill': skill_normalizer.names[credit[0]],
+                    'credit': round(credit[1], 3)
+                })
+
+        return {
+            'job_id': job.job_id,
+            'title': job.title or 'Intitulé non disponible',
+            'description': job.description,
+            'match_score': match_score,
+            'required_skills': list(job.required_skills),
+            'missing_skills': missing_skills,
+            'partial_skills': partial_skills,
+            'salary_range': job.salary_range,
+            'education_level': job.education_level,
+            'is_alternative': alternative_reason is not None,
+            'alternative_reason': alternative_reason
+        }
+    
     def _create_cv_text(self, cv_data: Dict) -> str:
         """Create a text representation of the CV for embedding"""
         parts = []
@@ -248,43 +1085,19 @@ class SemanticMatcher:
         Returns:
             List of training recommendations
         """
-        # Load trainings database
-        data_dir = Path(__file__).parent.parent / 'data'
-        trainings_file = data_dir / 'formations.json'
-        
-        if not trainings_file.exists():
-            return []
-        
-        with open(trainings_file, 'r', encoding='utf-8') as f:
-            trainings_data = json.load(f)
-        
         if not missing_skills:
             # If no missing skills, recommend based on current skills
             missing_skills = cv_data.get('skills', [])[:3]
         
-        # Score trainings based on skill overlap
-        scored_trainings = []
-        missing_skills_lower = [s.lower() for s in missing_skills]
-        
-        for training in trainings_data:
-            training_skills_lower = [s.lower() for s in training.get('skills_acquired', [])]
-            
-            # Count matching skills
-            matches = sum(
-                1 for skill in missing_skills_lower
-                if any(skill in ts or ts in skill for ts in training_skills_lower)
-            )
-            
-            if matches > 0:
-                relevance_score = matches / len(missing_skills_lower)
-                scored_trainings.append({
-                    **training,
-                    'relevance_score': relevance_score
-                })
+        # Semantic second stage only once the model is loaded (never forces a load)
+        use_semantic = self.is_ready and os.getenv('TRAININGS_SEMANTIC_RANKING', '1') == '1'
         
-        # Sort by relevance and return top K
-        scored_trainings.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return scored_trainings[:top_k]
+        return self.training_catalogue.recommend(
+            missing_skills,
+            top_k=top_k,
+            model=self.model if use_semantic else None,
+            model_name=encoder_id(MODEL_NAME, self.encoder_backend) if use_semantic else None
+        )
 
 
 # Singleton instance
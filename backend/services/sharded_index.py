@@ -0,0 +1,449 @@
+"""
+Sharded Index Service
+Split the job embeddings across local worker processes (MATCHER_SHARDS)
+
+For catalogues of hundreds of thousands to millions of offers, one process
+holding the whole matrix and scanning it for every query becomes the
+bottleneck. ShardedIndex keeps the VectorIndex interface, so the matcher is
+unchanged, but:
+- the rows are split into N contiguous shards, each copied once into a
+  shared-memory block that its worker process maps without copying
+- every worker builds an index of the configured backend
+  (MATCHER_INDEX_BACKEND) over its shard only
+- a query batch is sent to all shards over local sockets; each shard
+  returns its own top k and the coordinator maps the rows back to global
+  ids and merges them
+- get_vectors reads the shared memory directly, without a round trip
+
+Workers are plain `python -m services.sharded_index` processes (not forks of
+the API process, so they never load the app, the model or the catalogue).
+They are started on first use and shared by successive indexes: the rebuild
+after a compaction or reload reuses them. Rows added later go to the
+smallest shard. Requests are pipelined, so concurrent searches don't wait
+for each other's round trips.
+
+The coordinator owns the shared-memory blocks and the added rows, so a
+worker that dies is restarted on the next request to its shard and the
+shard is rebuilt from them; the index keeps serving.
+
+Configuration: MATCHER_SHARDS=N (default 1 = no sharding)
+"""
+
+from concurrent.futures import Future
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import atexit
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+
+import numpy as np
+
+from services.vector_index import VectorIndex, create_index, normalise_rows, top_k
+
+
+# Seconds to wait for a new worker process to accept its connection
+WORKER_START_TIMEOUT = 60
+
+
+class ShardWorker:
+    """Coordinator side of one shard worker process: pipelined requests over a socket"""
+
+    def __init__(self, shard: int, threads: int):
+        """
+        Args:
+            shard: Shard number (used in messages)
+            threads: BLAS/OpenMP threads the worker may use
+        """
+        self.shard = shard
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self.alive = True
+        self._stopping = False
+
+        authkey = os.urandom(32)
+        if sys.platform == 'win32':
+            address, socket_dir = rf"\\.\pipe\jobmatch-shard-{uuid.uuid4().hex}", None
+        else:
+            socket_dir = tempfile.mkdtemp(prefix='jobmatch-shard-')
+            address = os.path.join(socket_dir, 'socket')
+
+        env = dict(os.environ, SHARD_AUTHKEY=authkey.hex())
+        for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+            env[variable] = str(threads)
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'services.sharded_index', address],
+            cwd=str(Path(__file__).parent.parent),
+            env=env
+        )
+
+        try:
+            self.conn = self._connect(address, authkey)
+        except Exception:
+            if socket_dir:
+                shutil.rmtree(socket_dir, ignore_errors=True)
+            raise
+
+        threading.Thread(
+            target=self._receive, name=f"shard-{shard}-receiver", daemon=True
+        ).start()
+
+    def _connect(self, address: str, authkey: bytes):
+        """Connect to the worker once it listens (it may take a moment to import numpy)"""
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"Shard worker {self.shard} exited during startup (code {self.process.returncode})"
+                )
+            try:
+                return Client(address, authkey=authkey)
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.process.kill()
+                    raise TimeoutError(f"Shard worker {self.shard} did not start")
+                time.sleep(0.05)
+
+    def request(self, op: str, key: str, payload=None) -> Future:
+        """Send one request; the future resolves with the worker's answer"""
+        future = Future()
+        with self._send_lock:
+            if not self.alive:
+                raise RuntimeError(f"Shard worker {self.shard} is not running")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                self.conn.send((request_id, op, key, payload))
+            except OSError as e:
+                # Broken connection: the receiver thread may not have noticed yet
+                del self._pending[request_id]
+                self.alive = False
+                self.process.kill()
+                raise RuntimeError(f"Shard worker {self.shard} is not running") from e
+        return future
+
+    def notify(self, op: str, key: Optional[str] = None):
+        """Send a request without waiting for (or getting) an answer"""
+        with self._send_lock:
+            if self.alive:
+                try:
+                    self.conn.send((None, op, key, None))
+                except OSError:
+                    pass
+
+    def _receive(self):
+        """Resolve pending requests as answers arrive (in any order)"""
+        while True:
+            try:
+                request_id, result, error = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            future = self._pending.pop(request_id)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        # Worker gone: fail whatever is still waiting
+        with self._send_lock:
+            self.alive = False
+            pending, self._pending = self._pending, {}
+        if not self._stopping:
+            print(f"❌ Shard worker {self.shard} stopped")
+        for future in pending.values():
+            future.set_exception(RuntimeError(f"Shard worker {self.shard} stopped"))
+
+    def stop(self):
+        """Ask the worker to exit"""
+        self._stopping = True
+        self.notify('stop')
+
+
+_workers_lock = threading.Lock()
+_workers: List[ShardWorker] = []
+
+
+def get_shard_workers(count: int) -> List[ShardWorker]:
+    """The first `count` shard workers, starting missing or dead ones"""
+    with _workers_lock:
+        threads = max(1, (os.cpu_count() or 1) // count)
+        started = 0
+        for shard in range(count):
+            if shard < len(_workers) and _workers[shard].alive:
+                continue
+            worker = ShardWorker(shard, threads)
+            if shard < len(_workers):
+                _workers[shard] = worker
+            else:
+                _workers.append(worker)
+            started += 1
+        if started:
+            print(f"🧩 Started {started} shard worker(s) ({count} in use)")
+        return _workers[:count]
+
+
+@atexit.register
+def _stop_workers():
+    for worker in _workers:
+        worker.stop()
+
+
+def _release(workers: List[ShardWorker], key: str, blocks: List[shared_memory.SharedMemory]):
+    """Drop the shard indexes of one ShardedIndex and free its shared memory"""
+    for worker in workers:
+        worker.notify('drop', key)
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # Still viewed by an in-flight search: the mapping goes with it
+            pass
+        try:
+            block.unlink()
+        except OSError:
+            pass
+
+
+class ShardedIndex(VectorIndex):
+    """Rows split across worker processes, each searched by its own index; results merged"""
+
+    name = 'sharded'
+
+    def __init__(self, shards: int = 2, backend: str = 'exact', **params):
+        """
+        Args:
+            shards: Number of worker processes
+            backend: Index backend built inside every shard
+            **params: Parameters of that backend
+        """
+        super().__init__()
+        self.shards = shards
+        self.backend = backend
+        self.params = params
+        self._key = None
+        self._finalizer = None
+        self._workers: List[ShardWorker] = []
+        # Shared-memory block name of each shard (None if it was empty at build time)
+        self._blocks: List[Optional[str]] = []
+        # Serialises add() and shard restarts, which both send rows to a worker
+        self._shard_lock = threading.RLock()
+        # (block views, global id of each shard row, shard bounds of the built rows,
+        #  rows added after build) swapped together on add()
+        self._state = None
+
+    def build(self, vectors: np.ndarray, normalised: bool = False):
+        if self._finalizer is not None:
+            self._state = None
+            self._finalizer()
+
+        vectors = vectors if normalised else normalise_rows(vectors)
+        n, dim = vectors.shape
+        bounds = np.linspace(0, n, self.shards + 1).astype(np.int64)
+        self._workers = get_shard_workers(self.shards)
+        self._key = uuid.uuid4().hex
+
+        blocks, views, shard_ids, futures = [], [], [], []
+        self._blocks = []
+        self._finalizer = weakref.finalize(self, _release, self._workers, self._key, blocks)
+        for shard, worker in enumerate(self._workers):
+            start, end = int(bounds[shard]), int(bounds[shard + 1])
+            shard_ids.append(np.arange(start, end, dtype=np.int64))
+            if start == end:
+                views.append(None)
+                self._blocks.append(None)
+                continue
+            block = shared_memory.SharedMemory(create=True, size=(end - start) * dim * 4)
+            blocks.append(block)
+            self._blocks.append(block.name)
+            view = np.ndarray((end - start, dim), dtype=np.float32, buffer=block.buf)
+            view[:] = vectors[start:end]
+            views.append(view)
+            futures.append(worker.request(
+                'build', self._key, (block.name, view.shape, self.backend, self.params)
+            ))
+        for future in futures:
+            future.result()
+
+        self._state = (views, shard_ids, bounds, np.zeros((0, dim), dtype=np.float32))
+        self.size = n
+
+    def add(self, vectors: np.ndarray, normalised: bool = False):
+        new = np.ascontiguousarray(vectors, dtype=np.float32) if normalised else normalise_rows(vectors)
+        with self._shard_lock:
+            views, shard_ids, bounds, extra = self._state
+            shard = int(np.argmin([len(ids) for ids in shard_ids]))
+            self._call(shard, 'add', (new, self.backend, self.params))
+
+            # Published once the worker has the rows: a search only goes to
+            # shards that hold rows, and ignores local ids not published yet
+            shard_ids = list(shard_ids)
+            shard_ids[shard] = np.concatenate([
+                shard_ids[shard], np.arange(self.size, self.size + len(new), dtype=np.int64)
+            ])
+            self._state = (views, shard_ids, bounds, np.concatenate([extra, new]))
+            self.size += len(new)
+
+    def _call(self, shard: int, op: str, payload):
+        """Send one request to a shard and wait for the answer, restarting a dead worker"""
+        return self._result(shard, op, payload, self._send(shard, op, payload))
+
+    def _send(self, shard: int, op: str, payload) -> Tuple[ShardWorker, Future]:
+        """Send one request to a shard; returns (worker, future of the answer)"""
+        worker = self._workers[shard]
+        try:
+            return worker, worker.request(op, self._key, payload)
+        except RuntimeError:
+            self._restart_shard(shard, worker)
+            worker = self._workers[shard]
+            return worker, worker.request(op, self._key, payload)
+
+    def _result(self, shard: int, op: str, payload, sent: Tuple[ShardWorker, Future]):
+        """Answer of a request sent with _send, retried once on a new worker if the process died"""
+        worker, future = sent
+        try:
+            return future.result()
+        except Exception:
+            if worker.alive:
+                # Raised by the worker itself
+                raise
+            self._restart_shard(shard, worker)
+            return self._workers[shard].request(op, self._key, payload).result()
+
+    def _restart_shard(self, shard: int, dead: ShardWorker):
+        """Rebuild one shard on a new worker process (its rows are all kept on this side)"""
+        with self._shard_lock:
+            if self._workers[shard] is not dead:
+                # Already restarted by a concurrent request
+                return
+            worker = get_shard_workers(self.shards)[shard]
+            views, shard_ids, bounds, extra = self._state
+            if self._blocks[shard] is not None:
+                worker.request(
+                    'build', self._key, (self._blocks[shard], views[shard].shape, self.backend, self.params)
+                ).result()
+            added = shard_ids[shard][shard_ids[shard] >= bounds[-1]]
+            if len(added):
+                worker.request('add', self._key, (extra[added - bounds[-1]], self.backend, self.params)).result()
+            # In place: the finalizer releases this index on the workers of this list
+            self._workers[shard] = worker
+        print(f"♻️  Shard {shard} rebuilt on a new worker")
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        views, _, bounds, extra = self._state
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.empty((len(ids), extra.shape[1]), dtype=np.float32)
+        in_base = ids < bounds[-1]
+        rows[~in_base] = extra[ids[~in_base] - bounds[-1]]
+        shards = np.searchsorted(bounds, ids, side='right') - 1
+        for shard in np.unique(shards[in_base]):
+            selected = in_base & (shards == shard)
+            rows[selected] = views[shard][ids[selected] - bounds[shard]]
+        return rows
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalise_rows(queries)
+        k = min(k, self.size)
+        payload = (queries, k)
+        requests = [
+            (shard, self._send(shard, 'search', payload))
+            for shard, ids in enumerate(self._state[1])
+            if len(ids)
+        ]
+
+        if not requests:
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+
+        all_scores, all_ids = [], []
+        for shard, sent in requests:
+            scores, local = self._result(shard, 'search', payload, sent)
+            # Read after the answer: covers rows added since the request was sent.
+            # Rows the worker got but that are not published yet are dropped.
+            shard_ids = self._state[1][shard]
+            valid = (local >= 0) & (local < len(shard_ids))
+            all_ids.append(np.where(valid, shard_ids[np.where(valid, local, 0)], -1))
+            all_scores.append(np.where(valid, scores, -np.inf).astype(np.float32))
+
+        # Shards are in row order, so ties still go to the lowest id
+        scores = np.concatenate(all_scores, axis=1)
+        ids = np.concatenate(all_ids, axis=1)
+        best_scores, best = top_k(scores, min(k, scores.shape[1]))
+        return best_scores, np.take_along_axis(ids, best, axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        views, _, _, extra = self._state
+        return sum(view.nbytes for view in views if view is not None) + extra.nbytes
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Map a block owned by the coordinator"""
+    block = shared_memory.SharedMemory(name=name)
+    # Only the coordinator may unlink it; this process's tracker must not
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def serve(address: str, authkey: bytes):
+    """Worker loop: one index (and shared-memory block) per coordinator index key"""
+    with Listener(address, authkey=authkey) as listener:
+        conn = listener.accept()
+    if sys.platform != 'win32':
+        # The socket file is gone with the listener; remove its private directory
+        os.rmdir(os.path.dirname(address))
+
+    indexes = {}
+    while True:
+        try:
+            request_id, op, key, payload = conn.recv()
+        except (EOFError, OSError):
+            break
+        if op == 'stop':
+            break
+
+        try:
+            result = None
+            if op == 'build':
+                name, shape, backend, params = payload
+                block = _attach(name)
+                index = create_index(backend, shards=1, **params)
+                index.build(np.ndarray(shape, dtype=np.float32, buffer=block.buf), normalised=True)
+                indexes[key] = (index, block)
+            elif op == 'add':
+                vectors, backend, params = payload
+                if key in indexes:
+                    indexes[key][0].add(vectors, normalised=True)
+                else:
+                    # First rows of a shard that was empty at build time
+                    index = create_index(backend, shards=1, **params)
+                    index.build(vectors, normalised=True)
+                    indexes[key] = (index, None)
+            elif op == 'search':
+                queries, k = payload
+                result = indexes[key][0].search(queries, k)
+            elif op == 'drop':
+                index, block = indexes.pop(key, (None, None))
+                del index
+                if block is not None:
+                    try:
+                        block.close()
+                    except BufferError:
+                        pass
+            if request_id is not None:
+                conn.send((request_id, result, None))
+        except Exception as e:
+            if request_id is not None:
+                conn.send((request_id, None, e))
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], bytes.fromhex(os.environ.pop('SHARD_AUTHKEY')))
@@ -0,0 +1,96 @@
+"""
+Skill Graph Service
+Graded partial credit between related skills ("PyTorch" vs "TensorFlow")
+
+The skill-relatedness graph is built offline by scripts/build_skill_graph.py
+from embedding similarity between skill names and co-occurrence of skills
+across ROME fiches. Only its result is loaded here: for every skill, the
+short list of its nearest related skills with a weight in (0, 1], stored in
+data/skill_graph.json as
+
+    {"metadata": {...}, "neighbours": {"PyTorch": [["TensorFlow", 0.82], ...]}}
+
+Names are mapped to canonical skill IDs (see skill_normalizer) at load time,
+so giving credit for a missing skill is a scan of at most a few neighbour
+IDs against the CV's skill-ID set: no model call, constant time per skill.
+"""
+
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+import json
+
+from services.skill_normalizer import SkillNormalizer, skill_normalizer
+
+
+GRAPH_FILE = Path(__file__).parent.parent / 'data' / 'skill_graph.json'
+
+
+class SkillGraph:
+    """Precomputed nearest related skills of each canonical skill"""
+
+    def __init__(self, neighbours: Dict[str, list], normalizer: SkillNormalizer):
+        """
+        Args:
+            neighbours: Skill name → [[related skill name, weight], ...]
+            normalizer: Dictionary the names are registered with
+        """
+        self.normalizer = normalizer
+        # Skill ID → ((related skill ID, weight), ...), best first
+        self._related: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+
+        for name, related in neighbours.items():
+            skill_id = normalizer.register(name)
+            pairs = {}
+            for related_name, weight in related:
+                related_id = normalizer.register(related_name)
+                # Spellings of the same skill are matched exactly, not credited
+                if related_id != skill_id:
+                    pairs[related_id] = max(float(weight), pairs.get(related_id, 0.0))
+            if pairs:
+                merged = dict(self._related.get(skill_id, ()))
+                for related_id, weight in pairs.items():
+                    merged[related_id] = max(weight, merged.get(related_id, 0.0))
+                self._related[skill_id] = tuple(
+                    sorted(merged.items(), key=lambda pair: -pair[1])
+                )
+
+    @classmethod
+    def from_file(cls, path: Path, normalizer: SkillNormalizer) -> 'SkillGraph':
+        """Graph loaded from a build_skill_graph output (empty graph if missing)"""
+        neighbours = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    neighbours = json.load(f).get('neighbours', {})
+                print(f"🕸️  Loaded skill graph: {len(neighbours)} skills")
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable skill graph: {e}")
+        return cls(neighbours, normalizer)
+
+    def __len__(self):
+        return len(self._related)
+
+    def credit(
+        self,
+        skill_id: int,
+        cv_skill_ids: FrozenSet[int]
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Partial credit the CV gets for a skill it doesn't have
+
+        Args:
+            skill_id: Canonical ID of the missing skill
+            cv_skill_ids: Canonical skill IDs of the CV
+
+        Returns:
+            (ID of the CV's most related skill, weight), or None if the CV
+            has none of the skill's neighbours
+        """
+        for related_id, weight in self._related.get(skill_id, ()):
+            if related_id in cv_skill_ids:
+                return related_id, weight
+        return None
+
+
+# Singleton instance
+skill_graph = SkillGraph.from_file(GRAPH_FILE, skill_normalizer)
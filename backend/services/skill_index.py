@@ -0,0 +1,249 @@
+"""
+Skill Index Service
+Precomputed sparse job×skill and job×title-token matrices for skill-overlap scoring
+
+Used by the low-score fallback of SemanticMatcher: instead of looping over
+every job, required skill and CV skill, the CV is turned into an indicator
+vector over the skill vocabulary and scored with sparse matrix-vector products.
+
+Jobs upserted at runtime are appended as new row segments (add()) instead of
+rebuilding the matrices; small segments are merged as they accumulate, so a
+catalogue holds O(log n) of them.
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from services.job_catalogue import JobRecord
+
+
+class SubstringVocabulary:
+    """
+    Vocabulary of lowercase terms supporting "substring either way" lookups
+
+    matches(term) returns the ids of every entry e with `term in e` or
+    `e in term`, without scanning the vocabulary entry by entry:
+    - `term in e`: occurrences of term in one separator-joined string
+    - `e in term`: dict lookups of every substring of term
+    """
+
+    SEPARATOR = '\x00'
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._joined = ''
+        self._starts: List[int] = []
+        self._append(terms)
+
+    def extended(self, terms: Iterable[str]) -> 'SubstringVocabulary':
+        """Copy of the vocabulary with the new terms appended (existing ids are kept)"""
+        vocabulary = SubstringVocabulary(())
+        vocabulary.terms = list(self.terms)
+        vocabulary.ids = dict(self.ids)
+        vocabulary._joined = self._joined
+        vocabulary._starts = list(self._starts)
+        vocabulary._append(terms)
+        return vocabulary
+
+    def _append(self, terms: Iterable[str]):
+        """Add the terms not in the vocabulary yet"""
+        had_terms = bool(self.terms)
+        added = []
+        for term in terms:
+            if term not in self.ids:
+                self.ids[term] = len(self.terms)
+                self.terms.append(term)
+                added.append(term)
+        if not added:
+            return
+
+        position = len(self._joined) + 1 if had_terms else 0
+        for term in added:
+            self._starts.append(position)
+            position += len(term) + 1
+        joined = self.SEPARATOR.join(added)
+        self._joined = self._joined + self.SEPARATOR + joined if had_terms else joined
+
+    def __len__(self):
+        return len(self.terms)
+
+    def matches(self, term: str) -> Set[int]:
+        """Ids of entries containing `term` or contained in it"""
+        if not term:
+            # The empty string is a substring of everything
+            return set(range(len(self.terms)))
+
+        found = set()
+
+        # Entries containing the term (a term never spans a separator)
+        position = self._joined.find(term)
+        while position != -1:
+            found.add(bisect_right(self._starts, position) - 1)
+            position = self._joined.find(term, position + 1)
+
+        # Entries contained in the term
+        if '' in self.ids:
+            found.add(self.ids[''])
+        length = len(term)
+        for start in range(length):
+            for end in range(start + 1, length + 1):
+                entry_id = self.ids.get(term[start:end])
+                if entry_id is not None:
+                    found.add(entry_id)
+
+        return found
+
+
+class SkillIndex:
+    """Sparse skill and title-token incidence matrices over the job catalogue"""
+
+    def __init__(self, jobs: List[JobRecord]):
+        self.skills = SubstringVocabulary(())
+        self.title_tokens: Dict[str, int] = {}
+        self.size = 0
+        # (job × skill, job × title token, skill counts, title token counts)
+        # of each row segment, oldest first
+        self._segments = []
+        self._append(jobs)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, jobs: List[JobRecord]) -> 'SkillIndex':
+        """
+        Index with the jobs appended as positions size, size + 1, ...
+
+        Only the new rows are computed; self is left unchanged, so searches
+        running on it are not affected.
+        """
+        index = SkillIndex([])
+        index.skills = self.skills
+        index.title_tokens = dict(self.title_tokens)
+        index.size = self.size
+        index._segments = list(self._segments)
+        index._append(jobs)
+        return index
+
+    def _append(self, jobs: List[JobRecord]):
+        """Add a segment for the jobs, then merge segments of similar size"""
+        if not jobs:
+            return
+        skills_per_job = [[s.lower() for s in job.required_skills] for job in jobs]
+        tokens_per_job = [{t.lower() for t in job.title.split()} for job in jobs]
+
+        self.skills = self.skills.extended(s for skills in skills_per_job for s in skills)
+        for tokens in tokens_per_job:
+            for token in tokens:
+                self.title_tokens.setdefault(token, len(self.title_tokens))
+
+        self._segments.append((
+            # job × skill: one entry per required skill occurrence (duplicates add up)
+            self._incidence(
+                [[self.skills.ids[s] for s in skills] for skills in skills_per_job],
+                len(self.skills)
+            ),
+            # job × title token: set semantics
+            self._incidence(
+                [[self.title_tokens[t] for t in tokens] for tokens in tokens_per_job],
+                len(self.title_tokens)
+            ),
+            np.array([len(skills) for skills in skills_per_job], dtype=np.float64),
+            np.array([len(tokens) for tokens in tokens_per_job], dtype=np.float64)
+        ))
+        self.size += len(jobs)
+
+        # Merge the newest segments while they are within 2x of each other
+        while len(self._segments) > 1 and len(self._segments[-2][2]) <= 2 * len(self._segments[-1][2]):
+            newer = self._segments.pop()
+            older = self._segments.pop()
+            self._segments.append((
+                self._stack(older[0], newer[0]),
+                self._stack(older[1], newer[1]),
+                np.concatenate([older[2], newer[2]]),
+                np.concatenate([older[3], newer[3]])
+            ))
+
+    @staticmethod
+    def _stack(older: sparse.csr_matrix, newer: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Rows of both matrices; columns only grow, so the older one is widened"""
+        widened = sparse.csr_matrix(
+            (older.data, older.indices, older.indptr), shape=(older.shape[0], newer.shape[1])
+        )
+        return sparse.vstack([widened, newer], format='csr')
+
+    @staticmethod
+    def _incidence(rows: List[List[int]], n_columns: int) -> sparse.csr_matrix:
+        """Build a CSR count matrix from per-row column lists"""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in rows])
+        indices = np.fromiter((c for r in rows for c in r), dtype=np.int64, count=int(indptr[-1]))
+        data = np.ones(len(indices), dtype=np.float64)
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), n_columns))
+        matrix.sum_duplicates()
+        return matrix
+
+    def alternatives(
+        self,
+        cv_skills: List[str],
+        top_k: int,
+        alive: Optional[np.ndarray] = None
+    ) -> List[Tuple[float, int]]:
+        """
+        Rank jobs by skill overlap and title match with the CV skills
+
+        A required skill counts as covered when it contains, or is contained
+        in, one of the CV skills (case-insensitive). The score is
+        0.75 * covered share of required skills + 0.25 * share of title
+        tokens found among the CV skill tokens.
+
+        Args:
+            cv_skills: Skills listed in the CV
+            top_k: Number of jobs to return
+            alive: Optional boolean mask of jobs that may be returned
+
+        Returns:
+            (score, job position) pairs, best first, only jobs with a positive
+            score and at least one required skill
+        """
+        cv_skills_lower = [s.lower() for s in cv_skills]
+
+        covered = np.zeros(len(self.skills), dtype=np.float64)
+        for skill in cv_skills_lower:
+            for skill_id in self.skills.matches(skill):
+                covered[skill_id] = 1.0
+
+        cv_tokens = np.zeros(len(self.title_tokens), dtype=np.float64)
+        for s in cv_skills:
+            for t in s.split():
+                token_id = self.title_tokens.get(t.lower())
+                if token_id is not None:
+                    cv_tokens[token_id] = 1.0
+
+        scores = np.zeros(self.size, dtype=np.float64)
+        skill_counts = np.zeros(self.size, dtype=np.float64)
+        start = 0
+        for job_skills, job_title_tokens, segment_skill_counts, title_token_counts in self._segments:
+            # A segment only knows the terms that existed when it was built
+            overlap = job_skills @ covered[:job_skills.shape[1]]
+            norm_overlap = overlap / np.maximum(1.0, segment_skill_counts)
+            title_match = (
+                (job_title_tokens @ cv_tokens[:job_title_tokens.shape[1]])
+                / np.maximum(1.0, title_token_counts)
+            )
+            end = start + len(segment_skill_counts)
+            scores[start:end] = 0.75 * norm_overlap + 0.25 * title_match
+            skill_counts[start:end] = segment_skill_counts
+            start = end
+
+        eligible = (skill_counts > 0) & (scores > 0)
+        if alive is not None:
+            eligible &= alive
+        candidates = np.flatnonzero(eligible)
+
+        # Best score first, catalogue order among ties
+        order = np.argsort(-scores[candidates], kind='stable')[:top_k]
+        return [(float(scores[i]), int(i)) for i in candidates[order]]
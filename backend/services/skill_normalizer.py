@@ -0,0 +1,111 @@
+"""
+Skill Normalizer Service
+Map skill surface forms to canonical skill IDs
+
+CVs, ROME fiches and trainings spell the same skill in different ways
+("Node.js" / "nodejs", "REST API" / "API REST", "UX/UI" / "UI/UX"). Every
+surface form is reduced to a key:
+- lowercase, accents folded, stopwords dropped (see lexical_index.tokenize)
+- dots inside words removed ("node.js" → "nodejs", "asp.net" → "aspnet")
+- words sorted, so word order doesn't matter ("api rest")
+
+Keys map to integer skill IDs. Synonyms no normalisation can catch ("k8s",
+"JS", "Postgres") come from data/skill_aliases.json. The dictionary is
+compiled from those aliases and grows with every skill of the job catalogue
+(ROME competences) and of the training catalogue as they are loaded, so job
+and CV skills are stored as ID sets and missing skills are a set difference.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import json
+import threading
+
+from services.lexical_index import tokenize
+
+
+ALIASES_FILE = Path(__file__).parent.parent / 'data' / 'skill_aliases.json'
+
+
+@lru_cache(maxsize=65536)
+def skill_key(surface: str) -> str:
+    """Normalised key of a skill name (equal keys = same skill)"""
+    words = sorted(token.replace('.', '') for token in tokenize(surface))
+    # A name made only of stopwords/punctuation still needs a key
+    return ' '.join(words) or surface.strip().lower()
+
+
+class SkillNormalizer:
+    """Dictionary from skill surface forms to canonical skill IDs"""
+
+    def __init__(self, aliases: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            aliases: Canonical skill name → other names of the same skill
+        """
+        self._ids: Dict[str, int] = {}
+        # Canonical (first registered) name of each ID
+        self.names: List[str] = []
+        self._lock = threading.Lock()
+
+        for canonical, variants in (aliases or {}).items():
+            skill_id = self.register(canonical)
+            for variant in variants:
+                self._ids.setdefault(skill_key(variant), skill_id)
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'SkillNormalizer':
+        """Normalizer compiled from an alias file (empty dictionary if missing)"""
+        aliases = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    aliases = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable skill aliases: {e}")
+        return cls(aliases)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, surface: str) -> Optional[int]:
+        """ID of a skill name, or None if the skill is unknown"""
+        return self._ids.get(skill_key(surface))
+
+    def register(self, surface: str) -> int:
+        """ID of a skill name, adding it to the dictionary if unknown"""
+        key = skill_key(surface)
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(key)
+                if skill_id is None:
+                    skill_id = len(self.names)
+                    self.names.append(surface)
+                    self._ids[key] = skill_id
+        return skill_id
+
+    def register_many(self, surfaces: Iterable[str]) -> Tuple[int, ...]:
+        """IDs of skill names, in order (unknown names are added)"""
+        return tuple(self.register(surface) for surface in surfaces)
+
+    def ids(self, surfaces: Iterable[str]) -> FrozenSet[int]:
+        """Set of the IDs of the known skills among the given names"""
+        found = (self.lookup(surface) for surface in surfaces)
+        return frozenset(skill_id for skill_id in found if skill_id is not None)
+
+    def unique(self, surfaces: Iterable[str]) -> List[str]:
+        """Names with later duplicates (same skill, any spelling) removed, in order"""
+        seen = set()
+        unique = []
+        for surface in surfaces:
+            key = self._ids.get(skill_key(surface), skill_key(surface))
+            if key not in seen:
+                seen.add(key)
+                unique.append(surface)
+        return unique
+
+
+# Singleton instance
+skill_normalizer = SkillNormalizer.from_file(ALIASES_FILE)
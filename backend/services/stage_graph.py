@@ -0,0 +1,138 @@
+"""
+Stage Graph Service
+Run the stages of a request pipeline as a small dependency graph
+
+Each stage declares the stages (or graph inputs) whose results it needs and
+starts as soon as they are available, so independent stages overlap and the
+wall-clock latency of a run approaches its critical path instead of the sum
+of all stages. Stages are declared once; every run has its own tasks and
+results, so one graph serves concurrent requests.
+
+    graph = StageGraph(inputs=('text',))
+    graph.add('words', split_words, 'text')
+    graph.add('count', count_words, 'words')
+    graph.add('longest', longest_word, 'words')   # runs alongside 'count'
+    results = await graph.run(text="...")
+
+stream() yields each stage's result as soon as it is ready, for endpoints
+that send partial results progressively.
+"""
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Tuple
+import asyncio
+import inspect
+import time
+
+
+class StageGraph:
+    """Named async stages with dependencies, run concurrently where possible"""
+
+    def __init__(self, inputs: Iterable[str] = ()):
+        """
+        Args:
+            inputs: Names of the values given to run() that stages may depend on
+        """
+        self.inputs = tuple(inputs)
+        # name → (callable, dependency names), in insertion (= topological) order
+        self._stages: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, func: Callable[..., Any], *depends_on: str) -> 'StageGraph':
+        """
+        Declare a stage
+
+        Dependencies must be inputs or already declared stages, which keeps
+        the graph acyclic.
+
+        Args:
+            name: Stage name (key of its result)
+            func: Coroutine function, or plain function for cheap glue code,
+                called with the dependency results in the order given
+            depends_on: Names of the inputs/stages it needs
+        """
+        if name in self._stages or name in self.inputs:
+            raise ValueError(f"Duplicate stage: {name}")
+        unknown = [d for d in depends_on if d not in self._stages and d not in self.inputs]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(unknown)}")
+        self._stages[name] = (func, depends_on)
+        return self
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self._stages)
+
+    async def run(self, timings: Dict[str, float] = None, **inputs: Any) -> Dict[str, Any]:
+        """
+        Run every stage once
+
+        The first stage to fail cancels the stages still running and its
+        exception is raised (stages depending on it never run).
+
+        Args:
+            timings: Optional dict filled with the duration of each stage (s)
+            inputs: Values of the graph inputs
+
+        Returns:
+            Result of every stage (and input), by name
+        """
+        results = dict(inputs)
+        async for name, result in self.stream(timings, **inputs):
+            results[name] = result
+        return results
+
+    async def stream(
+        self,
+        timings: Dict[str, float] = None,
+        **inputs: Any
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run every stage once, yielding each result as soon as it is ready
+
+        Same arguments and failure behaviour as run(). Closing the iterator
+        early (e.g. the client went away) cancels the stages still running.
+
+        Yields:
+            (stage name, result), in completion order
+        """
+        missing = [name for name in self.inputs if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing graph inputs: {', '.join(missing)}")
+
+        tasks: Dict[str, Awaitable] = {}
+        for name in self.inputs:
+            done = asyncio.get_running_loop().create_future()
+            done.set_result(inputs[name])
+            tasks[name] = done
+        names = {}
+        for name, (func, depends_on) in self._stages.items():
+            tasks[name] = asyncio.ensure_future(
+                self._run_stage(name, func, [tasks[d] for d in depends_on], timings)
+            )
+            names[tasks[name]] = name
+
+        pending = set(names)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Stages finished together are reported in declaration order
+                finished = sorted(done, key=lambda task: list(self._stages).index(names[task]))
+                errors = [task.exception() for task in finished if task.exception() is not None]
+                if errors:
+                    raise errors[0]
+                for task in finished:
+                    yield names[task], task.result()
+        finally:
+            # Also reached on failure and when the run is cancelled or closed early
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def _run_stage(name: str, func: Callable, dependencies: List[Awaitable], timings):
+        args = [await dependency for dependency in dependencies]
+        start = time.perf_counter()
+        result = func(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        if timings is not None:
+            timings[name] = time.perf_counter() - start
+        return result
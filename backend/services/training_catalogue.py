@@ -0,0 +1,170 @@
+"""
+Training Catalogue Service
+In-memory, indexed training catalogue for recommend_trainings
+
+- Loaded once, reloaded automatically when the file's mtime changes
+- skill → trainings inverted index, so scoring is a set/dict operation;
+  both substring matches and canonical skill IDs (see skill_normalizer,
+  so "K8s" is covered by a Kubernetes training) are indexed
+- Optional semantic second stage: candidates with the same relevance are
+  ordered by similarity between the missing skills and precomputed
+  training embeddings
+"""
+
+from typing import Dict, List, Optional
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache
+from services.skill_index import SubstringVocabulary
+from services.skill_normalizer import skill_normalizer
+from services.vector_index import normalise_rows
+
+
+class TrainingCatalogue:
+    """Training catalogue loaded from formations.json with a skill inverted index"""
+
+    def __init__(self, trainings_file: Path):
+        self.trainings_file = trainings_file
+        self.mtime = None
+
+        # (trainings, skill vocabulary, skill id → training positions,
+        # canonical skill id → training positions), replaced as a whole on
+        # reload so readers never see a mix
+        self._state = ([], SubstringVocabulary([]), {}, {})
+        # (trainings list it was computed for, model name, matrix)
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    @property
+    def trainings(self) -> List[Dict]:
+        """Currently loaded trainings"""
+        return self._state[0]
+
+    def _ensure_loaded(self):
+        """(Re)load the catalogue if the file changed since the last load"""
+        try:
+            mtime = os.stat(self.trainings_file).st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime == self.mtime:
+            return
+
+        with self._lock:
+            if mtime == self.mtime:
+                return
+
+            if mtime is None:
+                trainings = []
+            else:
+                with open(self.trainings_file, 'r', encoding='utf-8') as f:
+                    trainings = json.load(f)
+                print(f"📚 Loaded {len(trainings)} trainings")
+
+            skills_per_training = [
+                [s.lower() for s in training.get('skills_acquired', [])] for training in trainings
+            ]
+            skills = SubstringVocabulary(s for ts in skills_per_training for s in ts)
+            skill_trainings = {}
+            canonical_trainings = {}
+            for position, training_skills in enumerate(skills_per_training):
+                for skill in set(training_skills):
+                    skill_trainings.setdefault(skills.ids[skill], []).append(position)
+                acquired = trainings[position].get('skills_acquired', [])
+                for skill_id in set(skill_normalizer.register_many(acquired)):
+                    canonical_trainings.setdefault(skill_id, []).append(position)
+
+            self._state = (trainings, skills, skill_trainings, canonical_trainings)
+            self.mtime = mtime
+
+    def _training_text(self, training: Dict) -> str:
+        """Text representation of a training for embedding"""
+        return (
+            f"{training.get('title', '')}. {training.get('description', '')}. "
+            f"Compétences: {', '.join(training.get('skills_acquired', []))}"
+        )
+
+    def _get_embeddings(self, trainings: List[Dict], model, model_name: str) -> np.ndarray:
+        """Training embeddings for this catalogue and model (computed once, cached on disk)"""
+        cached = self._embeddings
+        if cached and cached[0] is trainings and cached[1] == model_name:
+            return cached[2]
+
+        with self._lock:
+            cached = self._embeddings
+            if cached and cached[0] is trainings and cached[1] == model_name:
+                return cached[2]
+
+            cache = EmbeddingCache(self.trainings_file, model_name, f"mtime:{int(self.mtime or 0)}")
+            embeddings = cache.get_or_compute(
+                [self._training_text(t) for t in trainings], model.encode
+            )
+            self._embeddings = (trainings, model_name, embeddings)
+            return embeddings
+
+    def recommend(
+        self,
+        missing_skills: List[str],
+        top_k: int = 3,
+        model=None,
+        model_name: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Recommend trainings covering the given skills
+
+        A missing skill is covered by a training when it contains, or is
+        contained in, one of the training's skills (case-insensitive), or
+        when both are spellings of the same canonical skill.
+        relevance_score is the covered share of missing skills.
+
+        Args:
+            missing_skills: Skills that need to be developed
+            top_k: Number of trainings to recommend
+            model: Optional sentence-transformers model for the semantic stage
+            model_name: Embedding cache key for that model
+
+        Returns:
+            List of training recommendations, best first
+        """
+        self._ensure_loaded()
+        trainings, skills, skill_trainings, canonical_trainings = self._state
+        if not trainings or not missing_skills:
+            return []
+
+        missing_skills_lower = [s.lower() for s in missing_skills]
+
+        # Count, per training, the missing skills it covers
+        matches: Dict[int, int] = {}
+        for skill in missing_skills_lower:
+            covering = set()
+            for skill_id in skills.matches(skill):
+                covering.update(skill_trainings.get(skill_id, ()))
+            covering.update(canonical_trainings.get(skill_normalizer.lookup(skill), ()))
+            for position in covering:
+                matches[position] = matches.get(position, 0) + 1
+
+        candidates = sorted(matches)
+        if not candidates:
+            return []
+
+        relevance = {p: matches[p] / len(missing_skills_lower) for p in candidates}
+
+        # Semantic second stage: break relevance ties by embedding similarity
+        semantic = {}
+        if model is not None and model_name and len(candidates) > 1:
+            embeddings = self._get_embeddings(trainings, model, model_name)
+            query = normalise_rows(model.encode([f"Compétences: {', '.join(missing_skills)}"]))[0]
+            scores = np.asarray(embeddings[candidates]) @ query
+            semantic = dict(zip(candidates, scores.tolist()))
+
+        candidates.sort(key=lambda p: (-relevance[p], -semantic.get(p, 0.0), p))
+
+        return [
+            {**trainings[p], 'relevance_score': relevance[p]}
+            for p in candidates[:top_k]
+        ]
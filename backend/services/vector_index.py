@@ -0,0 +1,624 @@
+"""
+Vector Index Service
+Nearest-neighbour search over job embeddings behind a common interface
+
+Backends:
+- exact: brute-force cosine similarity (reference, best for small catalogues)
+- ivf:   inverted file index (k-means partitions), pure NumPy
+- hnsw:  hierarchical navigable small world graph (requires hnswlib)
+- int8:  int8 scalar-quantised codes in memory, exact rescoring of the best candidates
+- binary: sign-bit codes searched by Hamming distance, exact rescoring of the best candidates
+
+The quantised backends keep only compact codes in RAM; full-precision rows
+are read from the (memory-mapped) embedding matrix for rescoring.
+
+Any backend can be split across local worker processes with MATCHER_SHARDS
+(see sharded_index).
+
+All backends score with cosine similarity and return (scores, ids) arrays of
+shape (n_queries, k), best match first. Rows can be appended after build();
+a search running concurrently with add() sees either the old or the new rows,
+never a partial state.
+"""
+
+from typing import Tuple
+import os
+import threading
+
+import numpy as np
+from scipy import sparse
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+
+def normalise_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row into a new C-contiguous float32 matrix (zero rows stay zero)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k best scores of each row without a full sort
+
+    Ties are broken by lowest position, like a stable descending sort.
+
+    Args:
+        scores: (n_queries, n) score matrix
+        k: Number of entries to keep per row (k <= n)
+
+    Returns:
+        (scores, positions) arrays of shape (n_queries, k), best first
+    """
+    n = scores.shape[1]
+    if k <= 0:
+        return scores[:, :0], np.zeros((len(scores), 0), dtype=np.int64)
+
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    ids = np.empty_like(candidates)
+    for q in range(len(scores)):
+        # Order by descending score, then ascending position
+        order = np.lexsort((candidates[q], -candidate_scores[q]))
+        ids[q] = candidates[q][order]
+
+    return np.take_along_axis(scores, ids, axis=1), ids.astype(np.int64)
+
+
+def gather_rows(full: np.ndarray, extra: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """
+    Gather float32 rows from a base matrix followed by the rows appended to it
+
+    Args:
+        full: (n, dim) base matrix (possibly a memmap)
+        extra: (m, dim) rows appended after build, ids n .. n + m - 1
+        ids: Row ids to gather
+
+    Returns:
+        (len(ids), dim) float32 matrix
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    rows = np.empty(ids.shape + (full.shape[1],), dtype=np.float32)
+    in_base = ids < len(full)
+    rows[in_base] = full[ids[in_base]]
+    rows[~in_base] = extra[ids[~in_base] - len(full)]
+    return rows
+
+
+class VectorIndex:
+    """Common interface for job embedding indexes"""
+
+    name = 'base'
+
+    def __init__(self):
+        self.size = 0
+
+    def build(self, vectors: np.ndarray, normalised: bool = False):
+        """
+        Index the given (n, dim) matrix; row i gets id i
+
+        Args:
+            vectors: Embedding matrix
+            normalised: True if rows are already L2-normalised float32
+        """
+        raise NotImplementedError
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar rows for each query
+
+        Args:
+            queries: (n_queries, dim) query embeddings
+            k: Number of neighbours to return
+
+        Returns:
+            (scores, ids) arrays of shape (n_queries, min(k, size)), best first
+        """
+        raise NotImplementedError
+
+    def add(self, vectors: np.ndarray, normalised: bool = False):
+        """
+        Append rows; they get ids size, size + 1, ...
+
+        Args:
+            vectors: (m, dim) embeddings to append
+            normalised: True if rows are already L2-normalised float32
+        """
+        raise NotImplementedError
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        """Full-precision (normalised) rows for the given ids"""
+        raise NotImplementedError
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index structures (excluding memory-mapped data)"""
+        return 0
+
+
+class ExactIndex(VectorIndex):
+    """
+    Brute-force cosine similarity over the full matrix
+
+    Rows are L2-normalised once at build time into a contiguous float32
+    matrix, so a query costs one GEMV (GEMM for a batch) plus an
+    argpartition top-k selection. Rows added later are kept in a second
+    matrix, so add() never copies the base one.
+
+    GEMV and GEMM sums differ in the last bits, enough to swap near-tied
+    neighbours between a single query and the same query in a batch. The
+    `rescore_margin` extra best candidates are therefore rescored with one
+    elementwise product and row sum, whose result only depends on the two
+    vectors, so scores and order are the same whatever the batch size.
+    """
+
+    # Extra candidates rescored beyond k (score differences are ~1e-7)
+    rescore_margin = 16
+
+    name = 'exact'
+
+    def build(self, vectors: np.ndarray, normalised: bool = False):
+        if normalised:
+            # A float32 C-contiguous memmap is used in place (no copy)
+            if vectors.dtype != np.float32 or not vectors.flags.c_contiguous:
+                vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        else:
+            vectors = normalise_rows(vectors)
+        # (base rows, rows added later) are swapped together on add()
+        self._state = (vectors, np.zeros((0, vectors.shape[1]), dtype=np.float32))
+        self.size = len(vectors)
+
+    def add(self, vectors: np.ndarray, normalised: bool = False):
+        new = np.ascontiguousarray(vectors, dtype=np.float32) if normalised else normalise_rows(vectors)
+        full, extra = self._state
+        # Only the added rows are copied, the base matrix is kept as is
+        self._state = (full, np.concatenate([extra, new]))
+        self.size = len(full) + len(extra) + len(new)
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        full, extra = self._state
+        return gather_rows(full, extra, ids)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        full, extra = self._state
+        size = len(full) + len(extra)
+        k = min(k, size)
+        queries = normalise_rows(queries)
+        if len(queries) == 1:
+            similarities = (full @ queries[0])[None, :]
+            if len(extra):
+                similarities = np.concatenate([similarities, (extra @ queries[0])[None, :]], axis=1)
+        else:
+            similarities = queries @ full.T
+            if len(extra):
+                similarities = np.concatenate([similarities, queries @ extra.T], axis=1)
+        _, candidates = top_k(similarities, min(k + self.rescore_margin, size))
+
+        # Same arithmetic for every query, whatever product produced the candidates
+        candidates = np.sort(candidates, axis=1)
+        exact = np.sum(gather_rows(full, extra, candidates) * queries[:, None, :], axis=2)
+        scores, order = top_k(exact, k)
+        return scores, np.take_along_axis(candidates, order, axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        full, extra = self._state
+        return (0 if isinstance(full, np.memmap) else full.nbytes) + extra.nbytes
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted file index: vectors are partitioned with spherical k-means and a
+    query only scans the `nprobe` partitions whose centroids are closest
+    """
+
+    name = 'ivf'
+
+    def __init__(
+        self,
+        nlist: int = 0,
+        nprobe: int = 8,
+        train_iterations: int = 10,
+        seed: int = 0,
+        points_per_list: int = 64,
+        max_train_points: int = 65536
+    ):
+        """
+        Args:
+            nlist: Number of partitions (0 = 4 * sqrt(n))
+            nprobe: Partitions scanned per query
+            train_iterations: k-means iterations
+            seed: Random seed of the training sample and initial centroids
+            points_per_list: Training points drawn per partition
+            max_train_points: Cap on the k-means training sample
+        """
+        super().__init__()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.points_per_list = points_per_list
+        self.max_train_points = max_train_points
+
+    def _train_centroids(self, vectors: np.ndarray, nlist: int) -> np.ndarray:
+        """Spherical k-means on a bounded sample of the vectors"""
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), max(nlist, min(nlist * self.points_per_list, self.max_train_points)))
+        # Sorted ids keep memmap reads sequential
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32
+        )
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignment = self._assign(sample, centroids)
+            # Sum of the members of every partition in one pass
+            one_hot = sparse.csr_matrix(
+                (np.ones(len(sample), dtype=np.float32), (assignment, np.arange(len(sample)))),
+                shape=(nlist, len(sample))
+            )
+            sums = np.asarray(one_hot @ sample)
+            empty = np.flatnonzero(np.bincount(assignment, minlength=nlist) == 0)
+            if len(empty):
+                # Re-seed empty partitions on random sample points
+                sums[empty] = sample[rng.integers(len(sample), size=len(empty))]
+            centroids = normalise_rows(sums)
+        return centroids
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, block: int = 8192) -> np.ndarray:
+        """Nearest centroid of every row, by blocks to bound the score matrix"""
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block):
+            chunk = np.asarray(vectors[start:start + block], dtype=np.float32)
+            assignment[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignment
+
+    def build(self, vectors: np.ndarray, normalised: bool = False):
+        vectors = (
+            np.ascontiguousarray(vectors, dtype=np.float32) if normalised else normalise_rows(vectors)
+        )
+        if len(vectors) == 0:
+            self.centroids = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            self._state = (vectors, vectors[:0], [])
+            self.size = 0
+            return
+
+        nlist = self.nlist or int(round(4 * np.sqrt(len(vectors))))
+        nlist = max(1, min(nlist, len(vectors)))
+        self.centroids = self._train_centroids(vectors, nlist)
+
+        assignment = self._assign(vectors, self.centroids)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        # (base rows, rows added later, inverted lists) are swapped together on add()
+        self._state = (
+            vectors,
+            np.zeros((0, vectors.shape[1]), dtype=np.float32),
+            [order[bounds[c]:bounds[c + 1]] for c in range(nlist)]
+        )
+        self.size = len(vectors)
+
+    def add(self, vectors: np.ndarray, normalised: bool = False):
+        new = np.ascontiguousarray(vectors, dtype=np.float32) if normalised else normalise_rows(vectors)
+        full, extra, old_lists = self._state
+        if not old_lists:
+            self.build(np.concatenate([full, extra, new]), normalised=True)
+            return
+
+        # New rows join the partition of their nearest centroid (no retraining)
+        start = len(full) + len(extra)
+        ids = np.arange(start, start + len(new))
+        assignment = np.argmax(new @ self.centroids.T, axis=1)
+        lists = list(old_lists)
+        for c in np.unique(assignment):
+            lists[c] = np.concatenate([lists[c], ids[assignment == c]])
+
+        # Only the added rows are copied, the base matrix is kept as is
+        self._state = (full, np.concatenate([extra, new]), lists)
+        self.size = start + len(new)
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        full, extra, _ = self._state
+        return gather_rows(full, extra, ids)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        full, extra, lists = self._state
+        queries = normalise_rows(queries)
+        k = min(k, len(full) + len(extra))
+        nprobe = min(self.nprobe, len(lists))
+
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if not lists:
+            return all_scores, all_ids
+
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        for q, query in enumerate(queries):
+            candidates = np.concatenate([lists[c] for c in probes[q]])
+            if len(candidates) == 0:
+                continue
+            scores = gather_rows(full, extra, candidates) @ query
+            top_scores, top = top_k(scores[None, :], min(k, len(candidates)))
+            all_scores[q, :top.shape[1]] = top_scores[0]
+            all_ids[q, :top.shape[1]] = candidates[top[0]]
+
+        return all_scores, all_ids
+
+    @property
+    def nbytes(self) -> int:
+        full, extra, lists = self._state
+        return full.nbytes + extra.nbytes + self.centroids.nbytes + sum(l.nbytes for l in lists)
+
+
+class HNSWIndex(VectorIndex):
+    """Hierarchical navigable small world graph (hnswlib)"""
+
+    name = 'hnsw'
+
+    def __init__(self, m: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        super().__init__()
+        if not HNSWLIB_AVAILABLE:
+            raise ImportError(
+                "hnswlib is not installed. "
+                "Install it with: pip install hnswlib"
+            )
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        # hnswlib can't resize the graph while it is being queried
+        self._lock = threading.Lock()
+
+    def build(self, vectors: np.ndarray, normalised: bool = False):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.size = len(vectors)
+        self.index = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+        self.index.init_index(
+            max_elements=max(1, self.size), ef_construction=self.ef_construction, M=self.m
+        )
+        if self.size:
+            self.index.add_items(vectors, np.arange(self.size))
+
+    def add(self, vectors: np.ndarray, normalised: bool = False):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self.index.resize_index(self.size + len(vectors))
+            self.index.add_items(vectors, np.arange(self.size, self.size + len(vectors)))
+            self.size += len(vectors)
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        with self._lock:
+            # hnswlib stores cosine-space items normalised
+            return np.asarray(self.index.get_items(list(ids)), dtype=np.float32)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            k = min(k, self.size)
+            self.index.set_ef(max(self.ef_search, k))
+            ids, distances = self.index.knn_query(np.asarray(queries, dtype=np.float32), k=k)
+        # hnswlib returns cosine distances (1 - similarity)
+        return (1.0 - distances).astype(np.float32), ids.astype(np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        # Vectors plus roughly 2*M neighbour links per element at layer 0
+        return self.size * (self.index.dim * 4 + self.m * 2 * 4) if self.size else 0
+
+
+class QuantisedIndex(VectorIndex):
+    """
+    Base class for compact-code indexes
+
+    A cheap first pass over the codes keeps the `rescore` best candidates,
+    which are then rescored exactly against the full-precision vectors.
+    Those stay wherever the caller keeps them (typically a read-only memmap
+    of the embedding cache), so only the codes cost RAM.
+    """
+
+    # Rows scored per step of the first pass, bounds temporary memory
+    chunk_size = 2048
+
+    def __init__(self, rescore: int = 200):
+        super().__init__()
+        self.rescore = rescore
+
+    def build(self, vectors: np.ndarray, normalised: bool = False):
+        # Keep a reference (no copy) to the full-precision rows for rescoring
+        full = vectors if normalised else normalise_rows(vectors)
+        self._calibrate(full)
+
+        codes = None
+        for start in range(0, len(full), self.chunk_size):
+            chunk = self._encode_rows(np.asarray(full[start:start + self.chunk_size], dtype=np.float32))
+            if codes is None:
+                codes = np.empty((len(full), chunk.shape[1]), dtype=chunk.dtype)
+            codes[start:start + len(chunk)] = chunk
+        if codes is None:
+            codes = self._encode_rows(np.zeros((0, full.shape[1]), dtype=np.float32))
+
+        # (base rows, rows added later, codes of both) are swapped together on add()
+        self._state = (full, np.zeros((0, full.shape[1]), dtype=np.float32), codes)
+        self.size = len(full)
+
+    def _calibrate(self, vectors: np.ndarray):
+        """Fit quantisation parameters on the catalogue (if the scheme has any)"""
+
+    def _encode_rows(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantise a block of normalised rows"""
+        raise NotImplementedError
+
+    def add(self, vectors: np.ndarray, normalised: bool = False):
+        new = np.ascontiguousarray(vectors, dtype=np.float32) if normalised else normalise_rows(vectors)
+        full, extra, codes = self._state
+        # Added rows keep the quantisation fitted at build time
+        self._state = (
+            full,
+            np.concatenate([extra, new]),
+            np.concatenate([codes, self._encode_rows(new)])
+        )
+        self.size = len(full) + len(extra) + len(new)
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        full, extra, _ = self._state
+        return gather_rows(full, extra, ids)
+
+    def _approximate_scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """First-pass scores of one query against a chunk of codes (higher is better)"""
+        raise NotImplementedError
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        full, extra, codes = self._state
+        size = len(codes)
+        queries = normalise_rows(queries)
+        k = min(k, size)
+        n_candidates = min(max(self.rescore, k), size)
+
+        all_scores = np.empty((len(queries), k), dtype=np.float32)
+        all_ids = np.empty((len(queries), k), dtype=np.int64)
+
+        for q, query in enumerate(queries):
+            approximate = np.concatenate([
+                self._approximate_scores(query, codes[start:start + self.chunk_size])
+                for start in range(0, size, self.chunk_size)
+            ])
+            _, candidates = top_k(approximate[None, :], n_candidates)
+
+            # Exact rescoring; sorted ids keep memmap reads sequential
+            candidates = np.sort(candidates[0])
+            exact = gather_rows(full, extra, candidates) @ query
+            top_scores, top = top_k(exact[None, :], k)
+            all_scores[q] = top_scores[0]
+            all_ids[q] = candidates[top[0]]
+
+        return all_scores, all_ids
+
+    @property
+    def nbytes(self) -> int:
+        _, extra, codes = self._state
+        return codes.nbytes + extra.nbytes
+
+
+class Int8Index(QuantisedIndex):
+    """
+    Scalar quantisation: each dimension is mapped linearly onto int8 using
+    its min/max over the catalogue (4x smaller than float32)
+    """
+
+    name = 'int8'
+
+    def _calibrate(self, vectors: np.ndarray):
+        lows = np.full(vectors.shape[1], np.inf, dtype=np.float32)
+        highs = np.full(vectors.shape[1], -np.inf, dtype=np.float32)
+        for start in range(0, len(vectors), self.chunk_size):
+            chunk = np.asarray(vectors[start:start + self.chunk_size], dtype=np.float32)
+            lows = np.minimum(lows, chunk.min(axis=0))
+            highs = np.maximum(highs, chunk.max(axis=0))
+
+        if not len(vectors):
+            lows, highs = np.full_like(lows, -1.0), np.full_like(highs, 1.0)
+        self.offset = lows
+        self.scale = np.where(highs > lows, (highs - lows) / 255.0, 1.0).astype(np.float32)
+
+    def _encode_rows(self, vectors: np.ndarray) -> np.ndarray:
+        # Values outside the calibrated range (rows added later) are clipped
+        levels = np.rint((vectors - self.offset) / self.scale) - 128
+        return np.clip(levels, -128, 127).astype(np.int8)
+
+    def _approximate_scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # x ~ scale * (code + 128) + offset, and the terms that don't depend
+        # on the row are constant for the query, so ranking only needs this
+        return codes.astype(np.float32) @ (query * self.scale)
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self.scale.nbytes + self.offset.nbytes
+
+
+# Population count of every byte value, for numpy versions without bitwise_count
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class BinaryIndex(QuantisedIndex):
+    """
+    Binary quantisation: one sign bit per dimension, compared with the
+    Hamming distance (32x smaller than float32)
+    """
+
+    name = 'binary'
+
+    def __init__(self, rescore: int = 400):
+        super().__init__(rescore=rescore)
+
+    def _encode_rows(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors > 0, axis=1)
+
+    def _approximate_scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        query_bits = np.packbits(query > 0)
+        differing = np.bitwise_xor(codes, query_bits)
+        if hasattr(np, 'bitwise_count'):
+            distances = np.bitwise_count(differing).sum(axis=1, dtype=np.int32)
+        else:
+            distances = _POPCOUNT[differing].sum(axis=1, dtype=np.int32)
+        return -distances.astype(np.float32)
+
+
+INDEX_BACKENDS = {
+    ExactIndex.name: ExactIndex,
+    IVFIndex.name: IVFIndex,
+    HNSWIndex.name: HNSWIndex,
+    Int8Index.name: Int8Index,
+    BinaryIndex.name: BinaryIndex,
+}
+
+
+def create_index(backend: str = None, shards: int = None, **params) -> VectorIndex:
+    """
+    Create an (empty) index for the given backend
+
+    Args:
+        backend: 'exact', 'ivf', 'hnsw', 'int8' or 'binary'
+            (default: MATCHER_INDEX_BACKEND env var, else 'exact')
+        shards: Number of worker processes the rows are split across, each
+            with its own index of that backend (default: MATCHER_SHARDS, else 1)
+        **params: Backend-specific parameters (e.g. nprobe, ef_search, rescore)
+
+    Returns:
+        VectorIndex instance, to be filled with build()
+    """
+    backend = (backend or os.getenv('MATCHER_INDEX_BACKEND', 'exact')).lower()
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(
+            f"Unknown index backend: {backend} (choose from {', '.join(INDEX_BACKENDS)})"
+        )
+
+    if backend == IVFIndex.name and 'nprobe' not in params and os.getenv('MATCHER_IVF_NPROBE'):
+        params['nprobe'] = int(os.getenv('MATCHER_IVF_NPROBE'))
+    if backend == HNSWIndex.name and 'ef_search' not in params and os.getenv('MATCHER_HNSW_EF'):
+        params['ef_search'] = int(os.getenv('MATCHER_HNSW_EF'))
+    if (
+        backend in (Int8Index.name, BinaryIndex.name)
+        and 'rescore' not in params
+        and os.getenv('MATCHER_RESCORE_CANDIDATES')
+    ):
+        params['rescore'] = int(os.getenv('MATCHER_RESCORE_CANDIDATES'))
+
+    shards = shards if shards is not None else int(os.getenv('MATCHER_SHARDS', '1'))
+    if shards > 1:
+        # Imported here: the sharded index builds its shards with create_index
+        from services.sharded_index import ShardedIndex
+        return ShardedIndex(shards, backend, **params)
+
+    return INDEX_BACKENDS[backend](**params)
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup
+
+Run from backend/: python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+# Services are imported as in main.py (backend/ on the path)
+sys.path.insert(0, str(Path(__file__).parent.parent))
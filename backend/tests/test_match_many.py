@@ -0,0 +1,110 @@
+"""
+match_many must return exactly what match_cv_with_jobs returns for each CV
+
+The sentence encoder and the cross-encoder are replaced by deterministic
+stubs, so the tests need neither sentence-transformers nor a model download.
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import services.semantic_matcher as semantic_matcher_module
+from services.semantic_matcher import SemanticMatcher
+
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+CV_A = {
+    'skills': ['Python', 'SQL', 'Docker'],
+    'summary': 'Développeur backend, 5 ans d\'expérience',
+    'experience': [{'title': 'Développeur Python'}],
+}
+CV_B = {
+    'skills': ['Photoshop', 'Figma', 'UX'],
+    'summary': 'Designer produit',
+    'experience': [{'title': 'UX Designer'}],
+}
+
+
+class StubEncoder:
+    """Sentence encoder stand-in: a fixed pseudo-random vector per text"""
+
+    dim = 32
+
+    def encode(self, texts, **kwargs):
+        vectors = np.stack([
+            np.random.RandomState(int(hashlib.md5(t.encode('utf-8')).hexdigest()[:8], 16))
+            .standard_normal(self.dim)
+            for t in texts
+        ]).astype(np.float32) if len(texts) else np.zeros((0, self.dim), dtype=np.float32)
+        if kwargs.get('normalize_embeddings'):
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+class StubCrossEncoder:
+    """Cross-encoder stand-in: scores a pair by the words both texts share"""
+
+    def predict(self, pairs, **kwargs):
+        return np.array([
+            len(set(cv.lower().split()) & set(job.lower().split())) / (1 + len(job.split()))
+            for cv, job in pairs
+        ], dtype=np.float32)
+
+
+def make_matcher(tmp_path, monkeypatch, pipeline: str) -> SemanticMatcher:
+    """Matcher over a copy of the sample catalogue (embedding caches go to tmp_path)"""
+    shutil.copy(DATA_DIR / 'jobs.json', tmp_path / 'jobs.json')
+    monkeypatch.setattr(
+        SemanticMatcher, '_catalogue_files',
+        staticmethod(lambda: [tmp_path / 'jobs_rome_complete.json', tmp_path / 'jobs.json'])
+    )
+    monkeypatch.setattr(semantic_matcher_module, 'TRANSFORMERS_AVAILABLE', True)
+    monkeypatch.setenv('MATCHER_PIPELINE', pipeline)
+    monkeypatch.setenv('MATCHER_INDEX_BACKEND', 'exact')
+    monkeypatch.setenv('MATCHER_SHARDS', '1')
+
+    matcher = SemanticMatcher()
+    matcher.model = StubEncoder()
+    matcher.encoder_backend = 'stub'
+    matcher.reranker.model = StubCrossEncoder()
+    # No time budget: re-ranking must not depend on how fast the machine is
+    matcher.reranker.budget_ms = 0
+    matcher.initialize_model()
+    return matcher
+
+
+@pytest.mark.parametrize('pipeline', ['', 'lexical', 'rerank', 'lexical,rerank'])
+def test_match_many_equals_single_calls(tmp_path, monkeypatch, pipeline):
+    matcher = make_matcher(tmp_path, monkeypatch, pipeline)
+    assert matcher.pipeline == [step for step in pipeline.split(',') if step]
+
+    batch = matcher.match_many([CV_A, CV_B, CV_A], top_k=5)
+    singles = [matcher.match_cv_with_jobs(cv, top_k=5) for cv in (CV_A, CV_B, CV_A)]
+
+    assert batch == singles
+    # Weak matches may be followed by skill-overlap alternatives, so only check non-empty
+    assert all(batch) and batch[0] != batch[1]
+    if 'rerank' in matcher.pipeline:
+        assert matcher.reranker.stats()['reranked'] > 0
+
+
+@pytest.mark.parametrize('pipeline', ['', 'lexical,rerank'])
+def test_match_many_equals_single_calls_with_warm_cache(tmp_path, monkeypatch, pipeline):
+    matcher = make_matcher(tmp_path, monkeypatch, pipeline)
+
+    # Cold: single calls fill the CV cache
+    singles = [matcher.match_cv_with_jobs(cv, top_k=5) for cv in (CV_A, CV_B, CV_A)]
+    hits = matcher.cv_cache.stats()['hits']
+
+    # Warm: the batch is served from the cache
+    batch = matcher.match_many([CV_A, CV_B, CV_A], top_k=5)
+
+    assert matcher.cv_cache.stats()['hits'] > hits
+    assert batch == singles
+    # A warm single call still agrees with the batch
+    assert matcher.match_cv_with_jobs(CV_B, top_k=5) == batch[1]
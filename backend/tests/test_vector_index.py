@@ -0,0 +1,100 @@
+"""
+Vector index backends: exactness, recall floors, add() ids and batch consistency
+
+Seeded clustered data, small enough to run in a couple of seconds.
+"""
+
+import numpy as np
+import pytest
+
+from services.vector_index import HNSWLIB_AVAILABLE, create_index, normalise_rows
+
+
+BACKENDS = [
+    'exact',
+    'ivf',
+    pytest.param('hnsw', marks=pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason="hnswlib not installed")),
+    'int8',
+    'binary',
+]
+
+# Mean recall@10 against brute force on the data below (measured: ivf 0.99,
+# int8 1.0, binary 0.94), with some slack
+RECALL_FLOORS = {'ivf': 0.9, 'hnsw': 0.9, 'int8': 0.95, 'binary': 0.85}
+
+N_BUILD = 7000
+
+
+@pytest.fixture(scope='module')
+def data():
+    """(rows, queries): 8000 rows around 100 centres in 64 dimensions, 50 noisy copies as queries"""
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((100, 64))
+    rows = (centres[rng.integers(100, size=8000)] + 1.2 * rng.standard_normal((8000, 64))).astype(np.float32)
+    queries = (rows[rng.choice(8000, 50, replace=False)] + 0.1 * rng.standard_normal((50, 64))).astype(np.float32)
+    return rows, queries
+
+
+def brute_force(rows, queries, k):
+    """Reference (scores, ids): full sort of the cosine similarities"""
+    similarities = normalise_rows(queries) @ normalise_rows(rows).T
+    ids = np.argsort(-similarities, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(similarities, ids, axis=1), ids
+
+
+def built_index(backend, rows):
+    """Index built on the first N_BUILD rows, the rest appended with add() in two steps"""
+    index = create_index(backend, shards=1)
+    index.build(rows[:N_BUILD])
+    index.add(rows[N_BUILD:N_BUILD + 600])
+    index.add(rows[N_BUILD + 600:])
+    return index
+
+
+def test_exact_equals_brute_force(data):
+    rows, queries = data
+    index = built_index('exact', rows)
+
+    scores, ids = index.search(queries, 10)
+    expected_scores, expected_ids = brute_force(rows, queries, 10)
+
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+
+
+@pytest.mark.parametrize('backend', [b for b in BACKENDS if b != 'exact'])
+def test_recall_floor(data, backend):
+    rows, queries = data
+    index = built_index(backend, rows)
+
+    _, ids = index.search(queries, 10)
+    _, expected_ids = brute_force(rows, queries, 10)
+
+    recall = np.mean([len(set(found) & set(expected)) / 10 for found, expected in zip(ids, expected_ids)])
+    assert recall >= RECALL_FLOORS[backend]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_add_appends_contiguous_ids(data, backend):
+    rows, _ = data
+    index = built_index(backend, rows)
+
+    assert len(index) == len(rows)
+    # Row i keeps id i, whether it came from build() or add()
+    ids = np.array([0, N_BUILD - 1, N_BUILD, N_BUILD + 599, N_BUILD + 600, len(rows) - 1])
+    np.testing.assert_allclose(index.get_vectors(ids), normalise_rows(rows[ids]), atol=1e-6)
+    # An added row is its own nearest neighbour
+    _, found = index.search(rows[ids], 1)
+    np.testing.assert_array_equal(found[:, 0], ids)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_single_query_equals_batch_row(data, backend):
+    rows, queries = data
+    index = built_index(backend, rows)
+
+    batch_scores, batch_ids = index.search(queries, 10)
+    for q in range(len(queries)):
+        scores, ids = index.search(queries[q:q + 1], 10)
+        np.testing.assert_array_equal(ids[0], batch_ids[q])
+        np.testing.assert_array_equal(scores[0], batch_scores[q])
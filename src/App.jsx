@@ -52,6 +52,7 @@ function App() {
           score: Math.round(job.match_score * 100),
           requiredSkills: job.required_skills,
           missingSkills: job.missing_skills,
+          partialSkills: job.partial_skills || [],
           salaryRange: job.salary_range,
           educationLevel: job.education_level,
         })),
@@ -312,15 +313,19 @@ function App() {
                         <div className="mt-5 p-4 rounded-lg" style={{ backgroundColor: '#fff3e0' }}>
                           <p className="text-sm font-bold mb-3" style={{ color: '#e65100' }}>📈 Skills to develop:</p>
                           <div className="flex flex-wrap gap-2">
-                            {job.missingSkills.map((skill, i) => (
-                              <span key={i} className="px-3 py-1 rounded text-xs font-medium" style={{
-                                backgroundColor: '#ffffff',
-                                color: '#e65100',
-                                border: '1px solid #ffcc80'
-                              }}>
-                                {skill}
-                              </span>
-                            ))}
+                            {job.missingSkills.map((skill, i) => {
+                              const partial = job.partialSkills.find(p => p.skill === skill)
+                              return (
+                                <span key={i} className="px-3 py-1 rounded text-xs font-medium" style={{
+                                  backgroundColor: '#ffffff',
+                                  color: '#e65100',
+                                  border: partial ? '1px dashed #ffcc80' : '1px solid #ffcc80'
+                                }}>
+                                  {skill}
+                                  {partial && <span style={{ color: '#888' }}> ≈ {partial.related_skill}</span>}
+                                </span>
+                              )
+                            })}
                           </div>
                         </div>
                       )}
@@ -52,6 +52,71 @@ export const analyzeCV = async (file) => {
   return response.data;
 };
 
+/**
+ * Analyze CV with progressive results (streaming variant of analyzeCV)
+ *
+ * The backend sends each section of the analysis as soon as it is ready
+ * (NDJSON: one {"section", "data"} object per line), so the parsed CV and
+ * the job matches can be shown before the AI insights and real offers.
+ * Uses fetch, as axios can't read a response body while it streams.
+ *
+ * @param {File} file - CV file (PDF or DOCX)
+ * @param {Function} onSection - Called with (section, data, resultsSoFar) for each section:
+ *   cv_analysis, job_recommendations, training_recommendations, ai_insights, real_job_offers
+ * @returns {Promise} Complete analysis results (same shape as analyzeCV)
+ */
+export const analyzeCVStream = async (file, onSection = () => {}) => {
+  const formData = new FormData();
+  formData.append('file', file);
+
+  const response = await fetch(`${API_BASE_URL}/api/analyze-cv/stream`, {
+    method: 'POST',
+    body: formData,
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || `Analysis failed (HTTP ${response.status})`);
+  }
+
+  const results = {};
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  const handleLine = (line) => {
+    if (!line.trim()) return false;
+    const event = JSON.parse(line);
+    if (event.section === 'error') {
+      throw new Error(event.detail || 'Analysis failed');
+    }
+    if (event.section === 'done') return true;
+    results[event.section] = event.data;
+    onSection(event.section, event.data, results);
+    return false;
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+    // Handle every complete line, keep the partial last one for the next chunk
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (handleLine(line)) {
+        reader.cancel();
+        return results;
+      }
+    }
+
+    if (done) {
+      if (handleLine(buffer)) return results;
+      throw new Error('Analysis stream ended unexpectedly');
+    }
+  }
+};
+
 /**
  * Get all available jobs
  * @returns {Promise} List of jobs